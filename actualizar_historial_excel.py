@@ -1,4 +1,8 @@
 import pandas as pd
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # 1. Leer el historial general existente
 def cargar_historial_general(archivo_general):
@@ -8,7 +12,8 @@ def cargar_historial_general(archivo_general):
         return pd.DataFrame()  # Si no existe, empieza vacío
 
 # 2. Leer los nuevos partidos desde otro Excel (puede tener solo 1 jugador y 1 torneo o varios)
-from file_parser_excel_struct import parse_excel_historial
+from file_parser import parse_excel_historial, historiales_a_dataframe, nombres_hojas
+from db_manager import anexar_partidos
 
 def cargar_nuevos_partidos(archivo_nuevo):
     # Usa tu parser para que el formato sea igual que el general
@@ -53,9 +58,76 @@ def actualizar_historial(archivo_general, archivo_nuevo, archivo_salida):
         print(f"{duplicados} partidos eran duplicados y no se agregaron.")
     print(f"Total en historial: {len(df_sin_duplicados)} partidos.")
 
+# 4. Importación por lotes: varios archivos, hojas repartidas entre procesos
+def _parsear_tarea(tarea):
+    """Se ejecuta en un proceso del pool: parsea un grupo de hojas de un archivo."""
+    archivo, hojas = tarea
+    historiales = parse_excel_historial(archivo, hojas=set(hojas))
+    return len(historiales), historiales_a_dataframe(historiales)
+
+def _repartir_hojas(archivos, procesos):
+    """
+    Divide las hojas de cada archivo en grupos para el pool. Si hay menos archivos
+    que procesos, cada archivo se parte en varios grupos para ocupar todos los núcleos.
+    """
+    grupos_por_archivo = max(1, -(-procesos // len(archivos)))
+    tareas = []
+    for archivo in archivos:
+        hojas = nombres_hojas(archivo)
+        n_grupos = min(grupos_por_archivo, len(hojas))
+        # Reparto alterno para que los grupos queden equilibrados
+        tareas += [(archivo, hojas[k::n_grupos]) for k in range(n_grupos)]
+    return tareas
+
+def importar_lote(archivos, archivo_general="data/historial_general.xlsx", procesos=None):
+    """
+    Parsea en paralelo todas las hojas de 'archivos' y añade los partidos al
+    historial maestro con un único paso de deduplicación y escritura.
+    Devuelve un dict con los totales y el rendimiento.
+    """
+    if not archivos:
+        return {'archivos': 0, 'hojas': 0, 'filas': 0, 'agregados': 0, 'duplicados': 0}
+    procesos = procesos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    tareas = _repartir_hojas(archivos, procesos)
+
+    hojas, dfs = 0, []
+    with ProcessPoolExecutor(max_workers=min(procesos, max(len(tareas), 1))) as pool:
+        for n_hojas, df in pool.map(_parsear_tarea, tareas):
+            hojas += n_hojas
+            dfs.append(df)
+    df_nuevos = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    fin_parseo = time.perf_counter()
+
+    agregados = len(anexar_partidos(archivo_general, df_nuevos))
+    fin = time.perf_counter()
+
+    duracion = max(fin - inicio, 1e-9)
+    resumen = {
+        'archivos': len(archivos),
+        'hojas': hojas,
+        'filas': len(df_nuevos),
+        'agregados': agregados,
+        'duplicados': len(df_nuevos) - agregados,
+        'segundos_parseo': round(fin_parseo - inicio, 2),
+        'segundos_total': round(duracion, 2),
+        'filas_por_segundo': round(len(df_nuevos) / duracion, 1),
+        'hojas_por_segundo': round(hojas / duracion, 2),
+    }
+    print(f"{resumen['archivos']} archivos, {hojas} hojas, {len(df_nuevos)} partidos leídos con {procesos} procesos.")
+    print(f"{agregados} partidos nuevos agregados, {resumen['duplicados']} duplicados.")
+    print(f"Rendimiento: {resumen['filas_por_segundo']} filas/s, {resumen['hojas_por_segundo']} hojas/s "
+          f"({resumen['segundos_total']} s, parseo {resumen['segundos_parseo']} s).")
+    return resumen
+
 # ------------ PRUEBA DE USO -----------
 if __name__ == "__main__":
-    archivo_general = "data/historiales/historial_general.xlsx"
-    archivo_nuevos = "data/historiales/nuevos_partidos.xlsx"
-    archivo_salida = "data/historiales/historial_actualizado.xlsx"
-    actualizar_historial(archivo_general, archivo_nuevos, archivo_salida)
\ No newline at end of file
+    # Con argumentos: importación por lotes al historial maestro
+    #   python actualizar_historial_excel.py export1.xlsx export2.xlsx ...
+    if len(sys.argv) > 1:
+        importar_lote(sys.argv[1:])
+    else:
+        archivo_general = "data/historiales/historial_general.xlsx"
+        archivo_nuevos = "data/historiales/nuevos_partidos.xlsx"
+        archivo_salida = "data/historiales/historial_actualizado.xlsx"
+        actualizar_historial(archivo_general, archivo_nuevos, archivo_salida)
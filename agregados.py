@@ -0,0 +1,376 @@
+import numpy as np
+import pandas as pd
+from esquema_historial import DECIMALES_FLOAT32, a_float64, parsear_horas
+from filtro_tiempo import rango_tiempo
+from stat_evolution import GRANULARIDADES, inicio_periodo
+from stat_core import (
+    _preparar_partidos, _contribuciones_partido, _ultimo_partido_por_torneo, _categoria_rival, _ratio,
+    mapear_unicos, reducir_torneos, momentum_partidos, armar_resumenes, resumen_global
+)
+
+# --- Tablas de agregados materializadas ---
+# Las métricas aditivas de resumen_global (partidos, victorias, sets, puntos,
+# sumas de delta, rendimiento por ronda, marcadores, winrate por categoría de
+# rival...) se guardan sumadas por (jugador, día). Al importar partidos solo se
+# suman las contribuciones de las filas nuevas; al leer una ventana de tiempo se
+# combinan los meses completos que caen dentro (acumulado mensual) y los días
+# sueltos de los extremos, así que el coste no depende de cuántos partidos tenga
+# el jugador. Tablas (claves + valores):
+#   totales: (jugador, dia) -> columnas de _contribuciones_partido, rating_min, rating_max
+#   rondas:  (jugador, dia, ronda) -> partidos, victorias, delta_suma, delta_n
+#   rivales: (jugador, dia, rating_rival) -> partidos, victorias, gano_validos
+#            (la categoría Top/Medio/Bajo depende del rating medio del jugador en
+#            la ventana, por eso se guarda el rating exacto del rival)
+#   torneos: último partido de cada (jugador, torneo, fecha), con su posición y delta_total
+#   evolucion: (jugador, dia) -> partidos, delta_suma y rating (suma, cuenta, mínimo,
+#            máximo y el del último partido con su hora 'rating_t'), solo partidos con
+#            fecha; se acumula también por semana, mes, trimestre y año (GRANULARIDADES)
+# Los partidos sin fecha quedan en un día NaT que solo cuenta en la ventana sin límites.
+CLAVES_TABLAS = {
+    'totales': ['jugador', 'dia'],
+    'rondas': ['jugador', 'dia', 'ronda'],
+    'rivales': ['jugador', 'dia', 'rating_rival'],
+    'torneos': ['jugador', 'torneo', 'fecha'],
+    'evolucion': ['jugador', 'dia'],
+}
+# Cómo se combinan las columnas que no se suman: (mínimos, máximos, (valor, hora) del último)
+REGLAS_COMBINACION = {
+    'totales': (['rating_min'], ['rating_max'], None),
+    'evolucion': (['rating_min'], ['rating_max'], ('rating_ultimo', 'rating_t')),
+}
+COLUMNAS_RONDAS = ['partidos', 'victorias', 'delta_suma', 'delta_n']
+COLUMNAS_RIVALES = ['partidos', 'victorias', 'gano_validos']
+COLUMNAS_TORNEOS = ['hora_torneo', 'hora', 'dia', 'posicion', 'delta_total']
+COLUMNAS_EVOLUCION = ['rating_medio', 'rating_min', 'rating_max', 'rating_ultimo', 'delta', 'delta_acumulado', 'partidos']
+_T_MIN = np.iinfo(np.int64).min
+_T_MAX = np.iinfo(np.int64).max
+
+def _tiempos(dias):
+    """Días como int64 (ns); NaT queda como el mínimo, igual que en filtro_tiempo.tiempos_ns."""
+    return np.asarray(dias, dtype='datetime64[ns]').view(np.int64)
+
+def _redondear(sumas):
+    """
+    Las sumas se redondean a DECIMALES_FLOAT32: los deltas tienen pocos decimales
+    y así el resultado no depende del orden en que se combinan las cubetas
+    (un promedio de -0.405 no se convierte en -0.41 o -0.40 según el orden).
+    """
+    return np.round(sumas, DECIMALES_FLOAT32)
+
+def _agrupar(tabla, claves, minimos=(), maximos=(), ultimo=None):
+    """
+    Suma las filas con la misma clave; las columnas de 'minimos'/'maximos' se
+    combinan con min/max. Con ultimo=(valor, hora) se conserva el valor de la
+    fila con la hora más reciente (en empate, la que va después).
+    """
+    no_suma = list(claves) + list(minimos) + list(maximos)
+    if ultimo is not None and ultimo[1] in tabla.columns:
+        tabla = tabla.sort_values(ultimo[1], na_position='first', kind='stable')
+        no_suma += list(ultimo)
+    grupos = tabla.groupby(claves, sort=False, dropna=False)
+    sumas = [c for c in tabla.columns if c not in no_suma]
+    resultado = grupos[sumas].sum()
+    resultado[:] = _redondear(resultado.to_numpy(dtype=float))
+    # Las tablas vacías (tablas_vacias) solo tienen las columnas de clave
+    for col in minimos:
+        if col in tabla.columns:
+            resultado[col] = grupos[col].min()
+    for col in maximos:
+        if col in tabla.columns:
+            resultado[col] = grupos[col].max()
+    if ultimo is not None and ultimo[1] in tabla.columns:
+        # Los partidos sin rating tienen hora NaN y last() los salta
+        resultado[ultimo[0]] = grupos[ultimo[0]].last()
+        resultado[ultimo[1]] = grupos[ultimo[1]].max()
+    return resultado.reset_index()
+
+def tablas_vacias():
+    vacias = {nombre: pd.DataFrame(columns=claves) for nombre, claves in CLAVES_TABLAS.items()}
+    vacias['torneos'] = pd.DataFrame(columns=CLAVES_TABLAS['torneos'] + COLUMNAS_TORNEOS)
+    return vacias
+
+def tablas_agregados(df):
+    """Tablas por (jugador, día) de un DataFrame de partidos (ver CLAVES_TABLAS)."""
+    if df is None or df.empty:
+        return tablas_vacias()
+    df = df[df['jugador'].notna()]
+    df, puntos_sets, sets_ganados_mat, sets_perdidos_mat = _preparar_partidos(df)
+    contrib = _contribuciones_partido(df, puntos_sets, sets_ganados_mat, sets_perdidos_mat)
+    jugador = df['jugador'].astype(str).to_numpy(dtype=object)
+    dia = pd.Series(df['fecha_dt'].to_numpy(dtype='datetime64[ns]')).dt.normalize().to_numpy()
+    claves = {'jugador': jugador, 'dia': dia}
+
+    totales = contrib.assign(**claves, rating_min=df['rating_jugador'].to_numpy(dtype=float, na_value=np.nan))
+    totales['rating_max'] = totales['rating_min']
+    totales = _agrupar(totales, CLAVES_TABLAS['totales'], ['rating_min'], ['rating_max'])
+
+    ronda = mapear_unicos(df['ronda'], lambda r: r.lower() if isinstance(r, str) else None)
+    rondas = _agrupar(contrib[COLUMNAS_RONDAS].assign(**claves, ronda=ronda), CLAVES_TABLAS['rondas'])
+    rondas = rondas[rondas['ronda'].notna()].reset_index(drop=True)
+
+    rating_rival = df['rating_rival'].to_numpy(dtype=float, na_value=np.nan)
+    rivales = _agrupar(contrib[COLUMNAS_RIVALES].assign(**claves, rating_rival=rating_rival),
+                       CLAVES_TABLAS['rivales'])
+
+    ult = _ultimo_partido_por_torneo(pd.factorize(jugador)[0], df)
+    torneos = pd.DataFrame({
+        'jugador': jugador[ult],
+        'torneo': df['torneo'].astype(object).to_numpy()[ult],
+        'fecha': df['fecha'].astype(object).to_numpy()[ult],
+        'hora_torneo': df['hora_torneo'].astype(object).to_numpy()[ult],
+        'hora': df['hora'].astype(object).to_numpy()[ult],
+        'dia': dia[ult],
+        'posicion': pd.to_numeric(df['posicion'].iloc[ult], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+        'delta_total': df['delta_total'].to_numpy(dtype=float, na_value=np.nan)[ult],
+    })
+
+    return {'totales': totales, 'rondas': rondas, 'rivales': rivales, 'torneos': torneos,
+            'evolucion': tabla_evolucion(df)}
+
+def tabla_evolucion(df):
+    """Tabla 'evolucion' por (jugador, día) de un DataFrame de partidos (solo partidos con fecha)."""
+    df = df[df['jugador'].notna() & df['fecha_dt'].notna()]
+    rating = df['rating_jugador'].to_numpy(dtype=float, na_value=np.nan)
+    # La hora del partido en segundos decide cuál es el último rating de cada día
+    hora_rating = np.where(np.isnan(rating), np.nan, _tiempos(df['fecha_dt']) // 10**9)
+    evolucion = pd.DataFrame({
+        'jugador': df['jugador'].astype(str).to_numpy(dtype=object),
+        'dia': pd.Series(df['fecha_dt'].to_numpy(dtype='datetime64[ns]')).dt.normalize().to_numpy(),
+        'partidos': 1,
+        'delta_suma': np.nan_to_num(a_float64(df['delta']).to_numpy(dtype=float, na_value=np.nan)),
+        'rating_suma': np.nan_to_num(rating),
+        'rating_n': (~np.isnan(rating)).astype(int),
+        'rating_min': rating,
+        'rating_max': rating,
+        'rating_ultimo': rating,
+        'rating_t': hora_rating,
+    })
+    return _agrupar(evolucion, CLAVES_TABLAS['evolucion'], *REGLAS_COMBINACION['evolucion'])
+
+def serie_evolucion(tabla, granularidad):
+    """
+    Serie de evolución de un jugador a partir de filas de la tabla 'evolucion'
+    (días o periodos): DataFrame indexado por el inicio de cada periodo con
+    COLUMNAS_EVOLUCION. delta_acumulado parte de 0 al inicio de las filas.
+    """
+    if tabla.empty:
+        return pd.DataFrame(columns=COLUMNAS_EVOLUCION, index=pd.DatetimeIndex([], name='periodo'))
+    tabla = tabla.assign(dia=inicio_periodo(tabla['dia'], granularidad))
+    inicios = _tiempos(tabla['dia'])
+    if (np.diff(inicios) <= 0).any():
+        # Días sueltos (extremos de la ventana o tabla por días): se juntan en su periodo
+        tabla = _agrupar(tabla, CLAVES_TABLAS['evolucion'], *REGLAS_COMBINACION['evolucion']).sort_values('dia')
+    rating_n = tabla['rating_n'].to_numpy(dtype=float)
+    delta = tabla['delta_suma'].to_numpy(dtype=float)
+    return pd.DataFrame({
+        'rating_medio': tabla['rating_suma'].to_numpy(dtype=float) / np.where(rating_n > 0, rating_n, np.nan),
+        'rating_min': tabla['rating_min'].to_numpy(dtype=float),
+        'rating_max': tabla['rating_max'].to_numpy(dtype=float),
+        'rating_ultimo': tabla['rating_ultimo'].to_numpy(dtype=float),
+        'delta': delta,
+        'delta_acumulado': _redondear(np.cumsum(delta)),
+        'partidos': tabla['partidos'].to_numpy(dtype=int),
+    }, index=pd.DatetimeIndex(tabla['dia'], name='periodo'))
+
+def evolucion_partidos(df_jugador, granularidad='mes'):
+    """Serie de evolución (serie_evolucion) calculada directamente desde los partidos de un jugador."""
+    return serie_evolucion(tabla_evolucion(df_jugador), granularidad)
+
+def _horas_ns(horas):
+    """Horas ("9:46") como int64 ns desde medianoche, para ordenar (el texto pondría "9:46" tras "10:00")."""
+    return parsear_horas(pd.Series(horas, dtype=object)).to_numpy().view(np.int64)
+
+def combinar_tablas(tablas, tablas_nuevas):
+    """
+    Tablas tras añadir partidos: se suman las contribuciones por clave (rating
+    con min/max) y, para cada torneo, se queda el último partido entre el que
+    ya estaba y los nuevos (mismo criterio que resumen_global).
+    """
+    combinadas = {}
+    for nombre, claves in CLAVES_TABLAS.items():
+        previa, nueva = tablas[nombre], tablas_nuevas[nombre]
+        if previa.empty or nueva.empty:
+            combinadas[nombre] = nueva if previa.empty else previa
+            continue
+        juntas = pd.concat([previa, nueva], ignore_index=True)
+        if nombre == 'torneos':
+            orden = np.lexsort((_horas_ns(juntas['hora']), _horas_ns(juntas['hora_torneo'])))
+            juntas = juntas.take(orden)
+            combinadas[nombre] = juntas[~juntas.duplicated(claves, keep='last')].reset_index(drop=True)
+        else:
+            combinadas[nombre] = _agrupar(juntas, claves, *REGLAS_COMBINACION.get(nombre, ((), (), None)))
+    return combinadas
+
+class _Cubetas:
+    """
+    Una tabla por (jugador, día[, clave]) y su acumulado por (jugador, periodo[, clave])
+    (por defecto, mes), como arrays ordenados por jugador y tiempo para recortar
+    ventanas con búsqueda binaria. 'columnas' son las columnas de valores, en el
+    orden de 'valores'; 'reglas' son las de REGLAS_COMBINACION.
+    """
+    def __init__(self, dias, claves, reglas=((), (), None), periodo='mes'):
+        self.columnas = [c for c in dias.columns if c not in claves]
+        self.clave = claves[2] if len(claves) > 2 else None
+        self.reglas = reglas
+        self.periodo = periodo
+        periodos = _agrupar(dias.assign(dia=inicio_periodo(dias['dia'], periodo)), claves, *reglas)
+        self._dias = self._indexar(dias)
+        self._periodos = self._indexar(periodos)
+
+    def _indexar(self, tabla):
+        codigos, jugadores = pd.factorize(tabla['jugador'], sort=True)
+        tiempos = _tiempos(tabla['dia'])
+        orden = np.lexsort((tiempos, codigos))
+        limites = np.searchsorted(codigos[orden], np.arange(len(jugadores) + 1))
+        rangos = {jugador: (limites[i], limites[i + 1]) for i, jugador in enumerate(jugadores)}
+        valores = tabla[self.columnas].to_numpy(dtype=float, na_value=np.nan)[orden]
+        extra = tabla[self.clave].to_numpy(dtype=object)[orden] if self.clave else None
+        return valores, extra, tiempos[orden], rangos
+
+    @staticmethod
+    def _entre(indexada, jugador, desde, hasta):
+        valores, extra, tiempos, rangos = indexada
+        inicio, fin = rangos.get(jugador, (0, 0))
+        # Sin 'desde' pero con 'hasta', los días NaT (al principio) quedan fuera
+        lado = 'right' if desde == _T_MIN and hasta != _T_MAX else 'left'
+        primero = np.searchsorted(tiempos[inicio:fin], desde, lado)
+        ultimo = np.searchsorted(tiempos[inicio:fin], hasta, 'left')
+        tramo = slice(inicio + primero, inicio + max(primero, ultimo))
+        return valores[tramo], extra[tramo] if extra is not None else None, tiempos[tramo]
+
+    def filas(self, jugador, desde, hasta):
+        """
+        (valores, clave, tiempos) de las filas del jugador que cubren [desde, hasta)
+        (int64 ns alineados a días), en orden cronológico: los periodos completos
+        salen del acumulado y los extremos, por días. 'tiempos' es el inicio de
+        cada fila (día o periodo).
+        """
+        periodo_desde = desde if desde == _T_MIN else _limite_periodo(desde, self.periodo, arriba=True)
+        periodo_hasta = hasta if hasta == _T_MAX else _limite_periodo(hasta, self.periodo, arriba=False)
+        if periodo_desde >= periodo_hasta:
+            return self._entre(self._dias, jugador, desde, hasta)
+        tramos = [self._entre(self._dias, jugador, desde, periodo_desde),
+                  self._entre(self._periodos, jugador, periodo_desde, periodo_hasta),
+                  self._entre(self._dias, jugador, periodo_hasta, hasta)]
+        valores, extra, tiempos = (np.concatenate(partes) if partes[0] is not None else None
+                                   for partes in zip(*tramos))
+        return valores, extra, tiempos
+
+    def sumas_por_clave(self, jugador, desde, hasta, claves=None):
+        """
+        Sumas de la ventana por valor de la clave (o de 'claves', un array por fila),
+        en orden de primera aparición: DataFrame indexado por (0, clave).
+        """
+        valores, extra, _ = self.filas(jugador, desde, hasta)
+        codigos, unicos = pd.factorize(extra if claves is None else claves(extra))
+        sumas = np.zeros((len(unicos), len(self.columnas)))
+        np.add.at(sumas, codigos, valores)
+        return pd.DataFrame(_redondear(sumas), columns=self.columnas,
+                            index=pd.MultiIndex.from_product([[0], unicos]))
+
+def _limite_periodo(t, periodo, arriba):
+    """Inicio del periodo de t (int64 ns), o del periodo siguiente si arriba=True y t no es un inicio."""
+    inicio = inicio_periodo(np.array([t], dtype=np.int64).view('datetime64[ns]'), periodo)
+    if arriba and inicio[0].view(np.int64) < t:
+        inicio = inicio_periodo(inicio + np.timedelta64(GRANULARIDADES[periodo][1], 'D'), periodo)
+    return int(inicio[0].view(np.int64))
+
+def _torneos_por_dia(torneos):
+    """Sumas de reducir_torneos por (jugador, día) a partir de la tabla 'torneos'."""
+    codigos, claves = pd.factorize(pd.MultiIndex.from_arrays([torneos['jugador'], torneos['dia']]))
+    t = reducir_torneos(codigos, torneos['posicion'].to_numpy(dtype=float),
+                        torneos['delta_total'].to_numpy(dtype=float), len(claves))
+    t.insert(0, 'jugador', claves.get_level_values(0))
+    t.insert(1, 'dia', claves.get_level_values(1))
+    return t
+
+def _limites_dias(ventana):
+    """[desde, hasta) de la ventana en int64 ns, o None si no empieza y acaba a medianoche."""
+    desde, hasta = rango_tiempo(ventana)
+    if any(t is not None and t != t.normalize() for t in (desde, hasta)):
+        return None
+    return (_T_MIN if desde is None else desde.value), (_T_MAX if hasta is None else hasta.value)
+
+class AgregadosHistorial:
+    """
+    Tablas de agregados del historial (ver CLAVES_TABLAS) preparadas para leer
+    el resumen de un jugador en cualquier ventana de tiempo. 'tablas' son las
+    tablas por día tal como se guardan (db_manager.cargar_agregados).
+    """
+    def __init__(self, tablas):
+        self.tablas = tablas
+        self._totales = _Cubetas(tablas['totales'], CLAVES_TABLAS['totales'], REGLAS_COMBINACION['totales'])
+        self._rondas = _Cubetas(tablas['rondas'], CLAVES_TABLAS['rondas'])
+        self._rivales = _Cubetas(tablas['rivales'], CLAVES_TABLAS['rivales'])
+        self._torneos = _Cubetas(_torneos_por_dia(tablas['torneos']), CLAVES_TABLAS['totales'])
+        self._evolucion = {
+            granularidad: _Cubetas(tablas['evolucion'], CLAVES_TABLAS['evolucion'], REGLAS_COMBINACION['evolucion'],
+                                   granularidad)
+            for granularidad in GRANULARIDADES
+        }
+
+    def partidos(self):
+        """Número de partidos agregados (para comprobar que las tablas cuadran con el historial)."""
+        return int(self.tablas['totales']['partidos'].sum()) if not self.tablas['totales'].empty else 0
+
+    def anexar(self, df_nuevos):
+        """Agregados con los partidos nuevos sumados (no modifica estos)."""
+        return AgregadosHistorial(combinar_tablas(self.tablas, tablas_agregados(df_nuevos)))
+
+    def resumen(self, jugador, ventana, df_jugador):
+        """
+        Resumen del jugador en la ventana (OPCIONES_TIEMPO o rango), igual que
+        resumen_global(df_jugador)[jugador]. df_jugador son sus partidos de la
+        ventana: solo se usan para el momentum (los últimos 10 partidos). Si la
+        ventana no empieza y acaba a medianoche no se puede leer por días y se
+        calcula con resumen_global.
+        """
+        limites = _limites_dias(ventana)
+        if limites is None:
+            return resumen_global(df_jugador).get(jugador, {})
+        desde, hasta = limites
+
+        columnas = self._totales.columnas
+        totales, _, _ = self._totales.filas(jugador, desde, hasta)
+        if not len(totales) or totales[:, columnas.index('partidos')].sum() == 0:
+            return {}
+        es_suma = [c not in ('rating_min', 'rating_max') for c in columnas]
+        s = pd.DataFrame(_redondear(totales[:, es_suma].sum(axis=0, keepdims=True)),
+                         columns=[c for c, suma in zip(columnas, es_suma) if suma])
+        rating_min = np.nanmin(totales[:, columnas.index('rating_min')], keepdims=True, initial=np.inf)
+        rating_max = np.nanmax(totales[:, columnas.index('rating_max')], keepdims=True, initial=-np.inf)
+        rating_min[np.isinf(rating_min)] = rating_max[np.isinf(rating_max)] = np.nan
+        torneos, _, _ = self._torneos.filas(jugador, desde, hasta)
+        t = pd.DataFrame(_redondear(torneos.sum(axis=0, keepdims=True)), columns=self._torneos.columnas)
+        momentum = momentum_partidos(np.zeros(len(df_jugador), dtype=int), df_jugador, 1)
+
+        rondas = self._rondas.sumas_por_clave(jugador, desde, hasta)
+        rp = _ratio(s['rating_suma'].to_numpy(), s['rating_n'].to_numpy())
+        categorias = self._rivales.sumas_por_clave(
+            jugador, desde, hasta, lambda rating_rival: _categoria_rival(rating_rival.astype(float), rp[0]))
+
+        return armar_resumenes([jugador], s, rating_min, rating_max, t, momentum, rondas, categorias)[jugador]
+
+    def evolucion(self, jugador, ventana, df_jugador, granularidad='mes'):
+        """
+        Evolución del rating del jugador por semana, mes, trimestre o año
+        (GRANULARIDADES) dentro de la ventana (ver serie_evolucion). Los periodos
+        completos salen del acumulado de esa granularidad y los cortados por la
+        ventana, de sus días. df_jugador solo se usa si la ventana no se puede
+        leer por días.
+        """
+        limites = _limites_dias(ventana)
+        if limites is None:
+            return evolucion_partidos(df_jugador, granularidad)
+        cubetas = self._evolucion[granularidad]
+        valores, _, tiempos = cubetas.filas(jugador, *limites)
+        if not len(valores):
+            return serie_evolucion(pd.DataFrame(), granularidad)
+        tabla = pd.DataFrame(valores, columns=cubetas.columnas)
+        tabla.insert(0, 'jugador', jugador)
+        tabla.insert(1, 'dia', tiempos.view('datetime64[ns]'))
+        return serie_evolucion(tabla, granularidad)
+
+def agregados_historial(df):
+    """Agregados calculados desde cero para un DataFrame de partidos."""
+    return AgregadosHistorial(tablas_agregados(df))
@@ -1,14 +1,68 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox, QListWidget
-from PyQt5.QtCore import Qt
-from file_parser import parse_excel_historial
-from db_manager import guardar_historial
-from db_manager import actualizar_historial_sin_duplicados
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QMessageBox, QListWidget, QProgressDialog
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from file_parser import iterar_hojas, historiales_a_dataframe
+from db_manager import anexar_partidos
+from stats_cache import cache_estadisticas
+from historial_store import ARCHIVO_GENERAL
+
+class IngestaWorker(QThread):
+    """
+    Importa un libro fuera del hilo de la interfaz: parsea hoja por hoja
+    (informando del progreso) y al final añade los partidos al historial en un
+    único paso atómico. Si se cancela antes, el historial no se modifica.
+    """
+    total = pyqtSignal(int)                 # número de hojas a procesar
+    progreso = pyqtSignal(int, str)         # hojas procesadas, última hoja
+    guardando = pyqtSignal()                # empieza la escritura en el historial
+    terminado = pyqtSignal(dict, int, int)  # {jugador: partidos}, agregados, duplicados
+    fallo = pyqtSignal(str)
+
+    def __init__(self, path, archivo_general=ARCHIVO_GENERAL, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.archivo_general = archivo_general
+        self.cancelado = False
+        self.jugadores_afectados = []
+        self.df_agregados = None
+
+    def run(self):
+        try:
+            historiales = {}
+            hojas = iterar_hojas(self.path, al_abrir=lambda nombres: self.total.emit(len(nombres)))
+            for i, (jugador, partidos) in enumerate(hojas, start=1):
+                if self.isInterruptionRequested():
+                    hojas.close()
+                    break
+                historiales[jugador] = partidos
+                self.progreso.emit(i, jugador)
+            if self.isInterruptionRequested():
+                self.cancelado = True
+                return
+
+            self.guardando.emit()
+            df_nuevos = historiales_a_dataframe(historiales)
+            self.df_agregados = anexar_partidos(self.archivo_general, df_nuevos)
+            nuevos_agregados = len(self.df_agregados)
+            if nuevos_agregados:
+                self.jugadores_afectados = list(self.df_agregados['jugador'].unique())
+            duplicados = len(df_nuevos) - nuevos_agregados
+            resumen = {jugador: len(partidos) for jugador, partidos in historiales.items()}
+            self.terminado.emit(resumen, nuevos_agregados, duplicados)
+        except Exception as e:
+            self.fallo.emit(str(e))
 
 class CargarDatosWidget(QWidget):
-    def __init__(self):
+    # Se emite tras guardar partidos nuevos en el historial (jugadores con partidos nuevos)
+    historial_actualizado = pyqtSignal(list)
+
+    def __init__(self, store=None):
         super().__init__()
         self.setLayout(QVBoxLayout())
         self.layout().setAlignment(Qt.AlignTop)
+        # Historial compartido: recibe las filas nuevas tras cada importación
+        self.store = store
+        self.worker = None
+        self.progress_dialog = None
 
         self.info_label = QLabel("Carga un archivo Excel con una hoja por jugador para procesar los historiales.")
         self.layout().addWidget(self.info_label)
@@ -27,40 +81,78 @@ class CargarDatosWidget(QWidget):
         path, _ = QFileDialog.getOpenFileName(self, "Seleccionar archivo Excel", "", "Archivos Excel (*.xlsx *.xls)")
         if not path:
             return
+        self.iniciar_ingesta(path)
 
-        try:
-            historiales = parse_excel_historial(path)
-            if not historiales:
-                self.result_label.setText("No se encontraron hojas/jugadores en el archivo.")
-                return
+    def iniciar_ingesta(self, path, archivo_general=ARCHIVO_GENERAL):
+        """Lanza la importación en segundo plano; la interfaz sigue respondiendo."""
+        if self.worker is not None and self.worker.isRunning():
+            return
+        self.btn_cargar.setEnabled(False)
+        self.result_label.setText(f"Procesando {path.split('/')[-1]}…")
 
-            self.result_label.setText(f"Archivo procesado: {path.split('/')[-1]} — {len(historiales)} jugadores encontrados.")
-            self.lista_jugadores.clear()
-            for jugador, partidos in historiales.items():
-                self.lista_jugadores.addItem(f"{jugador}: {len(partidos)} partidos")
+        # Diálogo no modal: el resto de la aplicación se puede seguir usando
+        self.progress_dialog = QProgressDialog("Abriendo archivo…", "Cancelar", 0, 0, self)
+        self.progress_dialog.setWindowTitle("Importando historial")
+        self.progress_dialog.setWindowModality(Qt.NonModal)
+        self.progress_dialog.setAutoClose(False)
+        self.progress_dialog.setAutoReset(False)
+        self.progress_dialog.setMinimumDuration(0)
 
-            QMessageBox.information(self, "Carga exitosa", f"Se procesaron {len(historiales)} jugadores.\nPuedes ver el resumen abajo.")
+        self.worker = IngestaWorker(path, archivo_general, self)
+        self.worker.total.connect(self.progress_dialog.setMaximum)
+        self.worker.progreso.connect(self._on_progreso)
+        self.worker.guardando.connect(self._on_guardando)
+        self.worker.terminado.connect(self._on_terminado)
+        self.worker.fallo.connect(self._on_fallo)
+        self.worker.finished.connect(self._on_finalizado)
+        self.progress_dialog.canceled.connect(self.worker.requestInterruption)
+        self.worker.start()
+        self.progress_dialog.show()
 
-        except Exception as e:
-            self.result_label.setText("Error al procesar el archivo.")
-            QMessageBox.critical(self, "Error", f"Ocurrió un error procesando el archivo:\n{e}")
+    def _on_progreso(self, hojas, jugador):
+        self.progress_dialog.setValue(hojas)
+        self.progress_dialog.setLabelText(f"Hoja {hojas} de {self.progress_dialog.maximum()}: {jugador}")
+
+    def _on_guardando(self):
+        # La escritura final no se puede cancelar
+        self.progress_dialog.setCancelButton(None)
+        self.progress_dialog.setLabelText("Guardando en el historial…")
 
-        archivo_general = "data/historial_general.xlsx"
-        nuevos_agregados, duplicados = actualizar_historial_sin_duplicados(archivo_general, historiales)
+    def _cerrar_dialogo(self):
+        # close() también emite 'canceled': se desconecta antes para no interrumpir al worker
+        self.progress_dialog.canceled.disconnect()
+        self.progress_dialog.close()
+
+    def _on_terminado(self, historiales, nuevos_agregados, duplicados):
+        self._cerrar_dialogo()
+        if not historiales:
+            self.result_label.setText("No se encontraron hojas/jugadores en el archivo.")
+            return
+
+        self.result_label.setText(f"Archivo procesado: {self.worker.path.split('/')[-1]} — {len(historiales)} jugadores encontrados.")
+        self.lista_jugadores.clear()
+        for jugador, partidos in historiales.items():
+            self.lista_jugadores.addItem(f"{jugador}: {partidos} partidos")
 
         if nuevos_agregados > 0:
-            QMessageBox.information(self, "Carga exitosa", f"{nuevos_agregados} partidos nuevos agregados.")
+            # Solo se invalidan en la caché las estadísticas de los jugadores afectados
+            # (el store lo hace al incorporar las filas y avisa a las demás páginas)
+            if self.store is not None:
+                self.store.anexar(self.worker.df_agregados)
+            else:
+                cache_estadisticas.invalidar_jugadores(self.worker.jugadores_afectados)
+            self.historial_actualizado.emit(self.worker.jugadores_afectados)
+            QMessageBox.information(self, "Carga exitosa", f"Se procesaron {len(historiales)} jugadores.\n{nuevos_agregados} partidos nuevos agregados.")
         if duplicados > 0:
             QMessageBox.warning(self, "Duplicados detectados", f"{duplicados} partidos ya estaban en el historial y no se agregaron.")
 
-        all_partidos = []
-        for jugador, partidos in historiales.items():
-            for partido in partidos:
-                partido['jugador'] = jugador
-                all_partidos.append(partido)
-
-        import pandas as pd
-        df = pd.DataFrame(all_partidos)
+    def _on_fallo(self, mensaje):
+        self._cerrar_dialogo()
+        self.result_label.setText("Error al procesar el archivo.")
+        QMessageBox.critical(self, "Error", f"Ocurrió un error procesando el archivo:\n{mensaje}")
 
-        # Guarda el DataFrame como tu "base de datos"
-#        guardar_historial(df, "data/historial_general.xlsx")
+    def _on_finalizado(self):
+        if self.worker.cancelado:
+            self._cerrar_dialogo()
+            self.result_label.setText("Importación cancelada. El historial no se ha modificado.")
+        self.btn_cargar.setEnabled(True)
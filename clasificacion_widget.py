@@ -0,0 +1,149 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSpinBox, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView
+)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from historial_store import HistorialStore
+from filtro_tiempo import OPCIONES_TIEMPO
+
+# (título de la columna, columna de calificaciones_liga, decimales)
+COLUMNAS_TABLA = [
+    ("Calificación", 'calificacion', 2),
+    ("Partidos", 'total_partidos', 0),
+    ("Rating medio", 'rating_promedio', 1),
+    ("Rating", 'rating_score', 2),
+    ("Winrate", 'win_score', 2),
+    ("Volumen", 'exp_score', 0),
+    ("Volatilidad", 'volatilidad_score', 0),
+    ("Momentum", 'momentum_score', 0),
+    ("Killer instinct", 'killer_instinct_score', 2),
+    ("Experiencia", 'torneos_score', 0),
+    ("Racha máx.", 'racha_max_score', 0),
+]
+
+class _CalculoClasificacion(QThread):
+    listo = pyqtSignal(int, object)
+    fallo = pyqtSignal(int, str)
+
+    def __init__(self, generacion, df, filas, parent=None):
+        super().__init__(parent)
+        self.generacion = generacion
+        self.df = df
+        # Posiciones de la ventana (HistorialStore.filas_ventana); None = todas
+        self.filas = filas
+
+    def run(self):
+        try:
+            # stat_rating (y todos los módulos de estadísticas) se importa ya en segundo plano
+            from stat_rating import calificaciones_liga
+            df = self.df if self.filas is None else self.df.take(self.filas)
+            self.listo.emit(self.generacion, calificaciones_liga(df))
+        except Exception as e:
+            self.fallo.emit(self.generacion, str(e))
+
+class _ItemNumerico(QTableWidgetItem):
+    """Celda que ordena por el valor numérico y no por el texto mostrado."""
+    def __init__(self, valor, decimales):
+        super().__init__(f"{valor:.{decimales}f}" if valor == valor else "—")
+        self.valor = valor if valor == valor else float('-inf')
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
+    def __lt__(self, otro):
+        if isinstance(otro, _ItemNumerico):
+            return self.valor < otro.valor
+        return super().__lt__(otro)
+
+class ClasificacionWidget(QWidget):
+    """
+    Clasificación de la liga: calificación (1-10) y desglose de todos los
+    jugadores, calculados en una sola pasada con calificaciones_liga() en un
+    hilo aparte. La tabla se ordena pulsando en la cabecera de cada columna.
+    """
+    def __init__(self, store=None):
+        super().__init__()
+        self.store = store if store is not None else HistorialStore()
+        self.store.actualizado.connect(self._on_historial_actualizado)
+        self.setLayout(QVBoxLayout())
+
+        self.titulo = QLabel("<b>Clasificación de la liga</b>")
+        self.titulo.setAlignment(Qt.AlignCenter)
+        self.layout().addWidget(self.titulo)
+
+        filtros = QHBoxLayout()
+        self.filtro_tiempo = QComboBox()
+        self.filtro_tiempo.addItems(OPCIONES_TIEMPO)
+        self.filtro_tiempo.currentIndexChanged.connect(self.refrescar)
+        filtros.addWidget(self.filtro_tiempo, stretch=1)
+        filtros.addWidget(QLabel("Mínimo de partidos:"))
+        self.minimo_partidos = QSpinBox()
+        self.minimo_partidos.setRange(0, 100000)
+        self.minimo_partidos.setSingleStep(10)
+        self.minimo_partidos.valueChanged.connect(self.mostrar_tabla)
+        filtros.addWidget(self.minimo_partidos)
+        self.layout().addLayout(filtros)
+
+        self.estado = QLabel()
+        self.layout().addWidget(self.estado)
+
+        self.tabla = QTableWidget(0, len(COLUMNAS_TABLA) + 2)
+        self.tabla.setHorizontalHeaderLabels(["#", "Jugador"] + [titulo for titulo, _, _ in COLUMNAS_TABLA])
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.tabla.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.tabla.horizontalHeader().setSortIndicator(0, Qt.AscendingOrder)
+        self.layout().addWidget(self.tabla)
+
+        self.clasificacion = None
+        self.generacion = 0
+        self._hilos = []
+        self.refrescar()
+
+    def _on_historial_actualizado(self, jugadores):
+        self.refrescar()
+
+    def refrescar(self):
+        # Nueva generación: un cálculo anterior que termine después se descarta
+        self.generacion += 1
+        if not self.store.cargado:
+            self.estado.setText("Cargando historial…")
+            return
+        if self.store.vacio():
+            self.clasificacion = None
+            self.tabla.setRowCount(0)
+            self.estado.setText("No hay datos en la base de datos.")
+            return
+        self.estado.setText("Calculando clasificación…")
+        hilo = _CalculoClasificacion(self.generacion, self.store.df,
+                                     self.store.filas_ventana(self.filtro_tiempo.currentText()), self)
+        hilo.listo.connect(self._on_calculada)
+        hilo.fallo.connect(self._on_fallo)
+        hilo.finished.connect(lambda: self._hilos.remove(hilo))
+        hilo.finished.connect(hilo.deleteLater)
+        self._hilos.append(hilo)
+        hilo.start()
+
+    def _on_calculada(self, generacion, clasificacion):
+        if generacion != self.generacion:
+            return
+        self.clasificacion = clasificacion
+        self.mostrar_tabla()
+
+    def _on_fallo(self, generacion, error):
+        if generacion == self.generacion:
+            self.estado.setText(f"Error calculando la clasificación: {error}")
+
+    def mostrar_tabla(self):
+        if self.clasificacion is None:
+            return
+        tabla = self.clasificacion[self.clasificacion['total_partidos'] >= self.minimo_partidos.value()]
+        self.tabla.setSortingEnabled(False)
+        self.tabla.setRowCount(len(tabla))
+        for fila, (jugador, datos) in enumerate(tabla.iterrows()):
+            self.tabla.setItem(fila, 0, _ItemNumerico(fila + 1, 0))
+            self.tabla.setItem(fila, 1, QTableWidgetItem(str(jugador)))
+            for col, (_, columna, decimales) in enumerate(COLUMNAS_TABLA, start=2):
+                self.tabla.setItem(fila, col, _ItemNumerico(float(datos[columna]), decimales))
+        self.tabla.setSortingEnabled(True)
+        self.estado.setText(f"{len(tabla)} jugadores · {self.filtro_tiempo.currentText()}")
@@ -1,53 +1,64 @@
 import pandas as pd
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QGroupBox, QScrollArea, QComboBox, QSizePolicy,
-    QCompleter
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QGroupBox, QScrollArea, QComboBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFontMetrics
-from db_manager import cargar_historial
-from stat_core import resumen_global
+from db_manager import cargar_indice_h2h
+from historial_store import HistorialStore
 from stat_ki import killer_instinct_stats
 from stat_streaks import streaks_stats
-from stat_evolution import evolution_stats
-from stat_opponents import opponents_stats
-
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+from stat_evolution import GRANULARIDADES, etiqueta_periodo
+from stat_opponents import opponents_stats, indice_h2h
+from compare import cara_a_cara
+from filtro_tiempo import OPCIONES_TIEMPO
+from stats_cache import cache_estadisticas, clave_ventana
+from modelos_tabla import ModeloEstadisticas, ModeloFilas, VistaEstadisticas, CompletadorNombres
+from graficos import GraficoEvolucion, GraficoMomentum
 
 class CompararJugadoresWidget(QWidget):
-    def __init__(self):
+    def __init__(self, store=None):
         super().__init__()
+        # Historial compartido (MainWindow lo pasa a todas las páginas)
+        self.store = store if store is not None else HistorialStore()
+        self.store.actualizado.connect(self._on_historial_actualizado)
         self.setLayout(QVBoxLayout())
 
         titulo = QLabel("<b>Comparativa de Jugadores</b>")
         titulo.setAlignment(Qt.AlignCenter)
         self.layout().addWidget(titulo)
 
-        self.df = cargar_historial("data/historial_general.xlsx")
-        self.jugadores = sorted(self.df["jugador"].unique()) if not self.df.empty else []
+        self.indice_h2h = None  # se lee la primera vez que se compara
 
         # --- Filtro de tiempo ---
         self.filtro_tiempo = QComboBox()
-        self.filtro_tiempo.addItems([
-            "Todos",
-            "Últimos 6 meses",
-            "Últimos 3 meses",
-            "Mes actual"
-        ])
+        self.filtro_tiempo.addItems(OPCIONES_TIEMPO)
         self.filtro_tiempo.currentIndexChanged.connect(self.refrescar)
         self.layout().addWidget(self.filtro_tiempo)
 
+        # --- Granularidad de la evolución (las series salen de la caché: cambiarla es inmediato) ---
+        self.granularidad_evo = QComboBox()
+        for granularidad, (etiqueta, _) in GRANULARIDADES.items():
+            self.granularidad_evo.addItem(etiqueta, granularidad)
+        self.granularidad_evo.setCurrentIndex(list(GRANULARIDADES).index('mes'))
+        self.granularidad_evo.currentIndexChanged.connect(self._mostrar_evolucion)
+        self.layout().addWidget(self.granularidad_evo)
+
         # --- Buscador de jugadores con autocompletado ---
+        # Al escribir se espera a que el texto deje de cambiar antes de comparar
+        self.timer_refresco = QTimer(self)
+        self.timer_refresco.setSingleShot(True)
+        self.timer_refresco.setInterval(250)
+        self.timer_refresco.timeout.connect(self.refrescar)
         panel_selectores = QHBoxLayout()
 
         # Buscador 1
         self.buscador_1 = QLineEdit()
         self.buscador_1.setPlaceholderText("Jugador 1")
-        self.completer_1 = QCompleter(self.jugadores)
-        self.completer_1.setCaseSensitivity(False)
+        # Sugerencias del índice de nombres: sin tildes y tolerantes a erratas
+        self.completer_1 = CompletadorNombres(self.store.indice_nombres, parent=self)
         self.buscador_1.setCompleter(self.completer_1)
-        self.buscador_1.textChanged.connect(lambda: self.refrescar())
+        self.buscador_1.textChanged.connect(self.timer_refresco.start)
         panel_selectores.addWidget(self.buscador_1, 1)
 
         # Espacio central
@@ -58,10 +69,9 @@ class CompararJugadoresWidget(QWidget):
         # Buscador 2
         self.buscador_2 = QLineEdit()
         self.buscador_2.setPlaceholderText("Jugador 2")
-        self.completer_2 = QCompleter(self.jugadores)
-        self.completer_2.setCaseSensitivity(False)
+        self.completer_2 = CompletadorNombres(self.store.indice_nombres, parent=self)
         self.buscador_2.setCompleter(self.completer_2)
-        self.buscador_2.textChanged.connect(lambda: self.refrescar())
+        self.buscador_2.textChanged.connect(self.timer_refresco.start)
         panel_selectores.addWidget(self.buscador_2, 1)
 
         self.layout().addLayout(panel_selectores)
@@ -77,211 +87,153 @@ class CompararJugadoresWidget(QWidget):
         self.scroll_area.setWidget(self.scroll_content)
         self.layout().addWidget(self.scroll_area)
 
+        # --- Secciones persistentes: se crean una vez y cada comparación solo cambia sus datos ---
+        self.modelo_resumen = ModeloEstadisticas(columnas=2)
+        self.group_resumen = self._grupo_tabla("Resumen Global", VistaEstadisticas(self.modelo_resumen))
+        self.modelo_h2h = ModeloEstadisticas(columnas=2, max_chars_clave=32, max_chars_valor=20)
+        self.vista_h2h = VistaEstadisticas(self.modelo_h2h)
+        self.group_h2h = self._grupo_tabla("Cara a cara", self.vista_h2h)
+        self.sin_h2h = QLabel("Sin enfrentamientos directos.")
+        self.group_h2h.layout().addWidget(self.sin_h2h)
+        self.modelo_ki = ModeloEstadisticas(columnas=2, max_chars_clave=32, max_chars_valor=20)
+        self.group_ki = self._grupo_tabla("Killer Instinct", VistaEstadisticas(self.modelo_ki))
+        self.modelo_rachas = ModeloEstadisticas(columnas=2, max_chars_clave=32, max_chars_valor=20)
+        self.group_rachas = self._grupo_tabla("Rachas", VistaEstadisticas(self.modelo_rachas))
+
+        self.evo_canvas = [GraficoEvolucion(3.2, 2, con_rango=False) for _ in range(2)]
+        self.group_evo = self._grupo_vs("Evolución Rating", self.evo_canvas)
+        self.momentum_canvas = [GraficoMomentum(3.2, 1.2) for _ in range(2)]
+        self.group_momentum = self._grupo_vs("Momentum (últimos 20 partidos)", self.momentum_canvas)
+        self.modelos_rivales = [ModeloFilas(["Rival", "Enfrentamientos", "Winrate"]) for _ in range(2)]
+        self.group_opp = self._grupo_vs("Principales Rivales", [VistaEstadisticas(m) for m in self.modelos_rivales])
+
+        self.grupos = [self.group_resumen, self.group_h2h, self.group_ki, self.group_rachas, self.group_evo,
+                       self.group_momentum, self.group_opp]
+        for grupo in self.grupos:
+            grupo.hide()
+            self.comparacion_layout.addWidget(grupo)
+        self.comparacion_layout.addStretch()
+
+        # Datos mostrados de cada lado: solo se recalcula el lado cuyo jugador (o ventana) cambió
+        self.lados = [None, None]
+        self.comparando = False
+
         self.refrescar()
 
-    def get_df_filtrado_tiempo(self, df):
-        if df is None or df.empty:
-            return df
-        opcion = self.filtro_tiempo.currentText()
-        hoy = pd.Timestamp.today().normalize()
-        if opcion == "Todos":
-            return df
-        df = df.copy()
-        df['fecha_dt'] = pd.to_datetime(df['fecha'], errors='coerce')
-        if opcion == "Últimos 6 meses":
-            desde = hoy - pd.DateOffset(months=6)
-            return df[df['fecha_dt'] >= desde]
-        elif opcion == "Últimos 3 meses":
-            desde = hoy - pd.DateOffset(months=3)
-            return df[df['fecha_dt'] >= desde]
-        elif opcion == "Mes actual":
-            return df[df['fecha_dt'].dt.month == hoy.month]
-        return df
+    def _grupo_tabla(self, titulo, vista):
+        grupo = QGroupBox(titulo)
+        grupo.setLayout(QVBoxLayout())
+        grupo.layout().addWidget(vista)
+        return grupo
 
-    def refrescar(self):
-        # Limpia la vista anterior
-        for i in reversed(range(self.comparacion_layout.count())):
-            item = self.comparacion_layout.itemAt(i)
-            widget = item.widget()
-            if widget:
-                widget.setParent(None)
+    def _grupo_vs(self, titulo, widgets):
+        grupo = QGroupBox(titulo)
+        grupo.setLayout(QHBoxLayout())
+        grupo.layout().addWidget(widgets[0])
+        grupo.layout().addWidget(QLabel("VS"))
+        grupo.layout().addWidget(widgets[1])
+        return grupo
 
-        jugador1 = self.buscador_1.text().strip()
-        jugador2 = self.buscador_2.text().strip()
-        if not (jugador1 and jugador2 and jugador1 in self.jugadores and jugador2 in self.jugadores):
+    def refrescar(self):
+        self.timer_refresco.stop()
+        jugadores = [self.buscador_1.text().strip(), self.buscador_2.text().strip()]
+        self.comparando = all(jugador and jugador in self.store for jugador in jugadores)
+        if not self.comparando:
+            for grupo in self.grupos:
+                grupo.hide()
             return
 
-        df1 = self.df[self.df["jugador"] == jugador1]
-        df2 = self.df[self.df["jugador"] == jugador2]
-        df1_f = self.get_df_filtrado_tiempo(df1)
-        df2_f = self.get_df_filtrado_tiempo(df2)
-
-        # === RESUMEN GLOBAL EN FICHA, DISEÑO LIMPIO, CENTRADO Y AJUSTADO ===
-        resumen1 = resumen_global(df1_f).get(jugador1, {})
-        resumen2 = resumen_global(df2_f).get(jugador2, {})
-        resumen_keys = list(resumen1.keys()) if resumen1 else list(resumen2.keys())
-
-        group_resumen = QGroupBox("Resumen Global")
-        group_resumen.setLayout(QVBoxLayout())
-
-        # Encabezado centrado
-        header = QHBoxLayout()
-        lbl_est = QLabel("<b>Estadística</b>")
-        lbl_est.setAlignment(Qt.AlignCenter)
-        lbl_est.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        lbl_j1 = QLabel(f"<b>{jugador1}</b>")
-        lbl_j1.setAlignment(Qt.AlignCenter)
-        lbl_j1.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        lbl_j2 = QLabel(f"<b>{jugador2}</b>")
-        lbl_j2.setAlignment(Qt.AlignCenter)
-        lbl_j2.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-        header.addWidget(lbl_est, 2)
-        header.addWidget(lbl_j1, 1)
-        header.addWidget(lbl_j2, 1)
-        group_resumen.layout().addLayout(header)
-
-        # Fila por estadística, todo centrado y bien alineado
-        for key in resumen_keys:
-            fila = QHBoxLayout()
-            lbl_key = QLabel(self._elide_text(key.replace("_", " ").capitalize(), max_chars=42))
-            lbl_key.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            lbl_key.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-            lbl1 = QLabel(self._elide_text(str(resumen1.get(key, "")), max_chars=42))
-            lbl1.setAlignment(Qt.AlignCenter)
-            lbl1.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-            lbl2 = QLabel(self._elide_text(str(resumen2.get(key, "")), max_chars=42))
-            lbl2.setAlignment(Qt.AlignCenter)
-            lbl2.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
-            fila.addWidget(lbl_key, 2)
-            fila.addWidget(lbl1, 1)
-            fila.addWidget(lbl2, 1)
-            group_resumen.layout().addLayout(fila)
-
-        self.comparacion_layout.addWidget(group_resumen)
-
-        # === KILLER INSTINCT (Ficha estilo original) ===
-        ki1 = killer_instinct_stats(df1_f).get(jugador1, {})
-        ki2 = killer_instinct_stats(df2_f).get(jugador2, {})
-        group_ki = QGroupBox("Killer Instinct")
-        group_ki.setLayout(QVBoxLayout())
-        header_ki = QHBoxLayout()
-        header_ki.addWidget(QLabel("<b>Estadística</b>"), 2)
-        header_ki.addWidget(QLabel(f"<b>{jugador1}</b>"), 1)
-        header_ki.addWidget(QLabel(f"<b>{jugador2}</b>"), 1)
-        group_ki.layout().addLayout(header_ki)
-        for key in ki1.keys():
-            fila = QHBoxLayout()
-            fila.addWidget(QLabel(self._elide_text(key.replace("_", " ").capitalize(), max_chars=32)), 2)
-            fila.addWidget(QLabel(self._elide_text(str(ki1.get(key, "")), max_chars=20)), 1)
-            fila.addWidget(QLabel(self._elide_text(str(ki2.get(key, "")), max_chars=20)), 1)
-            group_ki.layout().addLayout(fila)
-        self.comparacion_layout.addWidget(group_ki)
-
-        # === RACHAS (Ficha estilo original) ===
-        streak1 = streaks_stats(df1_f).get(jugador1, {})
-        streak2 = streaks_stats(df2_f).get(jugador2, {})
-        group_rachas = QGroupBox("Rachas")
-        group_rachas.setLayout(QVBoxLayout())
-        header_rachas = QHBoxLayout()
-        header_rachas.addWidget(QLabel("<b>Estadística</b>"), 2)
-        header_rachas.addWidget(QLabel(f"<b>{jugador1}</b>"), 1)
-        header_rachas.addWidget(QLabel(f"<b>{jugador2}</b>"), 1)
-        group_rachas.layout().addLayout(header_rachas)
-        for key in streak1.keys():
-            fila = QHBoxLayout()
-            fila.addWidget(QLabel(self._elide_text(key.replace("_", " ").capitalize(), max_chars=32)), 2)
-            fila.addWidget(QLabel(self._elide_text(str(streak1.get(key, "")), max_chars=20)), 1)
-            fila.addWidget(QLabel(self._elide_text(str(streak2.get(key, "")), max_chars=20)), 1)
-            group_rachas.layout().addLayout(fila)
-        self.comparacion_layout.addWidget(group_rachas)
-
-        # === EVOLUCIÓN RATING (Gráficos alineados) ===
-        evo1 = evolution_stats(df1_f)
-        evo2 = evolution_stats(df2_f)
-        if not evo1.empty or not evo2.empty:
-            group_evo = QGroupBox("Evolución Rating")
-            group_evo.setLayout(QHBoxLayout())
-            canvas1 = self.plot_evo_canvas(evo1, jugador1)
-            canvas2 = self.plot_evo_canvas(evo2, jugador2)
-            group_evo.layout().addWidget(canvas1)
-            group_evo.layout().addWidget(QLabel("VS"))
-            group_evo.layout().addWidget(canvas2)
-            self.comparacion_layout.addWidget(group_evo)
-
-        # === MOMENTUM (Gráficos alineados) ===
-        ult1 = df1_f.tail(20)
-        ult2 = df2_f.tail(20)
-        group_momentum = QGroupBox("Momentum (últimos 20 partidos)")
-        group_momentum.setLayout(QHBoxLayout())
-        canvas1 = self.plot_momentum_canvas(ult1)
-        canvas2 = self.plot_momentum_canvas(ult2)
-        group_momentum.layout().addWidget(canvas1)
-        group_momentum.layout().addWidget(QLabel("VS"))
-        group_momentum.layout().addWidget(canvas2)
-        self.comparacion_layout.addWidget(group_momentum)
-
-        # === PRINCIPALES RIVALES (Tabla alineada, estilo ficha) ===
-        opp1 = opponents_stats(df1_f, top_n=5).get(jugador1, {})
-        opp2 = opponents_stats(df2_f, top_n=5).get(jugador2, {})
-        group_opp = QGroupBox("Principales Rivales")
-        group_opp.setLayout(QHBoxLayout())
-        group_opp.layout().addWidget(self.rivales_table(opp1))
-        group_opp.layout().addWidget(QLabel("VS"))
-        group_opp.layout().addWidget(self.rivales_table(opp2))
-        self.comparacion_layout.addWidget(group_opp)
-
-    def _elide_text(self, text, max_chars=30):
-        """Reduce el texto si es muy largo para evitar desbordes y scroll horizontal."""
-        if len(text) > max_chars:
-            return text[:max_chars-2] + "…"
-        return text
-
-    def plot_evo_canvas(self, evo, jugador):
-        fig, ax = plt.subplots(figsize=(3.2, 2), dpi=90)
-        if not evo.empty and jugador in evo.columns:
-            evo = evo.tail(12)
-            meses = [mes.strftime('%Y-%m') for mes in evo.index]
-            ratings = [evo[jugador][mes] if pd.notnull(evo[jugador][mes]) else None for mes in evo.index]
-            if any(r is not None for r in ratings):
-                ax.plot(meses, ratings, marker='o', color='#1f77b4')
-                ax.set_title('Rating')
-                ax.set_xlabel('Mes')
-                ax.grid(True, linestyle=':')
-                ax.tick_params(axis='x', rotation=45)
-        ax.set_ylim(bottom=0)
-        fig.tight_layout()
-        canvas = FigureCanvas(fig)
-        canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        return canvas
-
-    def plot_momentum_canvas(self, ultimos):
-        fig, ax = plt.subplots(figsize=(3.2, 1.2), dpi=90)
-        if not ultimos.empty:
-            resultados = list(ultimos['gano'])
-            colores = ['#4CAF50' if res == 1 else '#E53935' if res == 0 else '#9E9E9E' for res in resultados]
-            ax.bar(range(1, len(resultados)+1), [1]*len(resultados), color=colores, edgecolor='black')
-            ax.set_ylim(0, 1.3)
-            ax.set_xlim(0.5, len(resultados)+0.5)
-            ax.set_yticks([])
-            ax.set_xticks(range(1, len(resultados)+1))
-            ax.set_title('Momentum')
-            ax.tick_params(axis='x', labelrotation=0)
+        opcion = self.filtro_tiempo.currentText()
+        cambiados = [lado for lado, jugador in enumerate(jugadores) if self._actualizar_lado(lado, jugador, opcion)]
+        if cambiados:
+            self._mostrar_h2h(opcion)
+        for grupo in self.grupos:
+            grupo.show()
+        self._mostrar_evolucion(redibujar=bool(cambiados))
+
+    def _actualizar_lado(self, lado, jugador, opcion):
+        """
+        Recalcula y muestra un lado de la comparación si su jugador, la ventana
+        de tiempo o los datos del jugador cambiaron. Devuelve si cambió.
+        """
+        clave = (jugador, clave_ventana(opcion), cache_estadisticas.version_jugador(jugador))
+        if self.lados[lado] is not None and self.lados[lado]['clave'] == clave:
+            return False
+        # Ventana de tiempo recortada por búsqueda binaria en el historial compartido
+        df_f = self.store.partidos_jugador(jugador, opcion)
+        datos = {
+            'clave': clave,
+            'jugador': jugador,
+            'df': df_f,
+            'resumen': self._estadistica(jugador, 'resumen', lambda: self.store.resumen_jugador(jugador, opcion)),
+            'ki': self._estadistica(jugador, 'ki', lambda: killer_instinct_stats(df_f).get(jugador, {})),
+            'rachas': self._estadistica(jugador, 'rachas', lambda: streaks_stats(df_f).get(jugador, {})),
+            'evolucion': self._estadistica(jugador, 'evolucion', lambda: self.store.evolucion_jugador(jugador, opcion)),
+            'rivales': self._estadistica(jugador, 'rivales', lambda: opponents_stats(df_f, top_n=5).get(jugador, {})),
+        }
+        self.lados[lado] = datos
+
+        self.modelo_resumen.actualizar_columna(lado, jugador, datos['resumen'])
+        self.modelo_ki.actualizar_columna(lado, jugador, datos['ki'])
+        self.modelo_rachas.actualizar_columna(lado, jugador, datos['rachas'])
+        self.plot_momentum_canvas(self.momentum_canvas[lado], df_f.tail(20))
+        self.modelos_rivales[lado].actualizar(self.rivales_filas(datos['rivales']))
+        return True
+
+    def _mostrar_h2h(self, opcion):
+        # Cara a cara (enfrentamientos directos): depende de los dos lados
+        jugador1, jugador2 = (datos['jugador'] for datos in self.lados)
+        if opcion == "Todos":
+            if self.indice_h2h is None:
+                self.indice_h2h = cargar_indice_h2h(self.store.archivo)
+            indice = self.indice_h2h
         else:
-            ax.set_title("Sin datos")
-        fig.tight_layout()
-        canvas = FigureCanvas(fig)
-        canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        return canvas
-
-    def rivales_table(self, opp):
+            # Con filtro de tiempo basta con indexar los partidos entre ambos
+            df1_f, df2_f = (datos['df'] for datos in self.lados)
+            indice = indice_h2h(pd.concat([df1_f[df1_f["rival"] == jugador2], df2_f[df2_f["rival"] == jugador1]]))
+        h2h = cara_a_cara(indice, jugador1, jugador2)
+        for lado, jugador in enumerate([jugador1, jugador2]):
+            self.modelo_h2h.actualizar_columna(lado, jugador, h2h[jugador] if h2h else {})
+        self.vista_h2h.setVisible(bool(h2h))
+        self.sin_h2h.setVisible(not h2h)
+
+    def _mostrar_evolucion(self, redibujar=True):
+        # Las series de todas las granularidades ya están calculadas: cambiarla solo redibuja
+        if not self.comparando:
+            return
+        granularidad = self.granularidad_evo.currentData()
+        evos = [datos['evolucion'][granularidad] for datos in self.lados]
+        if redibujar:
+            for canvas, evo in zip(self.evo_canvas, evos):
+                self.plot_evo_canvas(canvas, evo, granularidad)
+        self.group_evo.setVisible(not all(evo.empty for evo in evos))
+
+    def _estadistica(self, jugador, modulo, calcular):
+        """Resultado de un módulo de estadísticas, compartido con la ficha a través de la caché."""
+        return cache_estadisticas.obtener(jugador, self.filtro_tiempo.currentText(), modulo, calcular, self.store.version_datos)
+
+    def _on_historial_actualizado(self, jugadores):
+        # El índice crece con las importaciones; tras una recarga es otro objeto
+        self.completer_1.establecer_indice(self.store.indice_nombres)
+        self.completer_2.establecer_indice(self.store.indice_nombres)
+        self.indice_h2h = None
+        if {self.buscador_1.text().strip(), self.buscador_2.text().strip()} & set(jugadores):
+            self.refrescar()
+
+    def plot_evo_canvas(self, canvas, evo, granularidad):
+        evo = evo.tail(12)
+        periodos = [etiqueta_periodo(inicio, granularidad) for inicio in evo.index]
+        canvas.actualizar(periodos, evo['rating_medio'] if not evo.empty else [],
+                          xlabel=GRANULARIDADES[granularidad][0])
+
+    def plot_momentum_canvas(self, canvas, ultimos):
+        canvas.actualizar(list(ultimos['gano'].astype(float)) if not ultimos.empty else [])
+
+    def rivales_filas(self, opp):
         rivales = opp.get('top_rivales', {})
         winrates = opp.get('winrate_por_rival', {})
-        html = "<table border='1' cellpadding='2'><tr><th>Rival</th><th>Enfrentamientos</th><th>Winrate</th></tr>"
+        filas = []
         for rival, enfrent in rivales.items():
             wr = winrates.get(rival, None)
-            wr_str = f"{wr*100:.1f}%" if wr is not None else "-"
-            html += f"<tr><td>{rival}</td><td>{enfrent}</td><td>{wr_str}</td></tr>"
-        html += "</table>"
-        lbl = QLabel(html)
-        lbl.setWordWrap(True)
-        return lbl
\ No newline at end of file
+            filas.append([rival, enfrent, f"{wr*100:.1f}%" if wr is not None else "-"])
+        return filas
\ No newline at end of file
@@ -1,3 +1,5 @@
+from stat_opponents import enfrentamiento
+
 def comparar_jugadores(df, jugador_a, jugador_b):
     """
     Compara métricas básicas entre dos jugadores.
@@ -15,4 +17,35 @@ def comparar_jugadores(df, jugador_a, jugador_b):
             'winrate': b['gano'].mean(),
             'delta_promedio': b['delta'].mean()
         }
-    }
\ No newline at end of file
+    }
+
+def cara_a_cara(indice, jugador_a, jugador_b):
+    """
+    Enfrentamientos directos entre dos jugadores a partir del índice (jugador, rival)
+    de stat_opponents. Cada partido puede estar en el historial de los dos
+    jugadores; se usa el registro de jugador_a y, si no existe, el de jugador_b
+    visto desde el otro lado. Devuelve None si nunca se enfrentaron.
+    """
+    ab = enfrentamiento(indice, jugador_a, jugador_b)
+    ba = enfrentamiento(indice, jugador_b, jugador_a)
+    if ab is None and ba is None:
+        return None
+    if ab is None:
+        visto_desde_b = cara_a_cara(indice, jugador_b, jugador_a)
+        return {jugador_a: visto_desde_b[jugador_a], jugador_b: visto_desde_b[jugador_b]}
+    return {
+        jugador_a: {
+            'partidos': int(ab['partidos']),
+            'victorias': int(ab['victorias']),
+            'sets': int(ab['sets_ganados']),
+            'puntos': int(ab['puntos_favor']),
+            'delta_total': round(ab['delta_suma'], 2)
+        },
+        jugador_b: {
+            'partidos': int(ab['partidos']),
+            'victorias': int(ab['con_resultado'] - ab['victorias']),
+            'sets': int(ab['sets_perdidos']),
+            'puntos': int(ab['puntos_contra']),
+            'delta_total': round(ba['delta_suma'], 2) if ba is not None else None
+        }
+    }
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from esquema_historial import tipar_historial
+
+# Torneos de prueba por jugador: (fecha, hora_torneo, torneo, posición final,
+# partidos [(hora, ronda, rival, resultado, delta)]). Las fechas caen en meses
+# distintos y las horas no llevan cero delante, así que el orden alfabético de
+# 'fecha' y 'hora' no es el cronológico ("12 Mar 2024" < "9 Jan 2024",
+# "10:05" < "9:40").
+TORNEOS = {
+    "Ana": [
+        ("9 Jan 2024", "9:00", "Liga 1", "1", [
+            ("9:40", "Group", "Beto", "3:0", 1.5), ("10:05", "Semifinal", "Caro", "3:1", 2.0),
+            ("11:30", "Final", "Dani", "3:2", 2.5)]),
+        ("12 Mar 2024", "20:00", "Liga 2", "3", [
+            ("20:15", "Group", "Caro", "1:3", -1.0), ("21:10", "Group", "Beto", "3:1", 0.5),
+            ("22:45", "3rd", "Dani", "0:3", -2.0)]),
+        ("2 Feb 2024", "8:30", "Liga 1", "2", [
+            ("8:50", "Group", "Dani", "3:1", 1.0), ("9:55", "Final", "Beto", "2:3", -1.5)]),
+        ("28 Apr 2024", "18:00", "Copa", "4", [
+            ("18:20", "Group", "Beto", "0:3", -2.5), ("19:05", "Group", "Caro", "1:3", -1.0),
+            ("21:40", "Quarterfinal", "Dani", "3:0", 1.0)]),
+        ("5 May 2024", "10:00", "Liga 2", "1", [
+            ("10:10", "Group", "Dani", "3:0", 2.0), ("11:00", "Semifinal", "Beto", "3:2", 1.5),
+            ("12:20", "Final", "Caro", "3:1", 3.0)]),
+    ],
+    "Beto": [
+        ("15 Feb 2024", "19:00", "Liga 1", "2", [
+            ("19:30", "Group", "Ana", "3:1", 1.0), ("20:40", "Final", "Caro", "0:3", -2.0)]),
+        ("3 Jan 2024", "9:00", "Copa", "1", [
+            ("9:15", "Group", "Dani", "3:0", 2.0), ("10:20", "Final", "Ana", "3:2", 1.5)]),
+        ("20 Mar 2024", "21:00", "Liga 2", "3", [
+            ("21:05", "Group", "Caro", "1:3", -1.5), ("23:10", "3rd", "Dani", "3:1", 0.5)]),
+    ],
+}
+RATINGS = {"Ana": 700, "Beto": 650, "Caro": 720, "Dani": 610}
+SETS = {"3:0": "11-5 11-7 11-9", "3:1": "11-5 9-11 11-7 11-8", "3:2": "11-5 9-11 11-7 8-11 12-10",
+        "0:3": "5-11 7-11 9-11", "1:3": "11-5 9-11 7-11 8-11", "2:3": "11-5 9-11 11-7 8-11 10-12"}
+
+def historial_de_prueba():
+    """Historial pequeño (sin tipar) con los partidos de TORNEOS, en un orden que no es el cronológico."""
+    filas = []
+    for jugador, torneos in TORNEOS.items():
+        for fecha, hora_torneo, torneo, posicion, partidos in torneos:
+            delta_total = 0.0
+            for hora, ronda, rival, resultado, delta in partidos:
+                delta_total += delta
+                filas.append({
+                    'fecha': fecha, 'hora_torneo': hora_torneo, 'torneo': torneo,
+                    'rating_jugador': RATINGS[jugador], 'posicion': posicion, 'delta_total': delta_total,
+                    'hora': hora, 'ronda': ronda, 'rival': rival, 'rating_rival': RATINGS[rival],
+                    'resultado': resultado, 'sets': SETS[resultado], 'delta': delta, 'jugador': jugador,
+                    'gano': int(resultado[0] > resultado[2]),
+                })
+    # Filas alternadas entre jugadores y de atrás adelante
+    return pd.DataFrame(filas[::-1]).sort_values('rival', kind='stable').reset_index(drop=True)
+
+@pytest.fixture
+def partidos():
+    return tipar_historial(historial_de_prueba())
+
+def comparable(valor):
+    """Resumen con los NaN como None (NaN != NaN) para comparar dicts con ==."""
+    if isinstance(valor, dict):
+        return {clave: comparable(v) for clave, v in valor.items()}
+    if isinstance(valor, float) and valor != valor:
+        return None
+    return valor
@@ -1,15 +1,83 @@
 import numpy as np
 import pandas as pd
+import glob
+import json
 import os
+import shutil
+from agregados import AgregadosHistorial, tablas_agregados, tablas_vacias, combinar_tablas
+from esquema_historial import tipar_historial
+from stat_core import derivar_columnas
+from stat_opponents import indice_h2h, sumar_indices_h2h
+
+# El historial maestro se guarda en formato columnar (Parquet) dentro de un
+# directorio hermano del .xlsx: "data/historial_general.xlsx" se almacena en
+# "data/historial_general.parquet/". El Excel queda solo para importar/exportar.
+COLUMNAS_CLAVE = ['jugador', 'fecha', 'torneo', 'hora', 'rival', 'ronda']
+
+def ruta_columnar(archivo):
+    """Devuelve el directorio Parquet asociado a la ruta del historial."""
+    base, _ = os.path.splitext(archivo)
+    return base + ".parquet"
+
+def _partes_historial(directorio):
+    return sorted(glob.glob(os.path.join(directorio, "parte-*.parquet")))
+
+def _preparar_columnar(df):
+    """
+    Parquet necesita columnas de un solo tipo. Las columnas de texto que vienen
+    de Excel pueden mezclar números y cadenas (ej. 'posicion'), así que se
+    convierten a texto conservando los nulos. Después se aplica el esquema
+    tipado (esquema_historial), de modo que cada parte se guarda ya tipada.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return tipar_historial(df)
+
+def migrar_historial_excel(archivo):
+    """
+    Migración única: lee el .xlsx existente y lo guarda en formato columnar.
+    El Excel original no se borra.
+    """
+    df = _preparar_columnar(pd.read_excel(archivo))
+    guardar_historial(df, archivo)
+    print(f"Historial migrado a formato columnar: {ruta_columnar(archivo)} ({len(df)} partidos).")
+    return df
 
 def cargar_historial(archivo):
-    if os.path.exists(archivo):
-        return pd.read_excel(archivo)
-    else:
+    ruta = ruta_columnar(archivo)
+    if not os.path.isdir(ruta):
+        # Primera ejecución con un historial en Excel: se migra una sola vez
+        if os.path.exists(archivo) and archivo.lower().endswith(('.xlsx', '.xls')):
+            return migrar_historial_excel(archivo)
         return pd.DataFrame()
+    partes = _partes_historial(ruta)
+    if not partes:
+        return pd.DataFrame()
+    dfs = [pd.read_parquet(parte) for parte in partes]
+    # Las partes antiguas pueden no estar tipadas, y al concatenar las categorías se pierden
+    return tipar_historial(dfs[0] if len(dfs) == 1 else pd.concat(dfs, ignore_index=True))
 
 def guardar_historial(df, archivo):
-    df.to_excel(archivo, index=False)
+    """Reescribe el historial completo. Se escribe en un directorio temporal y luego se reemplaza."""
+    ruta = ruta_columnar(archivo)
+    tmp = ruta + ".tmp"
+    viejo = ruta + ".old"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    _preparar_columnar(df).to_parquet(os.path.join(tmp, "parte-00000.parquet"), index=False)
+    if os.path.isdir(ruta):
+        shutil.rmtree(viejo, ignore_errors=True)
+        os.replace(ruta, viejo)
+    os.replace(tmp, ruta)
+    shutil.rmtree(viejo, ignore_errors=True)
+
+def exportar_historial_excel(archivo, archivo_excel=None):
+    """Exporta el historial columnar a Excel (por defecto sobre la ruta .xlsx original)."""
+    df = cargar_historial(archivo)
+    df.to_excel(archivo_excel or archivo, index=False)
+    return len(df)
 
 def arreglar_historial(archivo="data/historial_general.xlsx"):
     def calcular_gano(row):
@@ -22,7 +90,7 @@ def arreglar_historial(archivo="data/historial_general.xlsx"):
             pass
         return None
 
-    df = pd.read_excel(archivo)
+    df = cargar_historial(archivo)
     if 'resultado' not in df.columns:
         print("No hay columna 'resultado'.")
         return
@@ -30,38 +98,314 @@ def arreglar_historial(archivo="data/historial_general.xlsx"):
     if 'gano' not in df.columns:
         df['gano'] = df.apply(calcular_gano, axis=1)
         df['gano'] = df['gano'].astype('Int64')  # Int64 soporta nulos
-        df.to_excel(archivo, index=False)
+        guardar_historial(df, archivo)
         print("Columna 'gano' añadida y calculada para todos los partidos. (1 = ganó, 0 = perdió, <NA> = error o sin resultado)")
     else:
         mask_necesita = df['gano'].isnull()
         if mask_necesita.any():
             df.loc[mask_necesita, 'gano'] = df.loc[mask_necesita].apply(calcular_gano, axis=1)
             df['gano'] = df['gano'].astype('Int64')
-            df.to_excel(archivo, index=False)
+            guardar_historial(df, archivo)
             print(f"Columna 'gano' recalculada/actualizada para {mask_necesita.sum()} filas nuevas. (1 = ganó, 0 = perdió, <NA> = error o sin resultado)")
         else:
             print("Todas las filas ya tienen calculado 'gano'. No se hicieron cambios.")
 
-def actualizar_historial_sin_duplicados(archivo_general, nuevos_historiales):
-    df_general = cargar_historial(archivo_general)
+def _historiales_a_df(nuevos_historiales):
     all_nuevos = []
     for jugador, partidos in nuevos_historiales.items():
         for partido in partidos:
             partido['jugador'] = jugador
             all_nuevos.append(partido)
-    df_nuevos = pd.DataFrame(all_nuevos)
+    return pd.DataFrame(all_nuevos)
 
-    if df_general.empty:
-        guardar_historial(df_nuevos, archivo_general)
-        arreglar_historial(archivo_general)
-        return len(df_nuevos), 0
+def calcular_gano_columna(resultado):
+    """Versión vectorizada de calcular_gano: 1 = ganó, 0 = perdió, <NA> = sin resultado válido."""
+    partes = resultado.astype('string').str.extract(r'^\s*([+-]?\d+)\s*:\s*([+-]?\d+)\s*$')
+    sets_ganados = pd.to_numeric(partes[0])
+    sets_perdidos = pd.to_numeric(partes[1])
+    gano = (sets_ganados > sets_perdidos).astype('Int64')
+    gano[sets_ganados.isna() | sets_perdidos.isna()] = pd.NA
+    return gano
 
-    df_total = pd.concat([df_general, df_nuevos], ignore_index=True)
-    clave = ['jugador', 'fecha', 'torneo', 'hora', 'rival', 'ronda']
-    df_sin_duplicados = df_total.drop_duplicates(subset=clave, keep='first')
-    nuevos_agregados = len(df_sin_duplicados) - len(df_general)
-    duplicados = len(df_nuevos) - nuevos_agregados
+# --- Índice persistente de claves de partido ---
+# Cada partido se identifica por el hash (uint64) de sus COLUMNAS_CLAVE.
+# El índice vive dentro del directorio columnar en dos ficheros:
+#   claves.npy         -> hashes ordenados (se abre con mmap, búsqueda binaria)
+#   claves-nuevas.bin  -> hashes añadidos después, sin ordenar (solo se anexa)
+# Cuando el log crece demasiado se fusiona en claves.npy.
+MAX_CLAVES_LOG = 100_000
+MAX_PARTES = 64
+
+def hash_claves(df):
+    return pd.util.hash_pandas_object(df[COLUMNAS_CLAVE].astype('string'), index=False).to_numpy(np.uint64)
+
+def _rutas_indice(archivo):
+    ruta = ruta_columnar(archivo)
+    return os.path.join(ruta, "claves.npy"), os.path.join(ruta, "claves-nuevas.bin")
+
+def _filas_en_partes(partes):
+    import pyarrow.parquet as pq
+    return sum(pq.read_metadata(parte).num_rows for parte in partes)
+
+def _escribir_indice_ordenado(archivo, claves):
+    ruta_ordenado, ruta_log = _rutas_indice(archivo)
+    tmp = ruta_ordenado + ".tmp.npy"
+    ordenado = np.sort(claves.astype(np.uint64))
+    np.save(tmp, ordenado)
+    os.replace(tmp, ruta_ordenado)
+    if os.path.exists(ruta_log):
+        os.remove(ruta_log)
+    return ordenado
+
+def reconstruir_indice_claves(archivo):
+    df = cargar_historial(archivo)
+    claves = hash_claves(df) if not df.empty else np.empty(0, dtype=np.uint64)
+    return _escribir_indice_ordenado(archivo, claves)
+
+def _cargar_indice_claves(archivo):
+    """Devuelve (claves_ordenadas, claves_log). Reconstruye el índice si falta o no cuadra con los datos."""
+    ruta_ordenado, ruta_log = _rutas_indice(archivo)
+    if os.path.exists(ruta_ordenado):
+        ordenado = np.load(ruta_ordenado, mmap_mode='r')
+        log = np.fromfile(ruta_log, dtype=np.uint64) if os.path.exists(ruta_log) else np.empty(0, dtype=np.uint64)
+        if len(ordenado) + len(log) == _filas_en_partes(_partes_historial(ruta_columnar(archivo))):
+            return ordenado, log
+    return reconstruir_indice_claves(archivo), np.empty(0, dtype=np.uint64)
+
+def _claves_existentes(claves, ordenado, log):
+    if len(ordenado):
+        pos = np.searchsorted(ordenado, claves)
+        existe = ordenado[np.minimum(pos, len(ordenado) - 1)] == claves
+    else:
+        existe = np.zeros(len(claves), dtype=bool)
+    if len(log):
+        existe |= np.isin(claves, log)
+    return existe
+
+def compactar_historial(archivo):
+    """Une todas las partes en una sola y regenera el índice de claves."""
+    df = cargar_historial(archivo)
+    guardar_historial(df, archivo)
+    reconstruir_indice_claves(archivo)
+
+# --- Índice cara a cara persistente ---
+# El índice (jugador, rival) de stat_opponents se guarda como h2h.parquet dentro
+# del directorio columnar. Es aditivo: al anexar partidos se suma el índice de
+# las filas nuevas. Si falta o no cuadra con el historial se reconstruye.
+def _ruta_h2h(archivo):
+    return os.path.join(ruta_columnar(archivo), "h2h.parquet")
+
+def _guardar_indice_h2h(archivo, indice):
+    destino = _ruta_h2h(archivo)
+    indice.reset_index().to_parquet(destino + ".tmp", index=False)
+    os.replace(destino + ".tmp", destino)
+
+def _leer_indice_h2h(archivo, filas):
+    """Índice guardado, o None si no existe o no corresponde a un historial de 'filas' partidos."""
+    ruta = _ruta_h2h(archivo)
+    if not os.path.exists(ruta):
+        return None
+    indice = pd.read_parquet(ruta).set_index(['jugador', 'rival'])
+    if indice['partidos'].sum() != filas:
+        return None
+    return indice
 
-    guardar_historial(df_sin_duplicados, archivo_general)
-    arreglar_historial(archivo_general)
-    return nuevos_agregados, duplicados
\ No newline at end of file
+def cargar_indice_h2h(archivo):
+    """Devuelve el índice cara a cara del historial, reconstruyéndolo si hace falta."""
+    indice = _leer_indice_h2h(archivo, _filas_en_partes(_partes_historial(ruta_columnar(archivo))))
+    if indice is None:
+        df = cargar_historial(archivo)
+        indice = indice_h2h(df)
+        if not df.empty:
+            _guardar_indice_h2h(archivo, indice)
+    return indice
+
+# --- Tablas de agregados persistentes ---
+# Las tablas de agregados.py se guardan como agregados-<tabla>.parquet dentro del
+# directorio columnar, y en agregados.json el número de partidos que resumen.
+# Al anexar partidos se combinan con las tablas de las filas nuevas; si faltan o
+# no cuadran con el historial se reconstruyen.
+def _ruta_agregados(archivo, nombre):
+    return os.path.join(ruta_columnar(archivo), f"agregados-{nombre}.parquet")
+
+def _guardar_agregados(archivo, tablas, filas):
+    for nombre, tabla in tablas.items():
+        destino = _ruta_agregados(archivo, nombre)
+        tabla.to_parquet(destino + ".tmp", index=False)
+        os.replace(destino + ".tmp", destino)
+    # El recuento se escribe al final: si algo falla antes, las tablas no cuentan como válidas
+    destino = os.path.join(ruta_columnar(archivo), "agregados.json")
+    with open(destino + ".tmp", 'w') as f:
+        json.dump({'filas': filas}, f)
+    os.replace(destino + ".tmp", destino)
+
+def _leer_agregados(archivo, filas):
+    """Tablas guardadas, o None si no existen o no corresponden a un historial de 'filas' partidos."""
+    ruta = os.path.join(ruta_columnar(archivo), "agregados.json")
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta) as f:
+        if json.load(f).get('filas') != filas:
+            return None
+    tablas = {}
+    for nombre in tablas_vacias():
+        if not os.path.exists(_ruta_agregados(archivo, nombre)):
+            return None
+        tablas[nombre] = pd.read_parquet(_ruta_agregados(archivo, nombre))
+    return tablas
+
+def cargar_agregados(archivo, df=None):
+    """
+    Agregados del historial (AgregadosHistorial), reconstruyendo las tablas si
+    hace falta. 'df' es el historial si ya está cargado, para no leerlo otra vez.
+    """
+    filas = _filas_en_partes(_partes_historial(ruta_columnar(archivo)))
+    tablas = _leer_agregados(archivo, filas)
+    if tablas is None:
+        df = cargar_historial(archivo) if df is None else df
+        tablas = tablas_agregados(df)
+        if not df.empty:
+            _guardar_agregados(archivo, tablas, len(df))
+    return AgregadosHistorial(tablas)
+
+# --- Instantánea del historial con columnas derivadas ---
+# Junto al .xlsx se guarda "historial_general.snapshot.arrow" (Arrow IPC sin
+# comprimir) con el historial ya tipado y las columnas de derivar_columnas.
+# Se abre con memory-map: un arranque en caliente no lee las partes Parquet ni
+# repite las derivaciones. En los metadatos va la firma (nombre, tamaño, mtime)
+# de las partes de las que salió; las partes no se modifican una vez escritas,
+# así que si el historial solo ha crecido se derivan únicamente las partes nuevas.
+VERSION_SNAPSHOT = b"2"
+
+def ruta_snapshot(archivo):
+    base, _ = os.path.splitext(archivo)
+    return base + ".snapshot.arrow"
+
+def _firma_partes(partes):
+    firma = []
+    for parte in partes:
+        st = os.stat(parte)
+        firma.append([os.path.basename(parte), st.st_size, st.st_mtime_ns])
+    return firma
+
+def _leer_snapshot(archivo):
+    """Devuelve (df, firma) de la instantánea, o (None, None) si no existe o no es válida."""
+    import pyarrow as pa
+    ruta = ruta_snapshot(archivo)
+    if not os.path.exists(ruta):
+        return None, None
+    try:
+        with pa.memory_map(ruta, 'r') as fuente:
+            tabla = pa.ipc.open_file(fuente).read_all()
+        meta = tabla.schema.metadata or {}
+        if meta.get(b"snapshot_version") != VERSION_SNAPSHOT:
+            return None, None
+        return tabla.to_pandas(), json.loads(meta[b"snapshot_partes"])
+    except Exception as e:
+        print(f"Advertencia: instantánea del historial ilegible, se regenera: {e}")
+        return None, None
+
+def _guardar_snapshot(archivo, df, firma):
+    import pyarrow as pa
+    ruta = ruta_snapshot(archivo)
+    try:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        meta = dict(tabla.schema.metadata or {})
+        meta[b"snapshot_version"] = VERSION_SNAPSHOT
+        meta[b"snapshot_partes"] = json.dumps(firma).encode()
+        tabla = tabla.replace_schema_metadata(meta)
+        with pa.OSFile(ruta + ".tmp", 'wb') as destino:
+            with pa.ipc.new_file(destino, tabla.schema) as escritor:
+                escritor.write_table(tabla)
+        os.replace(ruta + ".tmp", ruta)
+    except Exception as e:
+        # Sin instantánea la aplicación funciona igual, solo arranca más despacio
+        print(f"Advertencia: no se pudo guardar la instantánea del historial: {e}")
+
+def cargar_historial_derivado(archivo):
+    """
+    Historial con las columnas derivadas (ver derivar_columnas), leído de la
+    instantánea si corresponde a las partes actuales. Si no, se deriva lo que
+    falte y se reescribe la instantánea.
+    """
+    ruta = ruta_columnar(archivo)
+    if not _partes_historial(ruta):
+        cargar_historial(archivo)  # migra el Excel si existe
+    partes = _partes_historial(ruta)
+    if not partes:
+        return pd.DataFrame()
+    firma = _firma_partes(partes)
+    df, firma_snapshot = _leer_snapshot(archivo)
+    if df is not None and firma_snapshot == firma:
+        return df
+    if df is not None and firma_snapshot and firma[:len(firma_snapshot)] == firma_snapshot:
+        nuevas = partes[len(firma_snapshot):]
+        nuevos = [derivar_columnas(tipar_historial(pd.read_parquet(parte))) for parte in nuevas]
+        df = pd.concat([df] + nuevos, ignore_index=True)
+    else:
+        df = derivar_columnas(tipar_historial(pd.concat([pd.read_parquet(parte) for parte in partes], ignore_index=True)))
+    # Las partes pueden diferir en el tipo de una columna (ej. 'posicion' numérica tras migrar
+    # un Excel) y las categorías se pierden al concatenar: se vuelve a aplicar el esquema
+    df = _preparar_columnar(df)
+    _guardar_snapshot(archivo, df, firma)
+    return df
+
+def anexar_partidos(archivo, df_nuevos):
+    """
+    Añade al historial solo los partidos cuya clave no existe todavía.
+    Calcula 'gano' para esas filas y las escribe como una parte nueva, sin
+    reescribir el historial. Devuelve el DataFrame de filas agregadas.
+    """
+    if df_nuevos.empty:
+        return df_nuevos
+    ruta = ruta_columnar(archivo)
+    if not _partes_historial(ruta):
+        cargar_historial(archivo)  # migra el Excel si existe
+    os.makedirs(ruta, exist_ok=True)
+
+    claves = hash_claves(df_nuevos)
+    ordenado, log = _cargar_indice_claves(archivo)
+    nuevas = ~pd.Series(claves).duplicated().to_numpy() & ~_claves_existentes(claves, ordenado, log)
+    df_agregados = df_nuevos[nuevas].reset_index(drop=True)
+    if df_agregados.empty:
+        return df_agregados
+
+    if 'resultado' in df_agregados.columns:
+        gano = calcular_gano_columna(df_agregados['resultado'])
+        if 'gano' in df_agregados.columns:
+            gano = pd.to_numeric(df_agregados['gano']).astype('Int64').fillna(gano)
+        df_agregados['gano'] = gano
+
+    df_agregados = _preparar_columnar(df_agregados)
+    filas_previas = len(ordenado) + len(log)
+    indice_previo = _leer_indice_h2h(archivo, filas_previas) if filas_previas else indice_h2h(pd.DataFrame())
+    tablas_previas = _leer_agregados(archivo, filas_previas) if filas_previas else tablas_vacias()
+
+    partes = _partes_historial(ruta)
+    siguiente = int(os.path.basename(partes[-1])[6:11]) + 1 if partes else 0
+    destino = os.path.join(ruta, f"parte-{siguiente:05d}.parquet")
+    df_agregados.to_parquet(destino + ".tmp", index=False)
+    os.replace(destino + ".tmp", destino)
+
+    claves_agregadas = claves[nuevas]
+    if len(partes) + 1 > MAX_PARTES:
+        compactar_historial(archivo)
+    elif len(log) + len(claves_agregadas) > max(MAX_CLAVES_LOG, len(ordenado) // 8):
+        _escribir_indice_ordenado(archivo, np.concatenate([np.asarray(ordenado), log, claves_agregadas]))
+    else:
+        with open(_rutas_indice(archivo)[1], 'ab') as f:
+            f.write(claves_agregadas.astype(np.uint64).tobytes())
+    if indice_previo is not None:
+        _guardar_indice_h2h(archivo, sumar_indices_h2h(indice_previo, indice_h2h(df_agregados)))
+    if tablas_previas is not None:
+        # Solo se suman las contribuciones de las filas nuevas
+        tablas = combinar_tablas(tablas_previas, tablas_agregados(df_agregados))
+        _guardar_agregados(archivo, tablas, filas_previas + len(df_agregados))
+    return df_agregados
+
+def actualizar_historial_sin_duplicados(archivo_general, nuevos_historiales):
+    df_nuevos = _historiales_a_df(nuevos_historiales)
+    df_agregados = anexar_partidos(archivo_general, df_nuevos)
+    nuevos_agregados = len(df_agregados)
+    duplicados = len(df_nuevos) - nuevos_agregados
+    return nuevos_agregados, duplicados
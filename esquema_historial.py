@@ -0,0 +1,91 @@
+import pandas as pd
+import numpy as np
+
+# --- Esquema tipado del historial ---
+# Se aplica una sola vez al ingresar los datos (al escribir cada parte Parquet y
+# al juntar partes en memoria), de modo que las estadísticas reciben siempre
+# los mismos tipos y no tienen que convertir columnas en cada llamada:
+#   - nombres repetidos como categorías (un código por fila en vez de un str)
+#   - 'fecha_dt': timestamp de 'fecha' + 'hora' (NaT si la fecha no se entiende)
+#   - ratings Int16, deltas float32 y 'gano' Int8 (los tres admiten nulos)
+# 'fecha' y 'hora' se conservan como texto: forman parte de la clave de cada partido.
+COLUMNAS_CATEGORICAS = ['jugador', 'rival', 'torneo', 'ronda', 'posicion']
+COLUMNAS_RATING = ['rating_jugador', 'rating_rival']
+COLUMNAS_DELTA = ['delta', 'delta_total']
+# float32 guarda ~7 cifras: al pasar a float64 se redondea a este número de decimales
+DECIMALES_FLOAT32 = 4
+
+def parsear_fechas(fechas):
+    """
+    Convierte la columna 'fecha' (ej. "9 Jan 2025") a datetime, NaT si no se puede.
+    Cada valor se interpreta por separado ('mixed'): si pandas infiere el formato
+    del primer valor, un "19 May 2025" inicial hace que "6 Nov 2024" salga NaT.
+    Se parsea una vez por fecha distinta.
+    """
+    codigos, unicos = pd.factorize(fechas)
+    valores = pd.to_datetime(pd.Series(unicos, dtype=object), errors='coerce', format='mixed')
+    resultado = valores.take(np.maximum(codigos, 0)).to_numpy(dtype='datetime64[ns]')
+    resultado[codigos < 0] = np.datetime64('NaT')
+    return pd.Series(resultado, index=fechas.index)
+
+def parsear_horas(horas):
+    """Convierte 'hora' (ej. "9:46") a timedelta desde medianoche; 0 si falta o no se entiende."""
+    codigos, unicos = pd.factorize(horas)
+    valores = pd.to_timedelta(pd.Series([f"{h}:00" for h in unicos], dtype=object), errors='coerce')
+    resultado = valores.fillna(pd.Timedelta(0)).take(np.maximum(codigos, 0)).to_numpy(dtype='timedelta64[ns]')
+    resultado[codigos < 0] = np.timedelta64(0, 'ns')
+    return pd.Series(resultado, index=horas.index)
+
+def a_numerico(serie):
+    """Columna numérica a partir de texto que puede traer coma decimal ("-0,6")."""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    return pd.to_numeric(serie.astype(str).str.replace(',', '.', regex=False), errors='coerce')
+
+def a_float64(serie):
+    """
+    Columna en float64 para sumar y promediar. Los valores float32 se redondean a
+    DECIMALES_FLOAT32 para recuperar el decimal original (18.7 y no 18.700000762...),
+    así los promedios redondeados a 2 decimales no cambian por el tipo compacto.
+    """
+    serie = a_numerico(serie)
+    if serie.dtype == np.float32:
+        return serie.astype(np.float64).round(DECIMALES_FLOAT32)
+    return serie.astype(np.float64)
+
+def _rating(serie):
+    valores = a_numerico(serie).astype(float).round()
+    if valores.abs().max() > np.iinfo(np.int16).max:
+        print(f"Advertencia: la columna {serie.name} no cabe en Int16, se guarda como float32")
+        return valores.astype(np.float32)
+    return valores.astype('Int16')
+
+def tipar_historial(df):
+    """
+    Copia del DataFrame de partidos con el esquema tipado. Es idempotente, y
+    hay que volver a aplicarla tras concatenar partes: las columnas categóricas
+    con categorías distintas vuelven a ser texto al concatenarlas.
+    """
+    df = df.copy()
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns:
+            valores = df[col]
+            if isinstance(valores.dtype, pd.CategoricalDtype):
+                continue
+            # Los valores no textuales (ej. 'posicion' numérica de Excel) se guardan como texto
+            valores = valores.astype(object)
+            df[col] = valores.where(valores.isna(), valores.astype(str)).astype('category')
+    for col in COLUMNAS_RATING:
+        if col in df.columns:
+            df[col] = _rating(df[col])
+    for col in COLUMNAS_DELTA:
+        if col in df.columns:
+            df[col] = a_numerico(df[col]).astype(np.float32)
+    if 'gano' in df.columns:
+        df['gano'] = pd.to_numeric(df['gano'], errors='coerce').astype('Int8')
+    if 'fecha' in df.columns and 'fecha_dt' not in df.columns:
+        fecha_dt = parsear_fechas(df['fecha'])
+        if 'hora' in df.columns:
+            fecha_dt = fecha_dt + parsear_horas(df['hora'])
+        df['fecha_dt'] = fecha_dt
+    return df
@@ -0,0 +1,84 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+from stat_core import resumen_global
+from stat_ki import killer_instinct_stats
+from stat_streaks import streaks_stats
+from stat_evolution import GRANULARIDADES
+from agregados import evolucion_partidos
+from stat_opponents import opponents_stats
+from stat_rating import calificacion_jugador
+from stats_cache import cache_estadisticas
+
+# Secciones de la ficha en el orden en que se calculan (y se van mostrando).
+# La calificación va después de resumen, ki y rachas porque los reutiliza.
+SECCIONES_FICHA = ['resumen', 'ki', 'rachas', 'calificacion', 'evolucion', 'momentum', 'rivales']
+
+class FichaSenales(QObject):
+    # generación, sección, resultado (None si el cálculo falló)
+    seccion_lista = pyqtSignal(int, str, object)
+    terminado = pyqtSignal(int)
+
+class FichaTarea(QRunnable):
+    """
+    Calcula las secciones de la ficha de un jugador fuera del hilo de la interfaz.
+    Cada sección se emite en cuanto está lista. Antes de cada sección se consulta
+    es_vigente(): si la selección ha cambiado, la tarea termina sin emitir nada más.
+    'df_jugador' son los partidos del jugador ya recortados a la ventana
+    'opcion_tiempo' (HistorialStore.partidos_jugador). Los resultados se leen de
+    la caché de estadísticas cuando están disponibles; version_datos es la
+    versión de la caché en la que se cargó 'df_jugador'. Con 'agregados'
+    (HistorialStore.agregados) el resumen y la evolución (un dict con la serie
+    de cada granularidad) se leen de las tablas de agregados.
+    """
+    def __init__(self, generacion, es_vigente, senales, df_jugador, jugador, opcion_tiempo, version_datos=None,
+                 agregados=None):
+        super().__init__()
+        self.generacion = generacion
+        self.es_vigente = es_vigente
+        self.senales = senales
+        self.df_partidos = df_jugador
+        self.jugador = jugador
+        self.opcion_tiempo = opcion_tiempo
+        self.version_datos = version_datos
+        self.agregados = agregados
+
+    def df_jugador(self):
+        return self.df_partidos
+
+    def resumen(self):
+        if self.agregados is not None:
+            return self.agregados.resumen(self.jugador, self.opcion_tiempo, self.df_jugador())
+        return resumen_global(self.df_jugador()).get(self.jugador, {})
+
+    def evolucion(self):
+        if self.agregados is not None:
+            return {g: self.agregados.evolucion(self.jugador, self.opcion_tiempo, self.df_jugador(), g)
+                    for g in GRANULARIDADES}
+        return {g: evolucion_partidos(self.df_jugador(), g) for g in GRANULARIDADES}
+
+    def run(self):
+        if not self.es_vigente(self.generacion):
+            return
+        jugador = self.jugador
+        resultados = {}
+        calculos = {
+            'resumen': self.resumen,
+            'ki': lambda: killer_instinct_stats(self.df_jugador()).get(jugador, {}),
+            'rachas': lambda: streaks_stats(self.df_jugador()).get(jugador, {}),
+            'calificacion': lambda: calificacion_jugador(
+                self.df_jugador(), resultados.get('resumen') or None, resultados.get('ki') or None,
+                resultados.get('rachas') or None)[0],
+            'evolucion': self.evolucion,
+            # 'gano' es Int8 con nulos: como float los partidos sin resultado quedan en NaN
+            'momentum': lambda: list(self.df_jugador().tail(20)['gano'].astype(float)),
+            'rivales': lambda: opponents_stats(self.df_jugador(), top_n=5).get(jugador, {}),
+        }
+        for seccion in SECCIONES_FICHA:
+            if not self.es_vigente(self.generacion):
+                return
+            try:
+                resultados[seccion] = cache_estadisticas.obtener(
+                    jugador, self.opcion_tiempo, seccion, calculos[seccion], self.version_datos)
+            except Exception:
+                resultados[seccion] = None
+            self.senales.seccion_lista.emit(self.generacion, seccion, resultados[seccion])
+        self.senales.terminado.emit(self.generacion)
@@ -1,68 +1,112 @@
 import pandas as pd
 import re
-from datetime import datetime
+from openpyxl import load_workbook
 
-def parse_excel_historial(file_path):
-    xls = pd.ExcelFile(file_path)
-    historiales = {}
-    for sheet_name in xls.sheet_names:
-        df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
-        partidos = []
-        i = 0
-        while i < len(df):
-            row = df.iloc[i]
-            # 1. Detectar inicio de torneo
-            if isinstance(row[0], str) and "Tournament" in row[0]:
-                # Extraer fecha, hora y nombre del torneo/liga
-                torneo_match = re.match(r'(\d{1,2} [A-Za-z]{3} \d{4}) (\d{1,2}:\d{2})\s*Tournament (.+)', row[0])
-                if torneo_match:
-                    fecha = torneo_match.group(1)
-                    hora_torneo = torneo_match.group(2)
-                    torneo = torneo_match.group(3).strip()
-                else:
-                    fecha = None
-                    hora_torneo = None
-                    torneo = row[0]
+# Patrones precompilados (se evalúan una vez por fila)
+RE_TORNEO = re.compile(r'(\d{1,2} [A-Za-z]{3} \d{4}) (\d{1,2}:\d{2})\s*Tournament (.+)')
+RE_HORA = re.compile(r'^\d{1,2}:\d{2}$')
 
-                # 2. Datos del jugador (siguiente fila)
-                datos_row = df.iloc[i+1] if i+1 < len(df) else None
-                rating = int(datos_row[4]) if datos_row is not None and pd.notnull(datos_row[4]) and str(datos_row[4]).isdigit() else None
-                lugar = str(datos_row[5]).split()[0] if datos_row is not None and pd.notnull(datos_row[5]) else None
-                delta_total = float(str(datos_row[8]).replace(',', '.')) if datos_row is not None and pd.notnull(datos_row[8]) else None
+def _celda(fila, col):
+    """Valor de la columna 'col' de una fila de openpyxl (las filas pueden venir recortadas)."""
+    valor = fila[col] if col < len(fila) else None
+    # Igual que pd.read_excel: los números enteros guardados como float se leen como int
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
 
-                # Saltar encabezado de partidos (siguiente fila)
-                i += 3
+def _partidos_hoja(filas):
+    """
+    Recorre las filas de una hoja (tuplas de valores) y va generando los partidos.
+    Solo mantiene en memoria los datos del torneo en curso.
+    """
+    fecha = hora_torneo = torneo = None
+    rating = lugar = delta_total = None
+    # Filas que faltan por saltar tras un encabezado de torneo: 2 = la siguiente es la
+    # fila de datos del jugador, 1 = la siguiente es el encabezado de partidos
+    pendientes = 0
+    en_torneo = False
+    for fila in filas:
+        if pendientes == 2:
+            # 2. Datos del jugador (fila siguiente al torneo)
+            rating_celda, lugar_celda, delta_celda = _celda(fila, 4), _celda(fila, 5), _celda(fila, 8)
+            rating = int(rating_celda) if pd.notnull(rating_celda) and str(rating_celda).isdigit() else None
+            lugar = str(lugar_celda).split()[0] if pd.notnull(lugar_celda) else None
+            delta_total = float(str(delta_celda).replace(',', '.')) if pd.notnull(delta_celda) else None
+            pendientes = 1
+            continue
+        if pendientes == 1:
+            # Saltar encabezado de partidos
+            pendientes = 0
+            en_torneo = True
+            continue
 
-                # 3. Leer partidos hasta que termine el bloque (la col A vuelva a tener "Tournament" o esté vacía)
-                while i < len(df):
-                    partido_row = df.iloc[i]
-                    if isinstance(partido_row[0], str) and "Tournament" in partido_row[0]:
-                        break # Nuevo torneo, salir del bucle interno
-                    if isinstance(partido_row[0], str) and re.match(r'^\d{1,2}:\d{2}$', partido_row[0]):
-                        try:
-                            partido = {
-                                "fecha": fecha,
-                                "hora_torneo": hora_torneo,
-                                "torneo": torneo,
-                                "rating_jugador": rating,
-                                "posicion": lugar,
-                                "delta_total": delta_total,
-                                "hora": partido_row[0],
-                                "ronda": partido_row[1],
-                                "rival": partido_row[2],
-                                "rating_rival": int(partido_row[4]) if pd.notnull(partido_row[4]) and str(partido_row[4]).isdigit() else None,
-                                "resultado": str(partido_row[6]).replace(' ', '').replace(':', ':') if pd.notnull(partido_row[6]) else None,
-                                "sets": str(partido_row[7]).replace('\xa0', ' ').strip() if pd.notnull(partido_row[7]) else None,
-                                "delta": float(str(partido_row[8]).replace(',', '.')) if pd.notnull(partido_row[8]) else None,
-                            }
-                            partidos.append(partido)
-                        except Exception as e:
-                            pass # Salta fila si da error
-                    i += 1
-                continue
-            i += 1
-        historiales[sheet_name] = partidos
-    return historiales
+        primera = _celda(fila, 0)
+        # 1. Detectar inicio de torneo
+        if isinstance(primera, str) and "Tournament" in primera:
+            # Extraer fecha, hora y nombre del torneo/liga
+            torneo_match = RE_TORNEO.match(primera)
+            if torneo_match:
+                fecha = torneo_match.group(1)
+                hora_torneo = torneo_match.group(2)
+                torneo = torneo_match.group(3).strip()
+            else:
+                fecha = None
+                hora_torneo = None
+                torneo = primera
+            rating = lugar = delta_total = None
+            pendientes = 2
+            en_torneo = False
+            continue
+
+        # 3. Partidos del bloque (hasta que la col A vuelva a tener "Tournament")
+        if en_torneo and isinstance(primera, str) and RE_HORA.match(primera):
+            try:
+                rating_rival, resultado, sets, delta = _celda(fila, 4), _celda(fila, 6), _celda(fila, 7), _celda(fila, 8)
+                yield {
+                    "fecha": fecha,
+                    "hora_torneo": hora_torneo,
+                    "torneo": torneo,
+                    "rating_jugador": rating,
+                    "posicion": lugar,
+                    "delta_total": delta_total,
+                    "hora": primera,
+                    "ronda": _celda(fila, 1),
+                    "rival": _celda(fila, 2),
+                    "rating_rival": int(rating_rival) if pd.notnull(rating_rival) and str(rating_rival).isdigit() else None,
+                    "resultado": str(resultado).replace(' ', '').replace(':', ':') if pd.notnull(resultado) else None,
+                    "sets": str(sets).replace('\xa0', ' ').strip() if pd.notnull(sets) else None,
+                    "delta": float(str(delta).replace(',', '.')) if pd.notnull(delta) else None,
+                }
+            except Exception as e:
+                pass # Salta fila si da error
+
+def nombres_hojas(file_path):
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+def iterar_hojas(file_path, hojas=None, al_abrir=None):
+    """
+    Generador de (jugador, [partidos]) hoja por hoja. Con 'hojas' solo se leen
+    esas hojas (así se puede repartir un libro entre varios procesos).
+    al_abrir(nombres), si se indica, recibe la lista de hojas que se van a leer
+    antes de empezar (útil para mostrar el progreso).
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        seleccion = [ws for ws in wb.worksheets if hojas is None or ws.title in hojas]
+        if al_abrir:
+            al_abrir([ws.title for ws in seleccion])
+        for ws in seleccion:
+            yield ws.title, list(_partidos_hoja(ws.iter_rows(values_only=True)))
+    finally:
+        wb.close()
+
+def parse_excel_historial(file_path, hojas=None):
+    """Devuelve {jugador: [partidos]} con una entrada por hoja."""
+    return dict(iterar_hojas(file_path, hojas))
 
 def historiales_a_dataframe(historiales):
     all_partidos = []
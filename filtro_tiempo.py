@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from esquema_historial import parsear_fechas
+
+OPCIONES_TIEMPO = [
+    "Todos",
+    "Últimos 6 meses",
+    "Últimos 3 meses",
+    "Mes actual"
+]
+
+def rango_tiempo(opcion, hoy=None):
+    """
+    Intervalo [desde, hasta) de una de las OPCIONES_TIEMPO o de un rango propio
+    (desde, hasta) con fechas cualesquiera. None en un extremo = sin límite.
+    """
+    if isinstance(opcion, tuple):
+        desde, hasta = opcion
+        return (None if desde is None else pd.Timestamp(desde),
+                None if hasta is None else pd.Timestamp(hasta))
+    hoy = pd.Timestamp.today().normalize() if hoy is None else hoy
+    if opcion == "Últimos 6 meses":
+        return hoy - pd.DateOffset(months=6), None
+    if opcion == "Últimos 3 meses":
+        return hoy - pd.DateOffset(months=3), None
+    if opcion == "Mes actual":
+        inicio = hoy.replace(day=1)
+        return inicio, inicio + pd.DateOffset(months=1)
+    return None, None
+
+# Valor de NaT en tiempos_ns()
+T_NAT = np.iinfo(np.int64).min
+
+def tiempos_ns(fechas):
+    """
+    Timestamps como int64 (ns) para ordenar y buscar con searchsorted. NaT queda
+    como el mínimo int64 (T_NAT), así los partidos sin fecha se ordenan al
+    principio y limites_ventana() puede saltárselos.
+    """
+    return np.asarray(fechas, dtype='datetime64[ns]').view(np.int64)
+
+def limites_ventana(tiempos, desde, hasta):
+    """
+    Posiciones (inicio, fin) de la ventana [desde, hasta) en un array de
+    tiempos_ns ordenado. Como filtrar_por_tiempo(), con algún límite puesto los
+    partidos sin fecha quedan fuera aunque 'desde' sea None.
+    """
+    if desde is None:
+        inicio = int(np.searchsorted(tiempos, T_NAT, 'right'))
+    else:
+        inicio = int(np.searchsorted(tiempos, pd.Timestamp(desde).value, 'left'))
+    fin = len(tiempos) if hasta is None else int(np.searchsorted(tiempos, pd.Timestamp(hasta).value, 'left'))
+    return inicio, max(inicio, fin)
+
+def filtrar_por_tiempo(df, opcion):
+    """
+    Filtra un DataFrame de partidos cualquiera (sin ordenar) por una opción de
+    OPCIONES_TIEMPO o un rango (desde, hasta). Los partidos del historial
+    compartido se piden ya recortados con HistorialStore.partidos_jugador().
+    """
+    if df is None or df.empty:
+        return df
+    desde, hasta = rango_tiempo(opcion)
+    if desde is None and hasta is None:
+        return df
+    fechas = df['fecha_dt'] if 'fecha_dt' in df.columns else parsear_fechas(df['fecha'])
+    mascara = fechas.notna()
+    if desde is not None:
+        mascara &= fechas >= desde
+    if hasta is not None:
+        mascara &= fechas < hasta
+    return df[mascara.to_numpy()]
@@ -0,0 +1,129 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt5.QtWidgets import QSizePolicy
+
+# --- Gráficos persistentes ---
+# Cada hueco de gráfico de la interfaz es un canvas con su propia Figure (sin
+# pyplot, así no queda ninguna figura registrada en pyplot) que se crea una vez y
+# se actualiza en el sitio cambiando los datos de sus artistas. Los artistas de
+# datos son 'animated': si los ejes no cambian (mismos límites y etiquetas) solo
+# se repintan ellos sobre el fondo guardado (blit); si cambian, se redibuja la
+# figura completa una vez.
+COLOR_LINEA = '#1f77b4'
+COLOR_VICTORIA = '#4CAF50'
+COLOR_DERROTA = '#E53935'
+COLOR_SIN_RESULTADO = '#9E9E9E'
+
+class _GraficoPersistente(FigureCanvas):
+    def __init__(self, ancho, alto, dpi=90, parent=None):
+        # layout='tight': los márgenes se recalculan en cada dibujo completo, con el tamaño real del widget
+        self.figura = Figure(figsize=(ancho, alto), dpi=dpi, layout='tight')
+        super().__init__(self.figura)
+        self.setParent(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # Dentro de un scroll el layout lo encogería hasta no caber los ejes: se reserva su alto completo
+        self.setMinimumSize(int(ancho * dpi / 2), int(alto * dpi))
+        self.ax = self.figura.add_subplot()
+        self.artistas = []
+        self._fondo = None
+        self._estado_ejes = None
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def _animado(self, artista):
+        """Registra un artista de datos (se pinta aparte del fondo)."""
+        artista.set_animated(True)
+        self.artistas.append(artista)
+        return artista
+
+    def _on_draw(self, event):
+        # Tras un dibujo completo: se guarda el fondo (ejes sin datos) y se pintan los datos encima
+        self._fondo = self.copy_from_bbox(self.figura.bbox)
+        self._pintar_artistas()
+
+    def _pintar_artistas(self):
+        for artista in self.artistas:
+            self.figura.draw_artist(artista)
+
+    def _redibujar(self, estado_ejes):
+        """
+        Muestra los datos nuevos: con los mismos ejes que el dibujo anterior basta
+        con repintar los artistas sobre el fondo; si no, se redibuja todo.
+        """
+        if estado_ejes == self._estado_ejes and self._fondo is not None:
+            self.restore_region(self._fondo)
+            self._pintar_artistas()
+            self.blit(self.figura.bbox)
+        else:
+            self._estado_ejes = estado_ejes
+            self.draw_idle()
+
+class GraficoEvolucion(_GraficoPersistente):
+    """Rating medio por periodo (línea) y, opcionalmente, su rango mínimo-máximo (banda)."""
+    def __init__(self, ancho, alto, titulo='Rating', ylabel=None, con_rango=True, dpi=90, parent=None):
+        super().__init__(ancho, alto, dpi, parent)
+        self.titulo = titulo
+        self.ylabel = ylabel
+        self.con_rango = con_rango
+        self.ax.grid(True, linestyle=':')
+        self.banda = self._animado(self.ax.add_patch(
+            Polygon(np.empty((0, 2)), closed=True, color=COLOR_LINEA, alpha=0.15, linewidth=0)))
+        self.linea, = self.ax.plot([], [], marker='o', color=COLOR_LINEA)
+        self._animado(self.linea)
+
+    def actualizar(self, etiquetas, medias, minimos=None, maximos=None, xlabel=''):
+        """Dibuja la serie: una etiqueta del eje x por punto; None o NaN en 'medias' = sin dato."""
+        x = np.arange(len(etiquetas))
+        medias = np.array([np.nan if m is None else m for m in medias], dtype=float)
+        self.linea.set_data(x, medias)
+        valores = [medias]
+        if self.con_rango and minimos is not None and maximos is not None:
+            minimos = np.asarray(minimos, dtype=float)
+            maximos = np.asarray(maximos, dtype=float)
+            validos = ~(np.isnan(minimos) | np.isnan(maximos))
+            # Contorno de la banda: los máximos de izquierda a derecha y los mínimos de vuelta
+            self.banda.set_xy(np.column_stack([np.concatenate([x[validos], x[validos][::-1]]),
+                                               np.concatenate([maximos[validos], minimos[validos][::-1]])]))
+            valores += [minimos, maximos]
+        else:
+            self.banda.set_xy(np.empty((0, 2)))
+        todos = np.concatenate(valores)
+        todos = todos[~np.isnan(todos)]
+        ylim = (np.floor(todos.min()) - 5, np.ceil(todos.max()) + 5) if len(todos) else (0, 1)
+        etiquetas = tuple(etiquetas)
+        estado = (etiquetas, ylim, xlabel)
+        if estado != self._estado_ejes:
+            self.ax.set_xlim(-0.5, max(len(x), 1) - 0.5)
+            self.ax.set_ylim(*ylim)
+            self.ax.set_xticks(x, etiquetas, rotation=45)
+            self.ax.set_title(self.titulo)
+            self.ax.set_xlabel(xlabel)
+            if self.ylabel:
+                self.ax.set_ylabel(self.ylabel)
+        self._redibujar(estado)
+
+class GraficoMomentum(_GraficoPersistente):
+    """Barras de los últimos partidos: verde = victoria, rojo = derrota, gris = sin resultado."""
+    def __init__(self, ancho, alto, titulo='Momentum', max_partidos=20, dpi=90, parent=None):
+        super().__init__(ancho, alto, dpi, parent)
+        self.titulo = titulo
+        self.ax.set_ylim(0, 1.3)
+        self.ax.set_yticks([])
+        self.barras = [self._animado(b) for b in
+                       self.ax.bar(range(1, max_partidos + 1), [1] * max_partidos, edgecolor='black')]
+
+    def actualizar(self, resultados):
+        """resultados: 1 (victoria), 0 (derrota) o NaN, del más antiguo al más reciente."""
+        n = min(len(resultados), len(self.barras))
+        for i, barra in enumerate(self.barras):
+            visible = i < n
+            barra.set_visible(visible)
+            if visible:
+                res = resultados[i]
+                barra.set_facecolor(COLOR_VICTORIA if res == 1 else COLOR_DERROTA if res == 0 else COLOR_SIN_RESULTADO)
+        if n != self._estado_ejes:
+            self.ax.set_xlim(0.5, n + 0.5)
+            self.ax.set_xticks(range(1, n + 1))
+            self.ax.set_title(self.titulo if n else "Sin datos")
+        self._redibujar(n)
@@ -0,0 +1,210 @@
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+# pandas, numpy y db_manager se importan dentro de las funciones: este módulo lo
+# importa main_app al arrancar y la ventana debe mostrarse sin esperar a pandas.
+ARCHIVO_GENERAL = "data/historial_general.xlsx"
+
+def _indexar(df):
+    """
+    Ordena las filas por jugador y, dentro de cada jugador, por 'fecha_dt'
+    (orden estable; los partidos sin fecha van primero). Devuelve
+    (df, rangos, jugadores, tiempos): rangos[jugador] = (inicio, fin) del bloque
+    contiguo de sus partidos y 'tiempos' los timestamps en ns de cada fila,
+    para recortar ventanas de tiempo con búsqueda binaria.
+    """
+    import numpy as np
+    import pandas as pd
+    from filtro_tiempo import tiempos_ns, T_NAT
+    if df.empty or 'jugador' not in df.columns:
+        return df, {}, [], np.empty(0, dtype=np.int64)
+    codigos, jugadores = pd.factorize(df['jugador'], sort=True)
+    if 'fecha_dt' in df.columns:
+        tiempos = tiempos_ns(df['fecha_dt'])
+    else:
+        tiempos = np.full(len(df), T_NAT)
+    orden = np.lexsort((tiempos, codigos))
+    df = df.take(orden).reset_index(drop=True)
+    limites = np.searchsorted(codigos[orden], np.arange(len(jugadores) + 1))
+    rangos = {jugador: (limites[i], limites[i + 1]) for i, jugador in enumerate(jugadores)}
+    return df, rangos, list(jugadores), tiempos[orden]
+
+def _leer_historial(archivo):
+    """
+    Lee e indexa el historial (con las columnas derivadas, desde la instantánea
+    si está al día) y sus tablas de agregados, y construye el índice de
+    nombres. Devuelve (resultado de _indexar, AgregadosHistorial,
+    IndiceNombres, versión de la caché).
+    """
+    from db_manager import cargar_historial_derivado, cargar_agregados
+    from indice_nombres import IndiceNombres
+    from stats_cache import cache_estadisticas
+    # La versión se toma antes de leer: si hay una importación en medio, los datos cuentan como viejos
+    version = cache_estadisticas.version
+    df = cargar_historial_derivado(archivo)
+    indexado = _indexar(df)
+    return indexado, cargar_agregados(archivo, df), IndiceNombres(indexado[2]), version
+
+class _CargaHistorial(QThread):
+    listo = pyqtSignal(object, object, object, int)
+    fallo = pyqtSignal(str)
+
+    def __init__(self, archivo, parent=None):
+        super().__init__(parent)
+        self.archivo = archivo
+
+    def run(self):
+        try:
+            self.listo.emit(*_leer_historial(self.archivo))
+        except Exception as e:
+            self.fallo.emit(str(e))
+
+class HistorialStore(QObject):
+    """
+    Historial en memoria compartido por todas las páginas (solo lectura).
+    Las filas quedan ordenadas por jugador y fecha para que los partidos de cada
+    jugador sean un bloque cronológico contiguo y partidos_jugador() devuelva
+    un slice sin copiar datos, también para una ventana de tiempo. El resumen de
+    cada jugador se lee de las tablas de agregados (agregados.py), que se
+    actualizan sumando los partidos importados; los nombres se buscan en
+    indice_nombres (IndiceNombres), que crece con los jugadores nuevos. Cada
+    vez que cambian los datos (carga inicial o importación) se emite
+    'actualizado' con los jugadores afectados.
+
+    Con cargar=False la lectura se lanza después con cargar_en_segundo_plano().
+    """
+    actualizado = pyqtSignal(list)
+    fallo_carga = pyqtSignal(str)
+
+    def __init__(self, archivo=ARCHIVO_GENERAL, parent=None, cargar=True):
+        super().__init__(parent)
+        self.archivo = archivo
+        self.df = None
+        self.cargado = False
+        self.version_datos = 0
+        self._rangos = {}
+        self._jugadores = []
+        self._tiempos = None
+        self.agregados = None
+        self.indice_nombres = None
+        self._hilo_carga = None
+        self._recargar = False
+        if cargar:
+            self._on_cargado(*_leer_historial(archivo))
+
+    def cargar_en_segundo_plano(self):
+        if self._hilo_carga is not None and self._hilo_carga.isRunning():
+            return
+        self._hilo_carga = _CargaHistorial(self.archivo, self)
+        self._hilo_carga.listo.connect(self._on_cargado)
+        self._hilo_carga.fallo.connect(self.fallo_carga)
+        self._hilo_carga.start()
+
+    def _on_cargado(self, indexado, agregados, indice_nombres, version):
+        self.df, self._rangos, self._jugadores, self._tiempos = indexado
+        self.agregados = agregados
+        self.indice_nombres = indice_nombres
+        self.version_datos = version
+        self.cargado = True
+        self.actualizado.emit(list(self._jugadores))
+        if self._recargar:
+            # Hubo una importación mientras se leía: se vuelve a leer para incluirla
+            self._recargar = False
+            self.cargar_en_segundo_plano()
+
+    def vacio(self):
+        return self.df is None or self.df.empty
+
+    def jugadores(self):
+        """Jugadores con partidos, ordenados alfabéticamente."""
+        return self._jugadores
+
+    def __contains__(self, jugador):
+        return jugador in self._rangos
+
+    def partidos_jugador(self, jugador, ventana="Todos"):
+        """
+        Partidos de un jugador en orden cronológico, recortados a una ventana de
+        tiempo: una opción de OPCIONES_TIEMPO o un rango (desde, hasta). El
+        recorte es una búsqueda binaria sobre su bloque y devuelve una vista sin
+        copiar datos: no se debe modificar.
+        """
+        from filtro_tiempo import rango_tiempo, limites_ventana
+        inicio, fin = self._rangos.get(jugador, (0, 0))
+        desde, hasta = rango_tiempo(ventana)
+        if desde is not None or hasta is not None:
+            primero, ultimo = limites_ventana(self._tiempos[inicio:fin], desde, hasta)
+            inicio, fin = inicio + primero, inicio + ultimo
+        return self.df.iloc[inicio:fin]
+
+    def filas_ventana(self, ventana="Todos"):
+        """
+        Posiciones en df de los partidos de todos los jugadores en una ventana
+        de tiempo, con el mismo recorte que partidos_jugador() en el bloque de
+        cada jugador (ordenadas por jugador y fecha). None si la ventana no
+        tiene límites (son todas las filas).
+        """
+        import numpy as np
+        from filtro_tiempo import rango_tiempo, limites_ventana
+        desde, hasta = rango_tiempo(ventana)
+        if desde is None and hasta is None:
+            return None
+        tramos = [np.empty(0, dtype=np.int64)]
+        for inicio, fin in self._rangos.values():
+            primero, ultimo = limites_ventana(self._tiempos[inicio:fin], desde, hasta)
+            tramos.append(np.arange(inicio + primero, inicio + ultimo))
+        return np.concatenate(tramos)
+
+    def resumen_jugador(self, jugador, ventana="Todos"):
+        """
+        Resumen de un jugador (como resumen_global) en una ventana de tiempo,
+        combinando las cubetas de las tablas de agregados.
+        """
+        df_jugador = self.partidos_jugador(jugador, ventana)
+        if self.agregados is None:
+            from stat_core import resumen_global
+            return resumen_global(df_jugador).get(jugador, {})
+        return self.agregados.resumen(jugador, ventana, df_jugador)
+
+    def evolucion_jugador(self, jugador, ventana="Todos"):
+        """
+        Evolución del rating de un jugador en la ventana para cada granularidad
+        (dict granularidad -> serie de agregados.serie_evolucion), leída de los
+        acumulados por semana, mes, trimestre y año.
+        """
+        from stat_evolution import GRANULARIDADES
+        df_jugador = self.partidos_jugador(jugador, ventana)
+        if self.agregados is None:
+            from agregados import evolucion_partidos
+            return {g: evolucion_partidos(df_jugador, g) for g in GRANULARIDADES}
+        return {g: self.agregados.evolucion(jugador, ventana, df_jugador, g) for g in GRANULARIDADES}
+
+    def anexar(self, df_agregados):
+        """
+        Incorpora los partidos recién guardados en el historial, invalida en la
+        caché solo a los jugadores afectados y notifica a las páginas.
+        """
+        import pandas as pd
+        from esquema_historial import tipar_historial
+        from stat_core import derivar_columnas
+        from stats_cache import cache_estadisticas
+        if df_agregados is None or df_agregados.empty:
+            return
+        jugadores = list(df_agregados['jugador'].dropna().unique())
+        cache_estadisticas.invalidar_jugadores(jugadores)
+        if self._hilo_carga is not None and self._hilo_carga.isRunning():
+            self._recargar = True
+            return
+        self.version_datos = cache_estadisticas.version
+        base = self.df if self.df is not None else pd.DataFrame()
+        nuevos = derivar_columnas(tipar_historial(df_agregados))
+        # Concatenar categorías distintas devuelve texto: se vuelve a tipar el conjunto
+        df = tipar_historial(pd.concat([base, nuevos], ignore_index=True))
+        self.df, self._rangos, self._jugadores, self._tiempos = _indexar(df)
+        if self.agregados is not None:
+            self.agregados = self.agregados.anexar(nuevos)
+        if self.indice_nombres is None:
+            from indice_nombres import IndiceNombres
+            self.indice_nombres = IndiceNombres(self._jugadores)
+        else:
+            self.indice_nombres.anexar(self._jugadores)
+        self.actualizado.emit(jugadores)
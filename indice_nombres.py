@@ -0,0 +1,173 @@
+import unicodedata
+from array import array
+from itertools import islice
+import numpy as np
+
+# --- Índice de nombres de jugadores ---
+# Búsqueda "contiene" sin recorrer todos los nombres: cada nombre (normalizado)
+# se indexa por sus letras, bigramas y trigramas. Una consulta toma la lista de
+# nombres de su trigrama menos frecuente y solo comprueba esos candidatos; si
+# la consulta tiene hasta 3 letras, la lista de su n-grama ya es el resultado. Las
+# listas guardan ids (posición de inserción) en orden creciente. Los nombres se
+# normalizan sin tildes ni mayúsculas: "nunez" encuentra "Núñez".
+#
+# Para los autocompletados, sugerencias() tolera erratas: los candidatos son los
+# nombres que comparten suficientes trigramas con la consulta (con k erratas se
+# pierden como mucho 3·k trigramas), se podan a los MAX_CANDIDATOS que más
+# comparten y se ordenan por la distancia de edición de la consulta al trozo
+# más parecido del nombre.
+TAMANOS_NGRAMA = (1, 2, 3)
+_VACIO = array('i')
+MAX_CANDIDATOS = 300
+
+def normalizar(texto):
+    """Minúsculas y sin marcas diacríticas (tildes, diéresis, eñes...)."""
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+def erratas_permitidas(consulta):
+    """Erratas toleradas según el largo de la consulta: ninguna hasta 3 letras, luego una cada 4."""
+    return 0 if len(consulta) <= 3 else max(1, len(consulta) // 4)
+
+def distancia_fragmento(consulta, texto):
+    """
+    Distancia de edición entre 'consulta' y el fragmento de 'texto' que más se
+    le parece (empezar y acabar en cualquier punto de 'texto' no cuesta).
+    Algoritmo de Myers: cada columna de la tabla de distancias se guarda como
+    bits de un entero, así que el coste es una pasada por 'texto'.
+    """
+    m = len(consulta)
+    if m == 0:
+        return 0
+    patrones = {}
+    for i, c in enumerate(consulta):
+        patrones[c] = patrones.get(c, 0) | (1 << i)
+    mascara = (1 << m) - 1
+    alto = 1 << (m - 1)
+    pv, mv = mascara, 0
+    distancia = mejor = m
+    for c in texto:
+        eq = patrones.get(c, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mascara) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mascara
+        mh = pv & xh
+        if ph & alto:
+            distancia += 1
+        elif mh & alto:
+            distancia -= 1
+        ph = (ph << 1) & mascara
+        mh = (mh << 1) & mascara
+        pv = (mh | ~(xv | ph)) & mascara
+        mv = ph & xv
+        if distancia < mejor:
+            mejor = distancia
+    return mejor
+
+def ngramas(texto, tamanos=TAMANOS_NGRAMA):
+    return {texto[i:i + n] for n in tamanos for i in range(len(texto) - n + 1)}
+
+class IndiceNombres:
+    def __init__(self, nombres=()):
+        self.nombres = []
+        self._normalizados = []
+        self._ids = {}
+        self._ngramas = {}
+        # Posición alfabética de cada id; None mientras los ids ya van en orden alfabético
+        self._orden = None
+        self.anexar(nombres)
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __contains__(self, nombre):
+        return nombre in self._ids
+
+    def id(self, nombre):
+        return self._ids.get(nombre, -1)
+
+    def anexar(self, nombres):
+        """Añade los nombres que aún no están (p. ej. tras una importación). Devuelve si hubo alguno."""
+        nuevos = [n for n in dict.fromkeys(nombres) if n not in self._ids]
+        if not nuevos:
+            return False
+        ordenados = self._orden is None and all(a < b for a, b in zip(self.nombres[-1:] + nuevos, nuevos))
+        for nombre in nuevos:
+            i = len(self.nombres)
+            normalizado = normalizar(nombre)
+            self.nombres.append(nombre)
+            self._normalizados.append(normalizado)
+            self._ids[nombre] = i
+            for ngrama in ngramas(normalizado):
+                lista = self._ngramas.get(ngrama)
+                if lista is None:
+                    self._ngramas[ngrama] = lista = array('i')
+                lista.append(i)
+        if not ordenados:
+            orden = np.empty(len(self.nombres), dtype=np.int64)
+            orden[sorted(range(len(self.nombres)), key=self.nombres.__getitem__)] = np.arange(len(self.nombres))
+            self._orden = orden
+        return True
+
+    def buscar(self, texto):
+        """Ids de los nombres que contienen 'texto' (normalizado), en orden alfabético."""
+        consulta = normalizar(texto)
+        if not consulta:
+            ids = np.arange(len(self.nombres))
+        else:
+            tamano = min(len(consulta), max(TAMANOS_NGRAMA))
+            candidatos = min((self._ngramas.get(ngrama, _VACIO) for ngrama in ngramas(consulta, (tamano,))), key=len)
+            if len(consulta) == tamano:
+                ids = np.frombuffer(candidatos, dtype=np.int32).astype(np.int64) if len(candidatos) else np.empty(0, dtype=np.int64)
+            else:
+                normalizados = self._normalizados
+                ids = np.fromiter((i for i in candidatos if consulta in normalizados[i]), dtype=np.int64)
+        if self._orden is not None and len(ids):
+            ids = ids[np.argsort(self._orden[ids], kind='stable')]
+        return ids
+
+    def _sugerencias_exactas(self, consulta, ids, limite):
+        """Los primeros 'limite' de 'ids' (en orden alfabético): antes los que empiezan por la consulta."""
+        normalizados = self._normalizados
+        elegidos = list(islice((i for i in ids if normalizados[i].startswith(consulta)), limite))
+        if len(elegidos) < limite:
+            prefijos = set(elegidos)
+            elegidos += islice((i for i in ids if i not in prefijos), limite - len(elegidos))
+        return np.array(elegidos, dtype=np.int64)
+
+    def sugerencias(self, texto, limite=20):
+        """
+        Ids de los nombres más parecidos a 'texto', del mejor al peor: primero
+        los que lo contienen (y entre ellos los que empiezan por él), después
+        los que lo contienen con pocas erratas, por número de erratas.
+        """
+        consulta = normalizar(texto)
+        if not consulta:
+            return np.empty(0, dtype=np.int64)
+        normalizados = self._normalizados
+        maximo = erratas_permitidas(consulta)
+        if maximo == 0:
+            # Consulta corta: sin erratas
+            return self._sugerencias_exactas(consulta, self.buscar(texto), limite)
+        exactos = self.buscar(texto)
+        if len(exactos) >= limite:
+            # Hay suficientes sin erratas: no hace falta buscar aproximados
+            return self._sugerencias_exactas(consulta, exactos, limite)
+        # Cuántos trigramas de la consulta tiene cada nombre
+        listas = [np.frombuffer(self._ngramas[t], dtype=np.int32) for t in ngramas(consulta, (3,)) if t in self._ngramas]
+        if not listas:
+            return np.empty(0, dtype=np.int64)
+        comunes = np.bincount(np.concatenate(listas), minlength=len(self.nombres))
+        minimo = max(1, len(ngramas(consulta, (3,))) - 3 * maximo)
+        candidatos = np.flatnonzero(comunes >= minimo)
+        if len(candidatos) > MAX_CANDIDATOS:
+            # Poda: solo los que más trigramas comparten
+            candidatos = candidatos[np.argsort(-comunes[candidatos], kind='stable')[:MAX_CANDIDATOS]]
+        puntuados = []
+        for i in candidatos:
+            normalizado = normalizados[i]
+            distancia = 0 if consulta in normalizado else distancia_fragmento(consulta, normalizado)
+            if distancia <= maximo:
+                puntuados.append((distancia, not normalizado.startswith(consulta), self.nombres[i], int(i)))
+        puntuados.sort()
+        return np.array([i for *_, i in puntuados[:limite]], dtype=np.int64)
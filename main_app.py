@@ -1,5 +1,6 @@
 import sys
 import os
+import importlib
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QStackedWidget, QMenu, QAction,
@@ -7,21 +8,13 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, QTimer, QDateTime, QPropertyAnimation, QEasingCurve, QProcess, QPoint
 from PyQt5.QtGui import QIcon, QFont
-from cargar_datos_widget import CargarDatosWidget
-from visualizacion_jugadores_widget import VisualizacionJugadoresWidget
-from comparar_jugadores_widget import CompararJugadoresWidget
-# ---- Ejemplo de widgets "dummy" para Dashboard e Historial ----
+from historial_store import HistorialStore
+# Las páginas (y con ellas pandas, matplotlib y los módulos de estadísticas) se
+# importan al abrirlas por primera vez: ver MainWindow.construir_pagina.
+# ---- Ejemplo de widgets "dummy" para Historial ----
 # Sustituye por tus widgets reales más adelante
-class DashboardWidget(QWidget):
-    def __init__(self):
-        super().__init__()
-        layout = QVBoxLayout(self)
-        lbl = QLabel("Aquí irá el dashboard general")
-        lbl.setAlignment(Qt.AlignCenter)
-        layout.addWidget(lbl)
-
 class HistoryWidget(QWidget):
-    def __init__(self):
+    def __init__(self, store=None):
         super().__init__()
         layout = QVBoxLayout(self)
         lbl = QLabel("Aquí irá la visualización de historial de jugadores")
@@ -37,6 +30,9 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1150, 650)
         self.process = None
         self.progress_dialog = None
+        # Historial compartido: se carga una sola vez, en segundo plano, y se pasa a todas las páginas
+        self.store = HistorialStore(parent=self, cargar=False)
+        self.store.fallo_carga.connect(lambda e: QMessageBox.critical(self, "Error", f"Error cargando base de datos:\n{e}"))
 
         # Estilos visuales (puedes personalizar más en style.qss si lo deseas)
         self.setStyleSheet("""
@@ -91,9 +87,19 @@ class MainWindow(QMainWindow):
         self.timer.start(1000)
         self.update_time()
 
-        # Seleccionar la primera vista por defecto
+        # El historial se empieza a leer cuando la ventana ya está en pantalla
+        QTimer.singleShot(0, self.store.cargar_en_segundo_plano)
+
+        # Seleccionar la primera vista por defecto: su página (y con ella pandas y
+        # los módulos de estadísticas) se construye también con la ventana ya a la vista
         if self.menu_buttons:
-            self.menu_buttons[0].click()
+            self.menu_buttons[0].setChecked(True)
+            QTimer.singleShot(0, self.mostrar_primera_pagina)
+
+    def mostrar_primera_pagina(self):
+        # Si ya se eligió otra página antes de que llegara el turno, se respeta
+        if self.menu_buttons[0].isChecked():
+            self.handle_button_click(0)
 
     def setup_sidebar(self):
         sidebar = QWidget()
@@ -111,11 +117,12 @@ class MainWindow(QMainWindow):
 
         self.menu_buttons = []
         # --------- ASOCIA widgets reales aquí ----------
+        # La clase puede indicarse como "modulo.Clase" para importarla solo al abrir la página
         self.button_page_map = [
-            ("Dashboard", "view-dashboard", self.show_page, DashboardWidget),
-            ("Cargar Datos", "document-open", self.show_page, CargarDatosWidget),
-            ("Jugadores", "user-identity", self.show_page, VisualizacionJugadoresWidget),
-            ("Versus", "user-identity", self.show_page, CompararJugadoresWidget),
+            ("Clasificación", "view-dashboard", self.show_page, "clasificacion_widget.ClasificacionWidget"),
+            ("Cargar Datos", "document-open", self.show_page, "cargar_datos_widget.CargarDatosWidget"),
+            ("Jugadores", "user-identity", self.show_page, "visualizacion_jugadores_widget.VisualizacionJugadoresWidget"),
+            ("Versus", "user-identity", self.show_page, "comparar_jugadores_widget.CompararJugadoresWidget"),
             # Puedes añadir más páginas aquí
         ]
         # --------- FIN widgets ---------
@@ -169,7 +176,7 @@ class MainWindow(QMainWindow):
         header = QWidget()
         header_layout = QHBoxLayout(header)
         header_layout.setContentsMargins(0,0,0,0)
-        self.title_label = QLabel("Dashboard")
+        self.title_label = QLabel("Clasificación")
         self.title_label.setObjectName("headerTitle")
         self.time_label = QLabel()
         self.time_label.setObjectName("headerTime")
@@ -183,21 +190,36 @@ class MainWindow(QMainWindow):
         self.stacked_widget = QStackedWidget()
         content_layout.addWidget(self.stacked_widget, 1)
 
-        # Instanciar las páginas reales (o placeholders)
+        # Las páginas se construyen la primera vez que se muestran; hasta entonces hay un placeholder
         self.pages = []
+        self.paginas_construidas = set()
         for text, icon_name, callback, WidgetClass in self.button_page_map:
-            try:
-                page_widget = WidgetClass()
-                self.pages.append(page_widget)
-                self.stacked_widget.addWidget(page_widget)
-            except Exception as e:
-                placeholder = QLabel(f"Error al cargar '{text}': {e}")
-                placeholder.setAlignment(Qt.AlignCenter)
-                self.pages.append(placeholder)
-                self.stacked_widget.addWidget(placeholder)
+            placeholder = QLabel(f"Cargando '{text}'…")
+            placeholder.setAlignment(Qt.AlignCenter)
+            self.pages.append(placeholder)
+            self.stacked_widget.addWidget(placeholder)
 
         self.main_layout.addWidget(content_widget, 1)
 
+    def construir_pagina(self, index):
+        if index in self.paginas_construidas:
+            return
+        self.paginas_construidas.add(index)
+        text, _, _, WidgetClass = self.button_page_map[index]
+        try:
+            if isinstance(WidgetClass, str):
+                modulo, clase = WidgetClass.rsplit(".", 1)
+                WidgetClass = getattr(importlib.import_module(modulo), clase)
+            page_widget = WidgetClass(self.store)
+        except Exception as e:
+            page_widget = QLabel(f"Error al cargar '{text}': {e}")
+            page_widget.setAlignment(Qt.AlignCenter)
+        placeholder = self.pages[index]
+        self.stacked_widget.insertWidget(index, page_widget)
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.pages[index] = page_widget
+
     def update_time(self):
         current_time = QDateTime.currentDateTime()
         self.time_label.setText(current_time.toString("dd/MM/yyyy | hh:mm:ss"))
@@ -215,6 +237,7 @@ class MainWindow(QMainWindow):
 
     def show_page(self, index):
         if 0 <= index < self.stacked_widget.count():
+            self.construir_pagina(index)
             self.stacked_widget.setCurrentIndex(index)
             new_title = self.button_page_map[index][0]
             self.title_label.setText(new_title)
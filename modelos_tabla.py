@@ -0,0 +1,253 @@
+from PyQt5.QtWidgets import (
+    QTableView, QHeaderView, QAbstractItemView, QAbstractScrollArea, QSizePolicy, QCompleter
+)
+from PyQt5.QtCore import Qt, QAbstractTableModel, QAbstractListModel, QModelIndex
+import numpy as np
+
+# --- Tablas de estadísticas (modelo/vista) ---
+# Una fila por estadística: la primera columna es su nombre y cada columna
+# siguiente los valores de un jugador (un dict estadística -> valor). Cada
+# columna se actualiza por separado: si las filas no cambian solo se avisa a la
+# vista de las celdas que cambiaron, que repinta únicamente esas. El texto para
+# copiar (TSV) sale de los mismos datos, sin pasar por lo que se muestra.
+
+def etiqueta_estadistica(clave):
+    return clave.replace("_", " ").capitalize()
+
+def recortar_texto(texto, max_chars):
+    """Reduce el texto si es muy largo para evitar desbordes y scroll horizontal."""
+    if max_chars and len(texto) > max_chars:
+        return texto[:max_chars - 2] + "…"
+    return texto
+
+def _rango_cambiado(anteriores, nuevos):
+    """Primera y última posición en que difieren dos listas del mismo largo (None si son iguales)."""
+    cambiadas = [i for i, (a, b) in enumerate(zip(anteriores, nuevos)) if a != b]
+    return (cambiadas[0], cambiadas[-1]) if cambiadas else None
+
+def texto_tsv(filas):
+    """Filas de celdas como texto separado por tabuladores (una línea por fila)."""
+    return "\n".join("\t".join(str(celda) for celda in fila) for fila in filas)
+
+class ModeloEstadisticas(QAbstractTableModel):
+    def __init__(self, columnas=1, titulo_estadistica="Estadística", max_chars_clave=42, max_chars_valor=42,
+                 parent=None):
+        super().__init__(parent)
+        self.titulo_estadistica = titulo_estadistica
+        self.max_chars_clave = max_chars_clave
+        self.max_chars_valor = max_chars_valor
+        self.titulos = [""] * columnas
+        self.valores = [{} for _ in range(columnas)]
+        self.claves = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.claves)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.valores) + 1
+
+    def texto(self, fila, columna):
+        """Texto completo de una celda (sin recortar)."""
+        clave = self.claves[fila]
+        if columna == 0:
+            return etiqueta_estadistica(clave)
+        return str(self.valores[columna - 1].get(clave, ""))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            max_chars = self.max_chars_clave if index.column() == 0 else self.max_chars_valor
+            return recortar_texto(self.texto(index.row(), index.column()), max_chars)
+        if role == Qt.ToolTipRole:
+            return self.texto(index.row(), index.column())
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignLeft | Qt.AlignVCenter) if index.column() == 0 else int(Qt.AlignCenter)
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if orientacion == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.titulo_estadistica if seccion == 0 else self.titulos[seccion - 1]
+        return None
+
+    def actualizar_columna(self, columna, titulo, valores):
+        """
+        Cambia el título y los valores de una columna (0 = primera columna de
+        valores). Las filas son las claves de la primera columna con datos: si
+        cambian se reinicia el modelo; si no, solo se repintan las celdas de la
+        columna cuyo valor cambió.
+        """
+        valores = valores or {}
+        if titulo != self.titulos[columna]:
+            self.titulos[columna] = titulo
+            self.headerDataChanged.emit(Qt.Horizontal, columna + 1, columna + 1)
+        anteriores = self.valores[columna]
+        self.valores[columna] = valores
+        claves = list(next((v for v in self.valores if v), {}).keys())
+        if claves != self.claves:
+            self.beginResetModel()
+            self.claves = claves
+            self.endResetModel()
+        else:
+            rango = _rango_cambiado([anteriores.get(c) for c in self.claves], [valores.get(c) for c in self.claves])
+            if rango:
+                self.dataChanged.emit(self.index(rango[0], columna + 1), self.index(rango[1], columna + 1),
+                                      [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def limpiar(self):
+        self.beginResetModel()
+        self.titulos = [""] * len(self.titulos)
+        self.valores = [{} for _ in self.valores]
+        self.claves = []
+        self.endResetModel()
+
+    def tsv(self, cabecera=False):
+        """Contenido completo (sin recortar) como TSV."""
+        filas = [[self.texto(fila, col) for col in range(self.columnCount())] for fila in range(len(self.claves))]
+        if cabecera:
+            filas.insert(0, [self.titulo_estadistica] + self.titulos)
+        return texto_tsv(filas)
+
+class ModeloFilas(QAbstractTableModel):
+    """Tabla de filas con cabeceras fijas (p. ej. rivales: rival, enfrentamientos, winrate)."""
+    def __init__(self, cabeceras, parent=None):
+        super().__init__(parent)
+        self.cabeceras = list(cabeceras)
+        self.filas = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.filas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cabeceras)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return str(self.filas[index.row()][index.column()])
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if orientacion == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.cabeceras[seccion]
+        return None
+
+    def actualizar(self, filas):
+        """Cambia las filas: con el mismo número de filas solo se repintan las que cambiaron."""
+        filas = [list(fila) for fila in filas]
+        if len(filas) != len(self.filas):
+            self.beginResetModel()
+            self.filas = filas
+            self.endResetModel()
+            return
+        anteriores, self.filas = self.filas, filas
+        rango = _rango_cambiado(anteriores, filas)
+        if rango:
+            self.dataChanged.emit(self.index(rango[0], 0), self.index(rango[1], len(self.cabeceras) - 1),
+                                  [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def tsv(self, cabecera=True):
+        return texto_tsv(([self.cabeceras] if cabecera else []) + self.filas)
+
+class VistaEstadisticas(QTableView):
+    """
+    Vista de solo lectura para un ModeloEstadisticas o un ModeloFilas: sin
+    scroll propio (crece con sus filas, dentro del scroll de la página) y con
+    la primera columna el doble de ancha que cada una de las demás.
+    """
+    def __init__(self, modelo, parent=None):
+        super().__init__(parent)
+        self.setModel(modelo)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setWordWrap(False)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSizeAdjustPolicy(QAbstractScrollArea.AdjustToContents)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        columnas = self.model().columnCount()
+        ancho = self.viewport().width() // (columnas + 1)
+        for columna in range(columnas):
+            self.setColumnWidth(columna, ancho * 2 if columna == 0 else ancho)
+
+class ModeloNombres(QAbstractListModel):
+    """
+    Lista de nombres de un IndiceNombres, filtrada: solo guarda los ids de las
+    filas visibles y la vista (QListView) pide el texto de las que pinta.
+    """
+    def __init__(self, indice=None, parent=None):
+        super().__init__(parent)
+        self.indice = indice
+        self.ids = np.empty(0, dtype=np.int64)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        # EditRole: el texto que QCompleter escribe al elegir una sugerencia
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self.nombre(index.row())
+        return None
+
+    def nombre(self, fila):
+        return self.indice.nombres[self.ids[fila]]
+
+    def fila(self, nombre):
+        """Fila de un nombre entre los visibles (-1 si no está)."""
+        if self.indice is None:
+            return -1
+        filas = np.flatnonzero(self.ids == self.indice.id(nombre))
+        return int(filas[0]) if len(filas) else -1
+
+    def filtrar(self, texto, indice=None, aproximado=False):
+        """
+        Muestra los nombres que contienen 'texto' (opcionalmente de otro índice).
+        Con aproximado=True, si ninguno lo contiene se muestran las sugerencias
+        con erratas de IndiceNombres.sugerencias().
+        """
+        if indice is not None:
+            self.indice = indice
+        if self.indice is None:
+            self.mostrar(np.empty(0, dtype=np.int64))
+            return
+        ids = self.indice.buscar(texto)
+        if aproximado and not len(ids):
+            ids = self.indice.sugerencias(texto)
+        self.mostrar(ids)
+
+    def mostrar(self, ids):
+        """Muestra exactamente estos ids del índice, en este orden."""
+        self.beginResetModel()
+        self.ids = ids
+        self.endResetModel()
+
+class CompletadorNombres(QCompleter):
+    """
+    Autocompletado sobre un IndiceNombres: en cada cambio del texto la lista
+    se rellena con IndiceNombres.sugerencias() (sin tildes, con erratas y
+    ordenada por parecido), y el QCompleter la muestra tal cual.
+    """
+    def __init__(self, indice=None, limite=20, parent=None):
+        super().__init__(parent)
+        self.limite = limite
+        self.modelo = ModeloNombres(indice, self)
+        self.setModel(self.modelo)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+
+    def establecer_indice(self, indice):
+        self.modelo.indice = indice
+        self.modelo.mostrar(np.empty(0, dtype=np.int64))
+
+    def splitPath(self, texto):
+        # QCompleter llama aquí con el texto escrito antes de mostrar la lista
+        if self.modelo.indice is not None:
+            self.modelo.mostrar(self.modelo.indice.sugerencias(texto, self.limite))
+        return [""]
@@ -1,5 +1,8 @@
 import pandas as pd
 import numpy as np
+from stat_sets import sets_ganados_perdidos, columnas_puntos_sets, puntos_sets_df
+from esquema_historial import COLUMNAS_RATING, COLUMNAS_DELTA, a_numerico, a_float64, parsear_fechas, parsear_horas
+from filtro_tiempo import tiempos_ns
 
 # --- Funciones Auxiliares para Parsear Sets y Puntos ---
 def parsear_resultado_partido(resultado_str):
@@ -61,304 +64,457 @@ def calcular_puntos_partido(row):
                      index=['puntos_jugador_partido', 'puntos_rival_partido', 'sets_jugador_partido_calc', 'sets_rival_partido_calc', 'puntos_set_jugador', 'puntos_set_rival'])
 
 
-def resumen_global(df_original):
-    resumen = {}
-    
-    # --- Preprocesamiento del DataFrame ---
+def mapear_unicos(serie, funcion, dtype=object):
+    """
+    Equivalente a serie.apply(funcion) para columnas con pocos valores distintos
+    (resultado, ronda, ...): la función se evalúa una vez por valor único.
+    Devuelve un array alineado por posición con la serie.
+    """
+    codigos, unicos = pd.factorize(serie)
+    valores = np.asarray([funcion(u) for u in unicos] + [funcion(np.nan)], dtype=dtype)
+    return valores[codigos]
+
+COLUMNAS_NUMERICAS = COLUMNAS_RATING + COLUMNAS_DELTA
+
+def derivar_columnas(df):
+    """
+    Copia del historial con las columnas que las estadísticas derivan en cada
+    cálculo ya resueltas: ratings y delta numéricos, 'gano' numérico, 'fecha_dt',
+    el marcador de 'resultado' parseado y la matriz de puntos por set
+    (stat_sets.columnas_puntos_sets). Las funciones de estadísticas las
+    reutilizan cuando están presentes en vez de volver a calcularlas.
+    """
+    df = df.copy()
+    for col in COLUMNAS_NUMERICAS:
+        if col in df.columns:
+            df[col] = a_numerico(df[col])
+    if 'gano' in df.columns and not pd.api.types.is_numeric_dtype(df['gano']):
+        df['gano'] = pd.to_numeric(df['gano'], errors='coerce')
+    if 'fecha' in df.columns and 'fecha_dt' not in df.columns:
+        df['fecha_dt'] = parsear_fechas(df['fecha'])
+    if 'resultado' in df.columns:
+        df['sets_jugador_resultado'] = mapear_unicos(df['resultado'], lambda r: parsear_resultado_partido(r)[0], dtype=float)
+        df['sets_rival_resultado'] = mapear_unicos(df['resultado'], lambda r: parsear_resultado_partido(r)[1], dtype=float)
+    if 'sets' in df.columns:
+        for col, valores in columnas_puntos_sets(df['sets']).items():
+            df[col] = valores
+    return df
+
+def _preparar_partidos(df_original):
+    """
+    Copia del DataFrame con las columnas numéricas normalizadas y las columnas
+    derivadas por partido (puntos, sets). Devuelve también la matriz de puntos por set.
+    """
     # Es crucial que 'delta' y 'delta_total' sean numéricos.
-    # Si vienen con comas, conviértelos antes o aquí.
     # Esta copia asegura que el DataFrame original no se modifique si se pasa desde fuera.
-    df = df_original.copy()
+    df = df_original.reset_index(drop=True)
     
-    # Asegurar que las columnas de rating y delta son numéricas, reemplazando comas si es necesario
-    for col_num in ['rating_jugador', 'rating_rival', 'delta', 'delta_total']:
-        if df[col_num].dtype == 'object':
-            df[col_num] = df[col_num].astype(str).str.replace(',', '.', regex=False).astype(float)
-        elif pd.api.types.is_numeric_dtype(df[col_num]):
-            pass # Ya es numérico
-        else: # Intento de conversión forzada si no es objeto ni numérico conocido
-            try:
-                df[col_num] = pd.to_numeric(df[col_num].str.replace(',', '.', regex=False))
-            except Exception as e:
-                print(f"Advertencia: No se pudo convertir la columna {col_num} a numérica: {e}")
-                # Podrías optar por llenar con NaN o dejar como está si la conversión falla
-                # df[col_num] = pd.to_numeric(df[col_num], errors='coerce')
-
-
-    # Aplicar el cálculo de puntos y sets detallados
-    # Esto añade nuevas columnas al DataFrame 'jug_df' que se usará más adelante
-    # Nota: df.apply con axis=1 puede ser lento en DataFrames muy grandes.
-    # Si el rendimiento es crítico, se podrían buscar vectorizaciones.
-    temp_stats = df.apply(calcular_puntos_partido, axis=1)
-    df = pd.concat([df, temp_stats], axis=1)
-    
-    # Parsear la columna 'resultado' para obtener sets_jugador y sets_rival de forma más directa
-    parsed_results = df['resultado'].apply(parsear_resultado_partido)
-    df['sets_jugador_resultado'] = parsed_results.apply(lambda x: x[0] if x else None)
-    df['sets_rival_resultado'] = parsed_results.apply(lambda x: x[1] if x else None)
+    # El historial tipado (esquema_historial) ya trae ratings y delta numéricos;
+    # solo un DataFrame sin tipar llega aquí con texto (y coma decimal)
+    for col_num in COLUMNAS_NUMERICAS:
+        df[col_num] = a_float64(df[col_num])
+
+    # Puntos y sets detallados a partir de la matriz de puntos por set (vectorizado).
+    # Igual que calcular_puntos_partido: sin 'sets' o sin 'resultado' el partido cuenta 0 puntos.
+    puntos_sets, mascara_sets = puntos_sets_df(df)
+    mascara_sets &= df['resultado'].notna().to_numpy()[:, None]
+    sets_ganados_mat, sets_perdidos_mat = sets_ganados_perdidos(puntos_sets, mascara_sets)
+    df['puntos_jugador_partido'] = np.where(mascara_sets, puntos_sets[..., 0], 0).sum(axis=1)
+    df['puntos_rival_partido'] = np.where(mascara_sets, puntos_sets[..., 1], 0).sum(axis=1)
+    df['sets_jugador_partido_calc'] = sets_ganados_mat.sum(axis=1)
+    df['sets_rival_partido_calc'] = sets_perdidos_mat.sum(axis=1)
+
+    # Parsear la columna 'resultado' (ej. "3:1"). Hay pocos marcadores distintos,
+    # así que parsear_resultado_partido se aplica una sola vez por valor único.
+    if 'sets_jugador_resultado' not in df.columns:
+        df['sets_jugador_resultado'] = mapear_unicos(df['resultado'], lambda r: parsear_resultado_partido(r)[0], dtype=float)
+        df['sets_rival_resultado'] = mapear_unicos(df['resultado'], lambda r: parsear_resultado_partido(r)[1], dtype=float)
+    return df, puntos_sets, sets_ganados_mat, sets_perdidos_mat
+
+def _contribuciones_partido(df, puntos_sets, sets_ganados_mat, sets_perdidos_mat):
+    """
+    Columnas aditivas por partido: cada métrica del resumen que es una suma,
+    un conteo o una media se obtiene sumando estas columnas por jugador.
+    """
+    gano = pd.to_numeric(df['gano'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    delta = df['delta'].to_numpy(dtype=float, na_value=np.nan)
+    rating = df['rating_jugador'].to_numpy(dtype=float, na_value=np.nan)
+    rating_rival = df['rating_rival'].to_numpy(dtype=float, na_value=np.nan)
+    ronda = mapear_unicos(df['ronda'], lambda r: r.lower().strip() if isinstance(r, str) else None)
+    resultado = df['resultado'].to_numpy(dtype=object)
+
+    vict = gano == 1
+    derr = gano == 0
+    valido = ~np.isnan(gano)
+    delta_ok = ~np.isnan(delta)
+    delta0 = np.nan_to_num(delta)
+    pts_j = puntos_sets[..., 0]
+    pts_r = puntos_sets[..., 1]
+    dif_rating = rating - rating_rival
+    mayor = rating < rating_rival
+    menor = rating > rating_rival
+    finales = ronda == "final"
+    terceros = ronda == "3rd"
+
+    c = {
+        'partidos': np.ones(len(df), dtype=np.int64),
+        'victorias': vict,
+        'gano_validos': valido,
+        'delta_suma': delta0,
+        'delta_n': delta_ok,
+        'delta_cuadrados': delta0 ** 2,
+        'delta_vict_suma': np.where(vict, delta0, 0),
+        'delta_vict_n': vict & delta_ok,
+        'delta_derr_suma': np.where(derr, delta0, 0),
+        'delta_derr_n': derr & delta_ok,
+        'rating_suma': np.nan_to_num(rating),
+        'rating_n': ~np.isnan(rating),
+        'rival_suma': np.nan_to_num(rating_rival),
+        'rival_n': ~np.isnan(rating_rival),
+        'dif_rating_suma': np.nan_to_num(dif_rating),
+        'dif_rating_n': ~np.isnan(dif_rating),
+        'dif_puntos_suma': df['puntos_jugador_partido'].to_numpy() - df['puntos_rival_partido'].to_numpy(),
+        'sets_ganados': df['sets_jugador_resultado'].fillna(0).to_numpy(),
+        'sets_perdidos': df['sets_rival_resultado'].fillna(0).to_numpy(),
+        'puntos_ganados': df['puntos_jugador_partido'].to_numpy(),
+        'puntos_perdidos': df['puntos_rival_partido'].to_numpy(),
+        'pts_en_sg_suma': np.where(sets_ganados_mat, pts_j, 0).sum(axis=1),
+        'pts_cedidos_en_sg_suma': np.where(sets_ganados_mat, pts_r, 0).sum(axis=1),
+        'sg_n': sets_ganados_mat.sum(axis=1),
+        'pts_en_sp_suma': np.where(sets_perdidos_mat, pts_j, 0).sum(axis=1),
+        'pts_cedidos_en_sp_suma': np.where(sets_perdidos_mat, pts_r, 0).sum(axis=1),
+        'sp_n': sets_perdidos_mat.sum(axis=1),
+        'mayor_n': mayor,
+        'mayor_vict': mayor & vict,
+        'mayor_validos': mayor & valido,
+        'menor_n': menor,
+        'menor_vict': menor & vict,
+        'menor_validos': menor & valido,
+        'finales_n': finales,
+        'finales_vict': finales & vict,
+        'finales_validos': finales & valido,
+        'terceros_n': terceros,
+        'terceros_vict': terceros & vict,
+        'terceros_validos': terceros & valido,
+    }
+    for marcador in MARCADORES_VICTORIA:
+        c[f'victorias_{marcador.replace(":", "_")}'] = (resultado == marcador) & vict
+    for marcador in MARCADORES_DERROTA:
+        c[f'derrotas_{marcador.replace(":", "_")}'] = (resultado == marcador) & derr
+    contrib = pd.DataFrame(c)
+    bools = contrib.columns[contrib.dtypes == bool]
+    contrib[bools] = contrib[bools].astype(np.int64)
+    return contrib
+
+MARCADORES_VICTORIA = ["3:0", "3:1", "3:2"]
+MARCADORES_DERROTA = ["0:3", "1:3", "2:3"]
+
+def _ratio(num, den, escala=1):
+    """num/den redondeado a 2 decimales; NaN si den es 0 (como la media de una serie vacía)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.round(np.where(den > 0, num / np.where(den > 0, den, 1) * escala, np.nan), 2)
+
+def _rango_orden(serie):
+    """Códigos enteros que ordenan igual que los valores (NaN al final), para ordenar con np.lexsort."""
+    codigos, _ = pd.factorize(serie, sort=True)
+    return np.where(codigos < 0, codigos.max(initial=-1) + 1, codigos)
+
+_NS_DIA = 24 * 3600 * 10**9
+
+def claves_cronologicas(df):
+    """
+    Claves para np.lexsort (de menor a mayor prioridad) que ordenan los partidos
+    en el tiempo: el timestamp 'fecha_dt' (fecha + hora) del esquema tipado, con
+    los partidos sin fecha primero como en HistorialStore. Solo si falta
+    'fecha_dt' se ordena por los textos 'fecha' y 'hora'.
+    """
+    if 'fecha_dt' in df.columns:
+        return (tiempos_ns(df['fecha_dt']),)
+    return _rango_orden(df['hora']), _rango_orden(df['fecha'])
 
+def _ultimo_partido_por_torneo(codigo, df):
+    """
+    Posiciones (en df) del último partido de cada jugador en cada torneo, con el
+    mismo criterio que la versión por jugador: orden por día, hora_torneo y hora.
+    """
+    if 'fecha_dt' in df.columns:
+        tiempos = tiempos_ns(df['fecha_dt'])
+        hora_torneo = parsear_horas(df['hora_torneo']).to_numpy().view(np.int64)
+        orden = np.lexsort((tiempos, hora_torneo, tiempos // _NS_DIA, codigo))
+    else:
+        orden = np.lexsort((_rango_orden(df['hora']), _rango_orden(df['hora_torneo']), _rango_orden(df['fecha']), codigo))
+    claves = pd.DataFrame({
+        'jugador': codigo[orden],
+        'torneo': pd.factorize(df['torneo'])[0][orden],
+        'fecha': pd.factorize(df['fecha'])[0][orden],
+    })
+    return orden[~claves.duplicated(keep='last').to_numpy()]
+
+def _ultimos_n_por_jugador(codigo, df, n=10):
+    """Posiciones (en df) de los últimos n partidos de cada jugador en orden cronológico (claves_cronologicas)."""
+    orden = np.lexsort((*claves_cronologicas(df), codigo))
+    cod_orden = codigo[orden]
+    fin_grupo = np.cumsum(np.bincount(cod_orden)) - 1
+    desde_el_final = fin_grupo[cod_orden] - np.arange(len(orden))
+    return orden[desde_el_final < n]
+
+def _suma_por_grupo(codigo, valores, n_grupos):
+    """Suma y número de valores no nulos por grupo (equivalente a groupby().sum()/count())."""
+    valores = np.asarray(valores, dtype=float)
+    validos = ~np.isnan(valores)
+    suma = np.bincount(codigo, weights=np.where(validos, valores, 0), minlength=n_grupos)
+    return suma, np.bincount(codigo, weights=validos, minlength=n_grupos)
+
+def _registros(tabla):
+    """Filas de la tabla como dicts de valores Python (más rápido que to_dict('index') con muchas filas)."""
+    columnas = list(tabla.columns)
+    return [dict(zip(columnas, fila)) for fila in zip(*(tabla[c].tolist() for c in columnas))]
+
+def _tendencia_momentum(delta_acumulado):
+    if delta_acumulado > 5: # Umbral arbitrario
+        return "Subida reciente de rating"
+    elif delta_acumulado < -5: # Umbral arbitrario
+        return "Baja reciente de rating"
+    return "Rating estable recientemente"
+
+def _categoria_rival(rating_rival, rp):
+    """Top/Medio/Bajo según el rating del rival respecto al rating promedio del jugador (vectorizado)."""
+    return np.select(
+        [np.isnan(rating_rival) | np.isnan(rp), rating_rival >= rp + 50, rating_rival >= rp - 50],
+        ["Desconocido", "Top", "Medio"],
+        default="Bajo",
+    )
+
+def reducir_torneos(cod_ult, posicion_numerica, delta_total, n_jug):
+    """
+    Sumas por jugador de los últimos partidos de cada torneo (cod_ult: código del
+    jugador de cada uno): torneos, ganados, posición y delta_total (suma y cuenta).
+    """
+    t = pd.DataFrame({'total_torneos': np.bincount(cod_ult, minlength=n_jug),
+                      'torneos_ganados': np.bincount(cod_ult, weights=posicion_numerica == 1, minlength=n_jug)})
+    t['pos_suma'], t['pos_n'] = _suma_por_grupo(cod_ult, posicion_numerica, n_jug)
+    t['dt_suma'], t['dt_n'] = _suma_por_grupo(cod_ult, delta_total, n_jug)
+    return t
 
-    jugadores = df['jugador'].unique()
-    for jugador in jugadores:
-        jug_df = df[df['jugador'] == jugador].copy() # Usar la copia ya procesada
+def resumen_global(df_original):
+    """
+    Resumen de métricas por jugador. Todas las métricas se calculan para todos
+    los jugadores a la vez con reducciones agrupadas (groupby) sobre el
+    DataFrame completo; solo el armado final del dict recorre los jugadores.
+    """
+    resumen = {}
+    if df_original is None or df_original.empty:
+        return resumen
+
+    df = df_original[df_original['jugador'].notna()]
+    df, puntos_sets, sets_ganados_mat, sets_perdidos_mat = _preparar_partidos(df)
+    contrib = _contribuciones_partido(df, puntos_sets, sets_ganados_mat, sets_perdidos_mat)
+
+    # Código entero por jugador (en orden de aparición): todas las agrupaciones usan este código
+    codigo, nombres = pd.factorize(df['jugador'])
+    n_jug = len(nombres)
+
+    # --- Sumas por jugador (una sola pasada agrupada) ---
+    s = contrib.groupby(codigo).sum()
+    rating = df['rating_jugador'].to_numpy(dtype=float, na_value=np.nan)
+    rating_min = pd.Series(rating).groupby(codigo).min().to_numpy()
+    rating_max = pd.Series(rating).groupby(codigo).max().to_numpy()
+
+    # --- Torneos: último partido de cada torneo ---
+    ult = _ultimo_partido_por_torneo(codigo, df)
+    posicion_numerica = pd.to_numeric(df['posicion'].iloc[ult], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    t = reducir_torneos(codigo[ult], posicion_numerica,
+                        df['delta_total'].to_numpy(dtype=float, na_value=np.nan)[ult], n_jug)
+
+    # --- Momentum: delta acumulado de los últimos 10 partidos ---
+    momentum = momentum_partidos(codigo, df, n_jug)
+
+    # --- Rendimiento por tipo de ronda ---
+    ronda_lower = mapear_unicos(df['ronda'], lambda r: r.lower() if isinstance(r, str) else None)
+    rondas = contrib[['partidos', 'victorias', 'delta_suma', 'delta_n']].groupby(
+        [codigo, ronda_lower], sort=False, dropna=True).sum()
+
+    # --- Winrate por categoría de rival (relativa al rating promedio del jugador) ---
+    rp = _ratio(s['rating_suma'].to_numpy(), s['rating_n'].to_numpy())
+    cat_rival = _categoria_rival(df['rating_rival'].to_numpy(dtype=float, na_value=np.nan), rp[codigo])
+    categorias = contrib[['partidos', 'victorias', 'gano_validos']].groupby([codigo, cat_rival], sort=False).sum()
+
+    return armar_resumenes(nombres, s, rating_min, rating_max, t, momentum, rondas, categorias)
+
+def momentum_partidos(codigo, df, n_jug):
+    """Delta acumulado de los últimos 10 partidos (por fecha y hora) de cada jugador."""
+    ultimos = _ultimos_n_por_jugador(codigo, df, 10)
+    delta = a_float64(df['delta'].iloc[ultimos]).to_numpy(dtype=float, na_value=np.nan)
+    momentum, _ = _suma_por_grupo(codigo[ultimos], delta, n_jug)
+    return momentum
+
+def armar_resumenes(nombres, s, rating_min, rating_max, t, momentum, rondas, categorias):
+    """
+    Arma el dict de resumen de cada jugador a partir de las reducciones por
+    jugador (fila i = nombres[i]):
+      s: sumas de las columnas de _contribuciones_partido
+      rating_min, rating_max: arrays con el rango de rating
+      t: sumas de torneos (reducir_torneos)
+      momentum: delta acumulado de los últimos 10 partidos
+      rondas: sumas por (código, ronda) de partidos, victorias, delta_suma, delta_n
+      categorias: sumas por (código, categoría de rival) de partidos, victorias, gano_validos
+    Lo usan resumen_global y las tablas de agregados (agregados.py).
+    """
+    resumen = {}
+    partidos = s['partidos'].to_numpy()
+    victorias = s['victorias'].to_numpy()
+    derrotas = partidos - victorias
+    n_delta = s['delta_n'].to_numpy()
+    media_delta = s['delta_suma'].to_numpy() / np.where(n_delta > 0, n_delta, 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        varianza = (s['delta_cuadrados'].to_numpy() - n_delta * media_delta ** 2) / (n_delta - 1)
+    volatilidad = np.where(n_delta > 1, np.sqrt(np.clip(varianza, 0, None)), np.nan)
+    rp = _ratio(s['rating_suma'].to_numpy(), s['rating_n'].to_numpy())
+    sets_g = s['sets_ganados'].to_numpy()
+    sets_p = s['sets_perdidos'].to_numpy()
+    pts_g = s['puntos_ganados'].to_numpy()
+    pts_p = s['puntos_perdidos'].to_numpy()
+
+    m = pd.DataFrame({
+        'porcentaje_victorias_general': _ratio(victorias, partidos, 100),
+        'rating_jugador_promedio_torneo_inicio': rp,
+        'cambio_rating_neto_total_partido': np.round(s['delta_suma'].to_numpy(), 2),
+        'cambio_rating_promedio_por_partido': _ratio(s['delta_suma'].to_numpy(), n_delta),
+        'cambio_rating_promedio_por_victoria': _ratio(s['delta_vict_suma'].to_numpy(), s['delta_vict_n'].to_numpy()),
+        'cambio_rating_promedio_por_derrota': _ratio(s['delta_derr_suma'].to_numpy(), s['delta_derr_n'].to_numpy()),
+        'diferencial_puntos_promedio_partido': _ratio(s['dif_puntos_suma'].to_numpy(), partidos),
+        'porcentaje_sets_ganados': _ratio(sets_g, sets_g + sets_p, 100),
+        'porcentaje_puntos_ganados': _ratio(pts_g, pts_g + pts_p, 100),
+        'promedio_puntos_en_sets_ganados_jugador': _ratio(s['pts_en_sg_suma'].to_numpy(), s['sg_n'].to_numpy()),
+        'promedio_puntos_cedidos_en_sets_ganados_jugador': _ratio(s['pts_cedidos_en_sg_suma'].to_numpy(), s['sg_n'].to_numpy()),
+        'promedio_puntos_en_sets_perdidos_jugador': _ratio(s['pts_en_sp_suma'].to_numpy(), s['sp_n'].to_numpy()),
+        'promedio_puntos_cedidos_en_sets_perdidos_jugador': _ratio(s['pts_cedidos_en_sp_suma'].to_numpy(), s['sp_n'].to_numpy()),
+        'rating_promedio_rivales': _ratio(s['rival_suma'].to_numpy(), s['rival_n'].to_numpy()),
+        'diferencia_rating_promedio_jugador_vs_rival': _ratio(s['dif_rating_suma'].to_numpy(), s['dif_rating_n'].to_numpy()),
+        'porcentaje_victorias_vs_mayor_rating': _ratio(s['mayor_vict'].to_numpy(), s['mayor_validos'].to_numpy(), 100),
+        'winrate_total_original': _ratio(victorias, s['gano_validos'].to_numpy(), 100),
+        'volatilidad_delta': np.round(volatilidad, 2),
+        'finales_ganadas_pct': _ratio(s['finales_vict'].to_numpy(), s['finales_validos'].to_numpy(), 100),
+        'terceros_puestos_ganados_pct': _ratio(s['terceros_vict'].to_numpy(), s['terceros_validos'].to_numpy(), 100),
+    })
+    # Ojo: aquí es porcentaje de DERROTAS vs menor rating, (1 - media) * 100
+    m['porcentaje_derrotas_vs_menor_rating'] = np.round((1 - s['menor_vict'] / s['menor_validos'].where(s['menor_validos'] > 0)) * 100, 2).to_numpy()
+
+    t = t.copy()
+    t['posicion_media'] = _ratio(t['pos_suma'].to_numpy(), t['pos_n'].to_numpy())
+    t['delta_total_suma'] = np.round(t['dt_suma'].to_numpy(), 2)
+    t['delta_total_media'] = _ratio(t['dt_suma'].to_numpy(), t['dt_n'].to_numpy())
+
+    rondas_por_jugador = {}
+    for (cod, tipo), fila in zip(rondas.index, rondas.itertuples(index=False)):
+        rondas_por_jugador.setdefault(cod, {})[tipo] = {
+            'partidos_jugados': int(fila.partidos),
+            'victorias': int(fila.victorias),
+            'derrotas': int(fila.partidos - fila.victorias),
+            'win_rate': round((fila.victorias / fila.partidos) * 100, 2) if fila.partidos > 0 else None,
+            'delta_promedio': round(fila.delta_suma / fila.delta_n, 2) if fila.delta_n > 0 else np.nan,
+        }
+    categorias_por_jugador = {}
+    for (cod, cat), fila in zip(categorias.index, categorias.itertuples(index=False)):
+        categorias_por_jugador.setdefault(cod, {})[cat] = (
+            round(fila.victorias / fila.gano_validos * 100, 2) if fila.gano_validos > 0 else np.nan
+        )
+
+    m_reg = _registros(m)
+    s_reg = _registros(s)
+    t_reg = _registros(t)
+    for i, jug in enumerate(nombres):
+        sj = s_reg[i]
+        mj = m_reg[i]
+        tj = t_reg[i]
         resumen_jugador = {}
 
         # --- I. Métricas Estadísticas Básicas ---
-
-        # 1. Métricas Generales del Jugador (Kantor L):
-        resumen_jugador['total_partidos_jugados'] = len(jug_df)
-        resumen_jugador['total_victorias'] = int(jug_df['gano'].sum())
-        resumen_jugador['total_derrotas'] = resumen_jugador['total_partidos_jugados'] - resumen_jugador['total_victorias']
-        
-        if resumen_jugador['total_partidos_jugados'] > 0:
-            resumen_jugador['porcentaje_victorias_general'] = round((resumen_jugador['total_victorias'] / resumen_jugador['total_partidos_jugados']) * 100, 2)
-        else:
-            resumen_jugador['porcentaje_victorias_general'] = None
-
-        resumen_jugador['rating_jugador_promedio_torneo_inicio'] = round(jug_df['rating_jugador'].mean(), 2) # Tu 'rating_promedio' original
-        resumen_jugador['rango_rating_jugador'] = (int(jug_df['rating_jugador'].min()), int(jug_df['rating_jugador'].max())) # Tu 'rango_rating'
-
-        resumen_jugador['cambio_rating_neto_total_partido'] = round(jug_df['delta'].sum(), 2)
-        
-        if resumen_jugador['total_partidos_jugados'] > 0:
-            resumen_jugador['cambio_rating_promedio_por_partido'] = round(jug_df['delta'].mean(), 2)
-        else:
-            resumen_jugador['cambio_rating_promedio_por_partido'] = None
-            
-        if resumen_jugador['total_victorias'] > 0:
-            resumen_jugador['cambio_rating_promedio_por_victoria'] = round(jug_df[jug_df['gano'] == 1]['delta'].mean(), 2)
-        else:
-            resumen_jugador['cambio_rating_promedio_por_victoria'] = None
-            
-        if resumen_jugador['total_derrotas'] > 0:
-            resumen_jugador['cambio_rating_promedio_por_derrota'] = round(jug_df[jug_df['gano'] == 0]['delta'].mean(), 2)
-        else:
-            resumen_jugador['cambio_rating_promedio_por_derrota'] = None
-        
-        # Cambio de rating neto total por torneo (sumando el delta_total del último partido de cada torneo)
-        # Esto requiere identificar el último partido por torneo para el jugador
-        if not jug_df.empty:
-            # Asegurar que 'hora' es comparable, podría necesitar conversión si es string
-            # Si 'hora' es string HH:MM, se puede ordenar directamente. Si es datetime, también.
-             # Ordenar para asegurar que tomamos el último partido del torneo
-            jug_df_sorted_for_delta = jug_df.sort_values(by=['fecha', 'hora_torneo', 'hora'])
-            last_match_per_tournament_delta = jug_df_sorted_for_delta.drop_duplicates(subset=['torneo', 'fecha'], keep='last')
-            resumen_jugador['cambio_rating_neto_total_torneo'] = round(last_match_per_tournament_delta['delta_total'].sum(),2)
-        else:
-            resumen_jugador['cambio_rating_neto_total_torneo'] = 0
-
-
-        # 2. Métricas por Partido (ya están en jug_df['puntos_jugador_partido'], etc. de calcular_puntos_partido)
-        #    y jug_df['sets_jugador_resultado'], jug_df['sets_rival_resultado']
-        
-        # Diferencial de Puntos Promedio por Partido
-        jug_df['diferencial_puntos_partido'] = jug_df['puntos_jugador_partido'] - jug_df['puntos_rival_partido']
-        if resumen_jugador['total_partidos_jugados'] > 0:
-            resumen_jugador['diferencial_puntos_promedio_partido'] = round(jug_df['diferencial_puntos_partido'].mean(), 2)
-        else:
-            resumen_jugador['diferencial_puntos_promedio_partido'] = None
+        resumen_jugador['total_partidos_jugados'] = int(partidos[i])
+        resumen_jugador['total_victorias'] = int(victorias[i])
+        resumen_jugador['total_derrotas'] = int(derrotas[i])
+        resumen_jugador['porcentaje_victorias_general'] = mj['porcentaje_victorias_general']
+        resumen_jugador['rating_jugador_promedio_torneo_inicio'] = mj['rating_jugador_promedio_torneo_inicio']
+        rmin, rmax = rating_min[i], rating_max[i]
+        resumen_jugador['rango_rating_jugador'] = (int(rmin), int(rmax)) if not (np.isnan(rmin) or np.isnan(rmax)) else None
+        resumen_jugador['cambio_rating_neto_total_partido'] = mj['cambio_rating_neto_total_partido']
+        resumen_jugador['cambio_rating_promedio_por_partido'] = mj['cambio_rating_promedio_por_partido']
+        resumen_jugador['cambio_rating_promedio_por_victoria'] = mj['cambio_rating_promedio_por_victoria'] if victorias[i] > 0 else None
+        resumen_jugador['cambio_rating_promedio_por_derrota'] = mj['cambio_rating_promedio_por_derrota'] if derrotas[i] > 0 else None
+        resumen_jugador['cambio_rating_neto_total_torneo'] = tj['delta_total_suma']
+
+        # 2. Métricas por Partido
+        resumen_jugador['diferencial_puntos_promedio_partido'] = mj['diferencial_puntos_promedio_partido']
 
         # 3. Métricas Agregadas de Sets y Puntos (Totales y Promedios):
-        total_sets_jugador_ganados = jug_df['sets_jugador_resultado'].sum()
-        total_sets_rival_ganados = jug_df['sets_rival_resultado'].sum() #_resultado es más fiable que _calc si el parseo es bueno
-        
-        resumen_jugador['total_sets_ganados_jugador'] = int(total_sets_jugador_ganados)
-        resumen_jugador['total_sets_perdidos_jugador'] = int(total_sets_rival_ganados) # Sets perdidos por el jugador son ganados por el rival
-        
-        total_sets_disputados = total_sets_jugador_ganados + total_sets_rival_ganados
-        if total_sets_disputados > 0:
-            resumen_jugador['porcentaje_sets_ganados'] = round((total_sets_jugador_ganados / total_sets_disputados) * 100, 2)
-        else:
-            resumen_jugador['porcentaje_sets_ganados'] = None
-
-        resumen_jugador['total_puntos_ganados_jugador'] = int(jug_df['puntos_jugador_partido'].sum())
-        resumen_jugador['total_puntos_perdidos_jugador'] = int(jug_df['puntos_rival_partido'].sum())
-        
-        total_puntos_disputados = resumen_jugador['total_puntos_ganados_jugador'] + resumen_jugador['total_puntos_perdidos_jugador']
-        if total_puntos_disputados > 0:
-            resumen_jugador['porcentaje_puntos_ganados'] = round((resumen_jugador['total_puntos_ganados_jugador'] / total_puntos_disputados) * 100, 2)
-        else:
-            resumen_jugador['porcentaje_puntos_ganados'] = None
-        
-        # Promedios de puntos en sets ganados/perdidos
-        puntos_en_sets_ganados_jugador_lista = []
-        puntos_cedidos_en_sets_ganados_jugador_lista = []
-        puntos_en_sets_perdidos_jugador_lista = []
-        puntos_cedidos_en_sets_perdidos_jugador_lista = []
-
-        for _, row in jug_df.iterrows():
-            for i in range(len(row['puntos_set_jugador'])):
-                p_jug = row['puntos_set_jugador'][i]
-                p_riv = row['puntos_set_rival'][i]
-                if p_jug > p_riv: # Set ganado por el jugador
-                    puntos_en_sets_ganados_jugador_lista.append(p_jug)
-                    puntos_cedidos_en_sets_ganados_jugador_lista.append(p_riv)
-                elif p_riv > p_jug: # Set perdido por el jugador
-                    puntos_en_sets_perdidos_jugador_lista.append(p_jug)
-                    puntos_cedidos_en_sets_perdidos_jugador_lista.append(p_riv)
-        
-        resumen_jugador['promedio_puntos_en_sets_ganados_jugador'] = round(np.mean(puntos_en_sets_ganados_jugador_lista), 2) if puntos_en_sets_ganados_jugador_lista else None
-        resumen_jugador['promedio_puntos_cedidos_en_sets_ganados_jugador'] = round(np.mean(puntos_cedidos_en_sets_ganados_jugador_lista), 2) if puntos_cedidos_en_sets_ganados_jugador_lista else None
-        resumen_jugador['promedio_puntos_en_sets_perdidos_jugador'] = round(np.mean(puntos_en_sets_perdidos_jugador_lista), 2) if puntos_en_sets_perdidos_jugador_lista else None
-        resumen_jugador['promedio_puntos_cedidos_en_sets_perdidos_jugador'] = round(np.mean(puntos_cedidos_en_sets_perdidos_jugador_lista), 2) if puntos_cedidos_en_sets_perdidos_jugador_lista else None
+        resumen_jugador['total_sets_ganados_jugador'] = int(sj['sets_ganados'])
+        resumen_jugador['total_sets_perdidos_jugador'] = int(sj['sets_perdidos'])
+        resumen_jugador['porcentaje_sets_ganados'] = mj['porcentaje_sets_ganados'] if sets_g[i] + sets_p[i] > 0 else None
+        resumen_jugador['total_puntos_ganados_jugador'] = int(sj['puntos_ganados'])
+        resumen_jugador['total_puntos_perdidos_jugador'] = int(sj['puntos_perdidos'])
+        resumen_jugador['porcentaje_puntos_ganados'] = mj['porcentaje_puntos_ganados'] if pts_g[i] + pts_p[i] > 0 else None
+        resumen_jugador['promedio_puntos_en_sets_ganados_jugador'] = mj['promedio_puntos_en_sets_ganados_jugador'] if sj['sg_n'] else None
+        resumen_jugador['promedio_puntos_cedidos_en_sets_ganados_jugador'] = mj['promedio_puntos_cedidos_en_sets_ganados_jugador'] if sj['sg_n'] else None
+        resumen_jugador['promedio_puntos_en_sets_perdidos_jugador'] = mj['promedio_puntos_en_sets_perdidos_jugador'] if sj['sp_n'] else None
+        resumen_jugador['promedio_puntos_cedidos_en_sets_perdidos_jugador'] = mj['promedio_puntos_cedidos_en_sets_perdidos_jugador'] if sj['sp_n'] else None
 
         # 4. Métricas de Rendimiento vs. Rating del Rival:
-        if resumen_jugador['total_partidos_jugados'] > 0:
-            resumen_jugador['rating_promedio_rivales'] = round(jug_df['rating_rival'].mean(), 2)
-            jug_df['diferencia_rating_jugador_rival'] = jug_df['rating_jugador'] - jug_df['rating_rival']
-            resumen_jugador['diferencia_rating_promedio_jugador_vs_rival'] = round(jug_df['diferencia_rating_jugador_rival'].mean(), 2)
-        else:
-            resumen_jugador['rating_promedio_rivales'] = None
-            resumen_jugador['diferencia_rating_promedio_jugador_vs_rival'] = None
-
-        vs_mayor_rating_df = jug_df[jug_df['rating_jugador'] < jug_df['rating_rival']]
-        vs_menor_rating_df = jug_df[jug_df['rating_jugador'] > jug_df['rating_rival']]
-        
-        resumen_jugador['victorias_vs_mayor_rating'] = int(vs_mayor_rating_df['gano'].sum())
-        resumen_jugador['derrotas_vs_mayor_rating'] = len(vs_mayor_rating_df) - resumen_jugador['victorias_vs_mayor_rating']
-        resumen_jugador['victorias_vs_menor_rating'] = int(vs_menor_rating_df['gano'].sum())
-        resumen_jugador['derrotas_vs_menor_rating'] = len(vs_menor_rating_df) - resumen_jugador['victorias_vs_menor_rating']
-
-        if not vs_mayor_rating_df.empty:
-            resumen_jugador['porcentaje_victorias_vs_mayor_rating'] = round(vs_mayor_rating_df['gano'].mean() * 100, 2)
-        else:
-            resumen_jugador['porcentaje_victorias_vs_mayor_rating'] = None
-            
-        if not vs_menor_rating_df.empty:
-            # Ojo: aquí es porcentaje de DERROTAS vs menor rating
-            resumen_jugador['porcentaje_derrotas_vs_menor_rating'] = round((1 - vs_menor_rating_df['gano'].mean()) * 100, 2) if len(vs_menor_rating_df) > 0 else None
-        else:
-            resumen_jugador['porcentaje_derrotas_vs_menor_rating'] = None
+        resumen_jugador['rating_promedio_rivales'] = mj['rating_promedio_rivales']
+        resumen_jugador['diferencia_rating_promedio_jugador_vs_rival'] = mj['diferencia_rating_promedio_jugador_vs_rival']
+        resumen_jugador['victorias_vs_mayor_rating'] = int(sj['mayor_vict'])
+        resumen_jugador['derrotas_vs_mayor_rating'] = int(sj['mayor_n'] - sj['mayor_vict'])
+        resumen_jugador['victorias_vs_menor_rating'] = int(sj['menor_vict'])
+        resumen_jugador['derrotas_vs_menor_rating'] = int(sj['menor_n'] - sj['menor_vict'])
+        resumen_jugador['porcentaje_victorias_vs_mayor_rating'] = mj['porcentaje_victorias_vs_mayor_rating'] if sj['mayor_n'] else None
+        # Ojo: aquí es porcentaje de DERROTAS vs menor rating
+        resumen_jugador['porcentaje_derrotas_vs_menor_rating'] = mj['porcentaje_derrotas_vs_menor_rating'] if sj['menor_n'] else None
 
         # 5. Análisis de Resultados Específicos de Partido:
         resumen_jugador['frecuencia_marcadores'] = {}
-        marcadores_posibles_victoria = ["3:0", "3:1", "3:2"]
-        marcadores_posibles_derrota = ["0:3", "1:3", "2:3"]
-
-        for marcador in marcadores_posibles_victoria:
-            resumen_jugador['frecuencia_marcadores'][f'victorias_{marcador.replace(":", "_")}'] = int(jug_df[(jug_df['resultado'] == marcador) & (jug_df['gano'] == 1)].shape[0])
-        for marcador in marcadores_posibles_derrota:
-            resumen_jugador['frecuencia_marcadores'][f'derrotas_{marcador.replace(":", "_")}'] = int(jug_df[(jug_df['resultado'] == marcador) & (jug_df['gano'] == 0)].shape[0])
-        
-        # Porcentajes (opcional, si lo necesitas)
-        # ej. resumen_jugador['porcentaje_victorias_3_0'] = (resumen_jugador['frecuencia_marcadores']['victorias_3_0'] / resumen_jugador['total_victorias']) * 100 if resumen_jugador['total_victorias'] > 0 else None
-
+        for marcador in MARCADORES_VICTORIA:
+            clave = f'victorias_{marcador.replace(":", "_")}'
+            resumen_jugador['frecuencia_marcadores'][clave] = int(sj[clave])
+        for marcador in MARCADORES_DERROTA:
+            clave = f'derrotas_{marcador.replace(":", "_")}'
+            resumen_jugador['frecuencia_marcadores'][clave] = int(sj[clave])
 
         # 6. Métricas por Tipo de Ronda:
-        resumen_jugador['rendimiento_por_ronda'] = {}
-        tipos_ronda = jug_df['ronda'].str.lower().unique() # Usar str.lower() para consistencia
-        
-        for tipo in tipos_ronda:
-            if pd.isna(tipo): continue
-            ronda_df = jug_df[jug_df['ronda'].str.lower() == tipo]
-            if not ronda_df.empty:
-                victorias_ronda = int(ronda_df['gano'].sum())
-                partidos_ronda = len(ronda_df)
-                resumen_jugador['rendimiento_por_ronda'][tipo] = {
-                    'partidos_jugados': partidos_ronda,
-                    'victorias': victorias_ronda,
-                    'derrotas': partidos_ronda - victorias_ronda,
-                    'win_rate': round((victorias_ronda / partidos_ronda) * 100, 2) if partidos_ronda > 0 else None,
-                    'delta_promedio': round(ronda_df['delta'].mean(), 2) if partidos_ronda > 0 else None
-                }
-
-        # 7. Métricas por Torneo:
-        resumen_jugador['total_torneos_jugados'] = jug_df[['torneo', 'fecha']].drop_duplicates().shape[0] # Tu 'total_torneos'
-        
-        if resumen_jugador['total_torneos_jugados'] > 0:
-            # Asumimos que la columna 'posicion' indica la posición final en el torneo
-            # Si 'posicion' puede ser no numérica o tener strings, hay que limpiarla
-            jug_df['posicion_numerica'] = pd.to_numeric(jug_df['posicion'], errors='coerce')
-            # Tomamos la posición del último partido del jugador en cada torneo
-            # Esto es una simplificación; la posición real debería ser única por torneo/jugador
-            posiciones_torneo = jug_df.sort_values(by=['fecha', 'hora_torneo', 'hora']).drop_duplicates(subset=['torneo', 'fecha'], keep='last')
-            
-            resumen_jugador['posicion_promedio_torneos'] = round(posiciones_torneo['posicion_numerica'].mean(),2) if not posiciones_torneo.empty else None
-            resumen_jugador['torneos_ganados'] = int(posiciones_torneo[posiciones_torneo['posicion_numerica'] == 1].shape[0]) if not posiciones_torneo.empty else 0
-            
-            if resumen_jugador['total_torneos_jugados'] > 0 :
-                 resumen_jugador['porcentaje_torneos_ganados'] = round((resumen_jugador['torneos_ganados'] / resumen_jugador['total_torneos_jugados']) * 100, 2) if resumen_jugador['total_torneos_jugados'] > 0 else None
-            else:
-                 resumen_jugador['porcentaje_torneos_ganados'] = None
-            
-            resumen_jugador['delta_total_promedio_por_torneo'] = round(posiciones_torneo['delta_total'].mean(), 2) if not posiciones_torneo.empty else None
-        else:
-            resumen_jugador['posicion_promedio_torneos'] = None
-            resumen_jugador['torneos_ganados'] = 0
-            resumen_jugador['porcentaje_torneos_ganados'] = None
-            resumen_jugador['delta_total_promedio_por_torneo'] = None
+        resumen_jugador['rendimiento_por_ronda'] = rondas_por_jugador.get(i, {})
 
+        # 7. Métricas por Torneo (posición del último partido del jugador en cada torneo):
+        total_torneos = int(tj['total_torneos'])
+        resumen_jugador['total_torneos_jugados'] = total_torneos
+        resumen_jugador['posicion_promedio_torneos'] = tj['posicion_media']
+        resumen_jugador['torneos_ganados'] = int(tj['torneos_ganados'])
+        resumen_jugador['porcentaje_torneos_ganados'] = round((tj['torneos_ganados'] / total_torneos) * 100, 2) if total_torneos > 0 else None
+        resumen_jugador['delta_total_promedio_por_torneo'] = tj['delta_total_media']
 
         # --- Métricas que ya tenías (adaptadas o mantenidas) ---
-        resumen_jugador['winrate_total_original'] = round(jug_df['gano'].mean() * 100, 2) if not jug_df.empty else None # Tu 'winrate_total'
-        resumen_jugador['volatilidad_delta'] = round(jug_df['delta'].std(), 2) if not jug_df.empty else None
+        resumen_jugador['winrate_total_original'] = mj['winrate_total_original']
+        resumen_jugador['volatilidad_delta'] = mj['volatilidad_delta']
 
         # Momentum (tendencia en los últimos N partidos, aquí N=10)
-        # Ordenar por fecha y hora del partido para asegurar la secuencia correcta
-        # Asumo que 'hora' es la hora del partido. Si 'hora_torneo' es más relevante para secuencia, ajustar.
-        ultimos = jug_df.sort_values(['fecha', 'hora']).tail(10) 
-        if len(ultimos) >= 2: # Necesitas al menos 2 puntos para una tendencia
-            # Usar 'rating_jugador' al final del partido. Si tienes 'rating_despues_partido', sería mejor.
-            # Aquí usamos el rating_jugador que parece ser el rating *antes* del torneo o una snapshot.
-            # Para un momentum real de rating, necesitarías el rating después de cada partido.
-            # Como alternativa, podemos ver el 'delta' acumulado en los últimos partidos.
-            momentum_delta_acumulado = ultimos['delta'].sum()
-            
-            if momentum_delta_acumulado > 5: # Umbral arbitrario
-                tendencia = "Subida reciente de rating"
-            elif momentum_delta_acumulado < -5: # Umbral arbitrario
-                tendencia = "Baja reciente de rating"
-            else:
-                tendencia = "Rating estable recientemente"
-            resumen_jugador['momentum_rating_ultimos_10_partidos'] = tendencia
-            resumen_jugador['momentum_delta_acumulado_ultimos_10'] = round(momentum_delta_acumulado,2)
+        if partidos[i] >= 2: # Necesitas al menos 2 puntos para una tendencia
+            momentum_delta_acumulado = momentum[i]
+            resumen_jugador['momentum_rating_ultimos_10_partidos'] = _tendencia_momentum(momentum_delta_acumulado)
+            resumen_jugador['momentum_delta_acumulado_ultimos_10'] = round(momentum_delta_acumulado, 2)
         else:
             resumen_jugador['momentum_rating_ultimos_10_partidos'] = "No hay suficientes datos (menos de 10 o 2 partidos)"
             resumen_jugador['momentum_delta_acumulado_ultimos_10'] = None
 
+        cats = categorias_por_jugador.get(i, {})
+        resumen_jugador['winrate_vs_categoria_rival'] = {
+            f'winrate_vs_{cat}': cats.get(cat) for cat in ['Top', 'Medio', 'Bajo', 'Desconocido']
+        }
 
-        # Definir categorías rivales según rating promedio jugador (tu lógica original)
-        rp = resumen_jugador['rating_jugador_promedio_torneo_inicio'] # Usar el rating promedio que calculamos
-        def rival_cat(rat_rival):
-            if pd.isna(rat_rival) or pd.isna(rp): return "Desconocido"
-            if rat_rival >= rp + 50:
-                return "Top"
-            elif rat_rival >= rp - 50: # Originalmente era rp - 50. Si es rat >= rp - 50 es "Medio", si no "Bajo".
-                return "Medio"
-            else:
-                return "Bajo"
-        jug_df['cat_rival'] = jug_df['rating_rival'].apply(rival_cat)
-
-        resumen_jugador['winrate_vs_categoria_rival'] = {}
-        for cat in ['Top', 'Medio', 'Bajo', 'Desconocido']:
-            mask = jug_df['cat_rival'] == cat
-            cat_df = jug_df[mask]
-            if not cat_df.empty:
-                resumen_jugador['winrate_vs_categoria_rival'][f'winrate_vs_{cat}'] = round(cat_df['gano'].mean() * 100, 2)
-            else:
-                resumen_jugador['winrate_vs_categoria_rival'][f'winrate_vs_{cat}'] = None
-        
-        # Winrate en finales y terceros puestos (tu lógica original, ligeramente ajustada para consistencia)
-        # Usar .str.contains es bueno, pero ser específico con .str.lower() == "final" o "3rd" puede ser más robusto si no hay variaciones
-        finales_df = jug_df[jug_df['ronda'].str.lower().str.strip() == "final"]
-        terceros_df = jug_df[jug_df['ronda'].str.lower().str.strip() == "3rd"]
-
-        resumen_jugador['finales_jugadas'] = len(finales_df)
-        if not finales_df.empty:
-            resumen_jugador['finales_ganadas'] = int(finales_df['gano'].sum())
-            resumen_jugador['finales_ganadas_pct'] = round(finales_df['gano'].mean() * 100, 2)
-        else:
-            resumen_jugador['finales_ganadas'] = 0
-            resumen_jugador['finales_ganadas_pct'] = None
-
-        resumen_jugador['terceros_puestos_jugados'] = len(terceros_df)
-        if not terceros_df.empty:
-            resumen_jugador['terceros_puestos_ganados'] = int(terceros_df['gano'].sum())
-            resumen_jugador['terceros_puestos_ganados_pct'] = round(terceros_df['gano'].mean() * 100, 2)
-        else:
-            resumen_jugador['terceros_puestos_ganados'] = 0
-            resumen_jugador['terceros_puestos_ganados_pct'] = None
+        # Winrate en finales y terceros puestos
+        resumen_jugador['finales_jugadas'] = int(sj['finales_n'])
+        resumen_jugador['finales_ganadas'] = int(sj['finales_vict'])
+        resumen_jugador['finales_ganadas_pct'] = mj['finales_ganadas_pct'] if sj['finales_n'] else None
+        resumen_jugador['terceros_puestos_jugados'] = int(sj['terceros_n'])
+        resumen_jugador['terceros_puestos_ganados'] = int(sj['terceros_vict'])
+        resumen_jugador['terceros_puestos_ganados_pct'] = mj['terceros_puestos_ganados_pct'] if sj['terceros_n'] else None
 
-        resumen[jugador] = resumen_jugador
+        resumen[jug] = resumen_jugador
 
     return resumen
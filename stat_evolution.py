@@ -1,12 +1,57 @@
-import pandas as pd
+import numpy as np
+from esquema_historial import parsear_fechas
 
 def evolution_stats(df):
     """
     Evolución mensual/anual del rating de cada jugador.
     """
     df = df.copy()  # <--- Añade esto al inicio de la función
-    df['fecha_dt'] = pd.to_datetime(df['fecha'], errors='coerce')
+    if 'fecha_dt' not in df.columns:
+        df['fecha_dt'] = parsear_fechas(df['fecha'])
     df = df.dropna(subset=['fecha_dt', 'rating_jugador'])
+    df['rating_jugador'] = df['rating_jugador'].astype(float)  # Int16 -> float: la media admite decimales y NaN
     df['mes'] = df['fecha_dt'].dt.to_period('M')
-    evolution = df.groupby(['jugador', 'mes'])['rating_jugador'].mean().unstack(0)
-    return evolution
\ No newline at end of file
+    evolution = df.groupby(['jugador', 'mes'], observed=True)['rating_jugador'].mean().unstack(0)
+    return evolution
+
+# --- Periodos de la evolución ---
+# Granularidades de los acumulados de evolución (agregados.py): nombre ->
+# (etiqueta, días que hay que sumar al inicio de un periodo para caer en el siguiente)
+GRANULARIDADES = {
+    'semana': ("Semana", 7),
+    'mes': ("Mes", 31),
+    'trimestre': ("Trimestre", 92),
+    'año': ("Año", 366),
+}
+
+def inicio_periodo(fechas, granularidad):
+    """
+    Inicio del periodo (lunes, día 1 del mes, del trimestre o del año) de cada
+    fecha, como datetime64[ns]. NaT se conserva.
+    """
+    dias = np.asarray(fechas, dtype='datetime64[ns]').astype('datetime64[D]')
+    if granularidad == 'semana':
+        # El 1970-01-01 fue jueves: (días + 3) % 7 es el día de la semana contando desde el lunes
+        inicio = dias - (dias.view(np.int64) + 3) % 7
+    elif granularidad == 'mes':
+        inicio = dias.astype('datetime64[M]')
+    elif granularidad == 'trimestre':
+        meses = dias.astype('datetime64[M]')
+        inicio = meses - meses.view(np.int64) % 3
+    elif granularidad == 'año':
+        inicio = dias.astype('datetime64[Y]')
+    else:
+        raise ValueError(f"Granularidad desconocida: {granularidad}")
+    inicio = inicio.astype('datetime64[ns]')
+    inicio[np.isnat(dias)] = np.datetime64('NaT')
+    return inicio
+
+def etiqueta_periodo(inicio, granularidad):
+    """Texto corto del periodo que empieza en 'inicio' para los ejes de los gráficos."""
+    if granularidad == 'semana':
+        return inicio.strftime('%Y-%m-%d')
+    if granularidad == 'trimestre':
+        return f"{inicio.year}-T{(inicio.month - 1) // 3 + 1}"
+    if granularidad == 'año':
+        return inicio.strftime('%Y')
+    return inicio.strftime('%Y-%m')
@@ -1,61 +1,89 @@
 import pandas as pd
 import numpy as np
+from stat_sets import puntos_sets_df, sets_ganados_perdidos, ultimo_set
+from stat_core import mapear_unicos
+
+def _es_final(ronda):
+    return isinstance(ronda, str) and "final" in ronda.lower()
+
+def _pct(suma, cuenta):
+    return round(suma / cuenta * 100, 2) if cuenta else np.nan
 
 def killer_instinct_stats(df):
     """
-    Devuelve estadísticas killer instinct para cada jugador
+    Devuelve estadísticas killer instinct para cada jugador.
+    Todas las métricas se calculan por partido sobre el DataFrame completo y se
+    reducen por jugador con un único groupby.
     """
     resultado = {}
+    if df.empty:
+        return resultado
+
+    # Parseo único de la columna 'sets' para todo el DataFrame
+    puntos, mascara = puntos_sets_df(df)
+    ganados, perdidos = sets_ganados_perdidos(puntos, mascara)
+    gano_num = pd.to_numeric(df['gano'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    gano = gano_num == 1
+    gano_valido = ~np.isnan(gano_num)
+    gano_0 = np.where(gano_valido, gano_num, 0)
+
+    # 1. Partidos a 5 sets
+    cinco_sets = mascara.sum(axis=1) >= 5
+
+    # 2. Finales: basta con buscar la subcadena una vez por valor distinto de 'ronda'
+    finales = mapear_unicos(df['ronda'], _es_final, dtype=bool)
 
-    for jugador in df['jugador'].unique():
-        jug_df = df[df['jugador'] == jugador].copy()
+    # 3. ¿En algún momento fue perdiendo por 2 o más sets en el marcador?
+    diferencia = np.cumsum(ganados.astype(np.int8) - perdidos.astype(np.int8), axis=1)
+    perdia = (diferencia < -1).any(axis=1)
+    # Si perdía y no hay resultado, el partido queda como NaN (no cuenta en el porcentaje)
+    remontada_valida = ~perdia | gano_valido
+    remontada = np.where(perdia, gano_0, 0)
+
+    # 4. Match point: ganó el último set por diferencia de 2 o más puntos (simulación)
+    ult, tiene_sets = ultimo_set(puntos, mascara)
+    margen = ult[:, 0].astype(int) - ult[:, 1]
+    convirtio_mp = tiene_sets & gano & (margen >= 2)
+
+    contrib = pd.DataFrame({
+        'partidos': 1,
+        'partidos_5sets': cinco_sets,
+        'gano_5sets': np.where(cinco_sets, gano_0, 0),
+        'validos_5sets': cinco_sets & gano_valido,
+        'finales': finales,
+        'gano_finales': np.where(finales, gano_0, 0),
+        'validos_finales': finales & gano_valido,
+        'remontadas': remontada,
+        'validos_remontada': remontada_valida,
+        'convirtio_mp': convirtio_mp,
+    })
+    codigo, jugadores = pd.factorize(df['jugador'])
+    t = contrib.groupby(codigo).sum()
+    t.index = jugadores[t.index]
+
+    for jugador, fila in zip(t.index, t.itertuples(index=False)):
         ki = {}
 
         # 1. Win Rate en 5to set
-        jug_df['sets_jugados'] = jug_df['sets'].apply(lambda x: len(str(x).split()) if pd.notnull(x) else 0)
-        cinco_sets = jug_df[jug_df['sets_jugados'] >= 5]
-        if not cinco_sets.empty:
-            ki['winrate_5sets'] = round(cinco_sets['gano'].mean() * 100, 2)
-            ki['partidos_5sets'] = len(cinco_sets)
+        if fila.partidos_5sets:
+            ki['winrate_5sets'] = _pct(fila.gano_5sets, fila.validos_5sets)
+            ki['partidos_5sets'] = int(fila.partidos_5sets)
         else:
             ki['winrate_5sets'] = None
             ki['partidos_5sets'] = 0
 
         # 2. Win Rate en finales
-        finales = jug_df[jug_df['ronda'].str.lower().str.contains("final", na=False)]
-        if not finales.empty:
-            ki['winrate_finales'] = round(finales['gano'].mean() * 100, 2)
-            ki['finales_jugadas'] = len(finales)
+        if fila.finales:
+            ki['winrate_finales'] = _pct(fila.gano_finales, fila.validos_finales)
+            ki['finales_jugadas'] = int(fila.finales)
         else:
             ki['winrate_finales'] = None
             ki['finales_jugadas'] = 0
 
         # 3. Victorias viniendo desde atrás (>1 set abajo)
-        def fue_remontada(row):
-            # Busca score sets, tipo "4-11 13-11 8-11 11-9 11-8"
-            sets = str(row['sets']).split()
-            # Contar sets ganados/perdidos por orden
-            mi_sets, su_sets = 0, 0
-            mi, su = [], []
-            for s in sets:
-                try:
-                    a, b = map(int, s.split('-'))
-                    mi.append(a)
-                    su.append(b)
-                except:
-                    continue
-            # ¿En algún momento fue perdiendo por 2 o más sets en el marcador?
-            diff = 0
-            perdia = 0
-            for i in range(len(mi)):
-                diff += (mi[i] > su[i]) - (mi[i] < su[i])
-                if diff < -1:
-                    perdia = 1
-            return perdia and row['gano']
-        jug_df['remontada'] = jug_df.apply(fue_remontada, axis=1)
-        if jug_df['remontada'].sum() > 0:
-            ki['victorias_remontadas'] = jug_df['remontada'].sum()
-            ki['remontada_pct'] = round(100 * jug_df['remontada'].mean(), 2)
+        if fila.remontadas > 0:
+            ki['victorias_remontadas'] = int(fila.remontadas)
+            ki['remontada_pct'] = _pct(fila.remontadas, fila.validos_remontada)
         else:
             ki['victorias_remontadas'] = 0
             ki['remontada_pct'] = 0
@@ -63,25 +91,8 @@ def killer_instinct_stats(df):
         # 4. Conversión match point (>80%)
         # Definición simple: ¿cuando tuvo la oportunidad de cerrar partido, lo hizo?
         # Aquí: si ganó el último set por diferencia de 2 o más puntos (simulación)
-        def cerro_match_point(row):
-            try:
-                sets = str(row['sets']).split()
-                if not sets: return np.nan
-                ultimo_set = sets[-1]
-                a, b = map(int, ultimo_set.split('-'))
-                # Ganó el último set
-                if row['gano'] and a > b and (a - b) >= 2:
-                    return 1
-            except:
-                pass
-            return 0
-        jug_df['convirtio_match_point'] = jug_df.apply(cerro_match_point, axis=1)
-        total_casos_mp = jug_df['convirtio_match_point'].notnull().sum()
-        if total_casos_mp:
-            ki['match_point_conversion_pct'] = round(100 * jug_df['convirtio_match_point'].mean(), 2)
-        else:
-            ki['match_point_conversion_pct'] = None
+        ki['match_point_conversion_pct'] = _pct(fila.convirtio_mp, fila.partidos)
 
         resultado[jugador] = ki
 
-    return resultado
\ No newline at end of file
+    return resultado
@@ -1,21 +1,90 @@
 import pandas as pd
+import numpy as np
+from stat_core import mapear_unicos, parsear_resultado_partido
+from stat_sets import puntos_sets_df
+from esquema_historial import a_float64
+
+# --- Índice cara a cara (jugador, rival) ---
+# Un DataFrame con MultiIndex (jugador, rival) y columnas aditivas, de modo que
+# el índice de un historial ampliado es la suma del índice viejo y el de los
+# partidos nuevos. Las búsquedas por pareja son búsquedas hash en el MultiIndex.
+COLUMNAS_H2H = ['partidos', 'con_resultado', 'victorias', 'sets_ganados', 'sets_perdidos',
+                'puntos_favor', 'puntos_contra', 'delta_suma']
+
+def indice_h2h(df):
+    """Construye el índice cara a cara de un DataFrame de partidos en una sola pasada agrupada."""
+    if df.empty:
+        vacio = pd.MultiIndex.from_arrays([[], []], names=['jugador', 'rival'])
+        return pd.DataFrame(0, index=vacio, columns=COLUMNAS_H2H)
+    gano = pd.to_numeric(df['gano'], errors='coerce')
+    delta = a_float64(df['delta'])
+    if 'sets_jugador_resultado' in df.columns:
+        sets_jugador = df['sets_jugador_resultado'].to_numpy(dtype=float, na_value=np.nan)
+        sets_rival = df['sets_rival_resultado'].to_numpy(dtype=float, na_value=np.nan)
+    else:
+        sets_jugador = mapear_unicos(df['resultado'], lambda r: parsear_resultado_partido(r)[0], dtype=float)
+        sets_rival = mapear_unicos(df['resultado'], lambda r: parsear_resultado_partido(r)[1], dtype=float)
+    # Igual que en resumen_global: sin 'resultado' el partido cuenta 0 puntos
+    puntos, mascara = puntos_sets_df(df)
+    mascara &= df['resultado'].notna().to_numpy()[:, None]
+    puntos = np.where(mascara[..., None], puntos, 0).sum(axis=1)
+    contrib = pd.DataFrame({
+        'jugador': df['jugador'].to_numpy(),
+        'rival': df['rival'].to_numpy(),
+        'partidos': 1,
+        'con_resultado': gano.notna().to_numpy(dtype=int),
+        'victorias': gano.fillna(0).to_numpy(dtype=float),
+        'sets_ganados': np.nan_to_num(sets_jugador),
+        'sets_perdidos': np.nan_to_num(sets_rival),
+        'puntos_favor': puntos[:, 0],
+        'puntos_contra': puntos[:, 1],
+        'delta_suma': delta.fillna(0).to_numpy(),
+    })
+    # dropna=False: cada partido cuenta, así la suma de 'partidos' coincide con las filas del historial
+    return contrib.groupby(['jugador', 'rival'], sort=False, dropna=False)[COLUMNAS_H2H].sum()
+
+def sumar_indices_h2h(indice, indice_nuevos):
+    """Índice actualizado tras añadir partidos: suma por pareja (las parejas nuevas se agregan al final)."""
+    if indice.empty:
+        return indice_nuevos
+    return pd.concat([indice, indice_nuevos]).groupby(level=['jugador', 'rival'], sort=False, dropna=False).sum()
+
+def enfrentamiento(indice, jugador, rival):
+    """Totales de 'jugador' contra 'rival' (dict) o None si nunca se enfrentaron."""
+    try:
+        fila = indice.loc[(jugador, rival)]
+    except KeyError:
+        return None
+    return fila.to_dict()
+
+def top_rivales_h2h(indice, jugador, top_n=5):
+    """Los top_n rivales más frecuentes de un jugador con sus totales, ordenados por partidos."""
+    try:
+        rivales = indice.xs(jugador, level='jugador')
+    except KeyError:
+        return indice.iloc[:0].droplevel('jugador')
+    rivales = rivales[rivales.index.notna()]
+    return rivales.sort_values('partidos', ascending=False, kind='stable').head(top_n)
 
 def opponents_stats(df, top_n=5):
     """
     Devuelve los principales rivales y winrate vs esos rivales para cada jugador.
     """
     resultados = {}
+    # Top rivales de todos los jugadores con un único orden estable (empates en orden de aparición)
+    tabla = indice_h2h(df).reset_index()
+    tabla = tabla[tabla['rival'].notna()]
+    tabla = tabla.sort_values('partidos', ascending=False, kind='stable')
+    tabla = tabla.groupby('jugador', sort=False).head(top_n)
+    top_por_jugador = dict(list(tabla.groupby('jugador', sort=False)))
     for jugador in df['jugador'].unique():
-        jug_df = df[df['jugador'] == jugador]
+        top = top_por_jugador.get(jugador, tabla.iloc[:0])
         # Contar los rivales más frecuentes
-        top_rivales = jug_df['rival'].value_counts().head(top_n).to_dict()
+        top_rivales = dict(zip(top['rival'], top['partidos'].astype(int)))
         winrate_por_rival = {}
-        for rival in top_rivales:
-            enfrentamientos = jug_df[jug_df['rival'] == rival]
-            ganados = enfrentamientos['gano'].sum()
-            total = enfrentamientos['gano'].count()
-            if total > 0:
-                winrate = ganados / total
+        for rival, victorias, con_resultado in zip(top['rival'], top['victorias'], top['con_resultado']):
+            if con_resultado > 0:
+                winrate = victorias / con_resultado
                 winrate_por_rival[rival] = round(winrate, 2)
             else:
                 winrate_por_rival[rival] = None
@@ -23,4 +92,4 @@ def opponents_stats(df, top_n=5):
             'top_rivales': top_rivales,
             'winrate_por_rival': winrate_por_rival
         }
-    return resultados
\ No newline at end of file
+    return resultados
@@ -1,155 +1,186 @@
 import numpy as np
+import pandas as pd
 from stat_core import resumen_global
 from stat_ki import killer_instinct_stats
 from stat_streaks import streaks_stats
 from stat_evolution import evolution_stats
 from stat_opponents import opponents_stats
 
-def calificacion_jugador(df_jugador):
+# Ponderación contextual
+PESOS = {
+    'rating': 0.20,
+    'winrate': 0.22,
+    'volumen': 0.14,
+    'volatilidad': 0.10,
+    'momentum': 0.08,
+    'killer_instinct': 0.12,
+    'experiencia': 0.08,
+    'racha_max': 0.06
+}
+
+# Columnas del desglose, en el orden de PESOS
+COLUMNAS_DETALLE = ['rating_score', 'win_score', 'exp_score', 'volatilidad_score',
+                    'momentum_score', 'killer_instinct_score', 'torneos_score', 'racha_max_score']
+
+# Valor de cada componente cuando el jugador no tiene el dato
+VALORES_POR_DEFECTO = {
+    'rating_promedio': 650,
+    'winrate_vs_top': 0,
+    'winrate_vs_medio': 0,
+    'winrate_vs_bajo': 0,
+    'total_partidos': 0,
+    'volatilidad_delta': 8,
+    'momentum': "",
+    'winrate_5sets': np.nan,
+    'winrate_finales': np.nan,
+    'match_point_conversion_pct': np.nan,
+    'partidos_5sets': 0,
+    'finales_jugadas': 0,
+    'total_torneos': 0,
+    'max_victorias': 0,
+}
+
+def _valor(dato, clave):
+    """El dato, o el valor por defecto de la clave si falta (None o NaN)."""
+    if dato is None or (isinstance(dato, float) and np.isnan(dato)):
+        return VALORES_POR_DEFECTO[clave]
+    return dato
+
+def _componentes(resumen, ki, streaks):
+    """Entradas de la calificación de un jugador a partir de sus dicts de resumen, ki y rachas."""
+    categorias = resumen.get("winrate_vs_categoria_rival") or {}
+    datos = {
+        'rating_promedio': resumen.get("rating_jugador_promedio_torneo_inicio"),
+        'winrate_vs_top': categorias.get("winrate_vs_Top"),
+        'winrate_vs_medio': categorias.get("winrate_vs_Medio"),
+        'winrate_vs_bajo': categorias.get("winrate_vs_Bajo"),
+        'total_partidos': resumen.get("total_partidos_jugados"),
+        'volatilidad_delta': resumen.get("volatilidad_delta"),
+        'momentum': resumen.get("momentum_rating_ultimos_10_partidos"),
+        'winrate_5sets': ki.get('winrate_5sets'),
+        'winrate_finales': ki.get('winrate_finales'),
+        'match_point_conversion_pct': ki.get('match_point_conversion_pct'),
+        'partidos_5sets': ki.get('partidos_5sets'),
+        'finales_jugadas': ki.get('finales_jugadas'),
+        'total_torneos': resumen.get("total_torneos_jugados"),
+        'max_victorias': streaks.get("max_victorias"),
+    }
+    return {clave: _valor(dato, clave) for clave, dato in datos.items()}
+
+def puntuar_componentes(c):
     """
-    Calificación global (1-10) considerando: rating, dificultad rivales, winrate, volumen,
-    volatilidad, momentum, killer instinct y experiencia.
+    Calificación global (1-10) y su desglose para una tabla de componentes
+    (una fila por jugador, columnas de VALORES_POR_DEFECTO). Todos los
+    criterios se evalúan por columnas, para todos los jugadores a la vez.
+    Devuelve un DataFrame con 'calificacion' y las COLUMNAS_DETALLE.
     """
-    jugador = df_jugador["jugador"].iloc[0]
-    resumen = resumen_global(df_jugador)[jugador]
-    ki = killer_instinct_stats(df_jugador)[jugador]
-    streaks = streaks_stats(df_jugador)[jugador]
-
+    rating_prom = c['rating_promedio'].to_numpy(dtype=float)
     # 1. Rating promedio (rango: 600-800, normalmente)
-    rating_prom = resumen.get("rating_promedio", 650)
     # Escala: 600=3, 700=7, 750+=10
     rating_score = np.clip((rating_prom - 600) / 15, 3, 10)
-    
+
     # 2. Winrate vs top, medio, bajo (ajustado por rating propio)
-    win_top = resumen.get("winrate_vs_top", 0)
-    win_med = resumen.get("winrate_vs_medio", 0)
-    win_bajo = resumen.get("winrate_vs_bajo", 0)
+    # Los winrate (en %) pasan a escala 0-10 como los de killer instinct.
     # Los winrate vs top valen más si tu rating promedio es bajo
-    if rating_prom >= 720:
-        peso_wintop = 1.5
-        peso_winmed = 1.2
-        peso_winbajo = 1.0
-    elif rating_prom >= 680:
-        peso_wintop = 2.0
-        peso_winmed = 1.3
-        peso_winbajo = 1.0
-    else:
-        peso_wintop = 2.5
-        peso_winmed = 1.5
-        peso_winbajo = 1.0
+    peso_wintop = np.select([rating_prom >= 720, rating_prom >= 680], [1.5, 2.0], default=2.5)
+    peso_winmed = np.select([rating_prom >= 720, rating_prom >= 680], [1.2, 1.3], default=1.5)
+    peso_winbajo = 1.0
     win_score = (
-        (win_top / 10) * peso_wintop +
-        (win_med / 10) * peso_winmed +
-        (win_bajo / 10) * peso_winbajo
-    ) / (peso_wintop + peso_winmed + peso_winbajo) * 10
+        (c['winrate_vs_top'].to_numpy(dtype=float) / 10) * peso_wintop +
+        (c['winrate_vs_medio'].to_numpy(dtype=float) / 10) * peso_winmed +
+        (c['winrate_vs_bajo'].to_numpy(dtype=float) / 10) * peso_winbajo
+    ) / (peso_wintop + peso_winmed + peso_winbajo)
     win_score = np.clip(win_score, 0, 10)
 
     # 3. Volumen de partidos (más = mejor, pero con límites)
-    total_partidos = resumen.get("total_partidos", 0)
     # 1500+ partidos = 10, 100 = 5, menos de 50 = 2
-    if total_partidos >= 1500:
-        exp_score = 10
-    elif total_partidos >= 500:
-        exp_score = 8
-    elif total_partidos >= 200:
-        exp_score = 6
-    elif total_partidos >= 100:
-        exp_score = 5
-    elif total_partidos >= 50:
-        exp_score = 3
-    else:
-        exp_score = 2
+    total_partidos = c['total_partidos'].to_numpy(dtype=float)
+    exp_score = np.select(
+        [total_partidos >= 1500, total_partidos >= 500, total_partidos >= 200, total_partidos >= 100, total_partidos >= 50],
+        [10, 8, 6, 5, 3], default=2)
 
     # 4. Volatilidad (menor es mejor, escala invertida)
-    vol = resumen.get("volatilidad_delta", 8)
     # 4=10, 6=7, 8=5, 10=2, 12=0
-    if vol <= 4:
-        vol_score = 10
-    elif vol <= 6:
-        vol_score = 7
-    elif vol <= 8:
-        vol_score = 5
-    elif vol <= 10:
-        vol_score = 2
-    else:
-        vol_score = 0
+    vol = c['volatilidad_delta'].to_numpy(dtype=float)
+    vol_score = np.select([vol <= 4, vol <= 6, vol <= 8, vol <= 10], [10, 7, 5, 2], default=0)
 
     # 5. Momentum (subida, neutro, baja)
-    momentum = resumen.get("momentum", "").lower()
-    if "subida" in momentum:
-        mom_score = 8
-    elif "baja" in momentum:
-        mom_score = 4
-    else:
-        mom_score = 6
+    momentum = c['momentum'].astype(str).str.lower()
+    mom_score = np.select([momentum.str.contains("subida").to_numpy(), momentum.str.contains("baja").to_numpy()],
+                          [8, 4], default=6)
 
     # 6. Killer Instinct (media winrate 5sets, finales, match point)
-    ki_vals = []
-    for key in ['winrate_5sets', 'winrate_finales', 'match_point_conversion_pct']:
-        val = ki.get(key)
-        if val is not None:
-            ki_vals.append(val / 10)
-    ki_score = np.clip(np.mean(ki_vals) if ki_vals else 5, 0, 10)
+    ki_vals = c[['winrate_5sets', 'winrate_finales', 'match_point_conversion_pct']].to_numpy(dtype=float) / 10
+    n_ki = (~np.isnan(ki_vals)).sum(axis=1)
+    ki_media = np.nansum(ki_vals, axis=1) / np.maximum(n_ki, 1)
+    ki_score = np.clip(np.where(n_ki > 0, ki_media, 5), 0, 10)
     # Penalizar si partidos 5sets y finales jugadas <10 (muestra pequeña)
-    if ki.get('partidos_5sets', 0) < 10 or ki.get('finales_jugadas', 0) < 10:
-        ki_score *= 0.8
+    muestra_pequena = (c['partidos_5sets'].to_numpy(dtype=float) < 10) | (c['finales_jugadas'].to_numpy(dtype=float) < 10)
+    ki_score = np.where(muestra_pequena, ki_score * 0.8, ki_score)
 
     # 7. Experiencia (torneos jugados)
-    total_torneos = resumen.get("total_torneos", 0)
-    if total_torneos >= 350:
-        torneos_score = 10
-    elif total_torneos >= 100:
-        torneos_score = 7
-    elif total_torneos >= 50:
-        torneos_score = 5
-    elif total_torneos >= 20:
-        torneos_score = 3
-    else:
-        torneos_score = 2
+    total_torneos = c['total_torneos'].to_numpy(dtype=float)
+    torneos_score = np.select([total_torneos >= 350, total_torneos >= 100, total_torneos >= 50, total_torneos >= 20],
+                              [10, 7, 5, 3], default=2)
 
     # 8. Racha máxima (victorias)
-    max_victorias = streaks.get("max_victorias", 0)
-    if max_victorias >= 15:
-        racha_score = 10
-    elif max_victorias >= 10:
-        racha_score = 8
-    elif max_victorias >= 5:
-        racha_score = 5
-    else:
-        racha_score = 2
-
-    # Ponderación contextual
-    PESOS = {
-        'rating': 0.20,
-        'winrate': 0.22,
-        'volumen': 0.14,
-        'volatilidad': 0.10,
-        'momentum': 0.08,
-        'killer_instinct': 0.12,
-        'experiencia': 0.08,
-        'racha_max': 0.06
-    }
-    score = (
-        PESOS['rating'] * rating_score +
-        PESOS['winrate'] * win_score +
-        PESOS['volumen'] * exp_score +
-        PESOS['volatilidad'] * vol_score +
-        PESOS['momentum'] * mom_score +
-        PESOS['killer_instinct'] * ki_score +
-        PESOS['experiencia'] * torneos_score +
-        PESOS['racha_max'] * racha_score
-    )
-    calificacion = round(score, 2)
-
-    detalles = {
-        "rating_score": rating_score,
-        "win_score": win_score,
-        "exp_score": exp_score,
-        "volatilidad_score": vol_score,
-        "momentum_score": mom_score,
-        "killer_instinct_score": ki_score,
-        "torneos_score": torneos_score,
-        "racha_max_score": racha_score
-    }
+    max_victorias = c['max_victorias'].to_numpy(dtype=float)
+    racha_score = np.select([max_victorias >= 15, max_victorias >= 10, max_victorias >= 5], [10, 8, 5], default=2)
+
+    detalles = pd.DataFrame({
+        'rating_score': rating_score,
+        'win_score': win_score,
+        'exp_score': exp_score,
+        'volatilidad_score': vol_score,
+        'momentum_score': mom_score,
+        'killer_instinct_score': ki_score,
+        'torneos_score': torneos_score,
+        'racha_max_score': racha_score,
+    }, index=c.index)
+    score = sum(PESOS[peso] * detalles[col] for peso, col in zip(PESOS, COLUMNAS_DETALLE))
+    detalles.insert(0, 'calificacion', score.round(2))
+    return detalles
 
-    return calificacion, detalles
\ No newline at end of file
+def calificacion_jugador(df_jugador, resumen=None, ki=None, streaks=None):
+    """
+    Calificación global (1-10) considerando: rating, dificultad rivales, winrate, volumen,
+    volatilidad, momentum, killer instinct y experiencia.
+    Si ya se tienen calculados resumen, ki o streaks del jugador se pueden pasar
+    para no recalcularlos.
+    """
+    jugador = df_jugador["jugador"].iloc[0]
+    if resumen is None:
+        resumen = resumen_global(df_jugador)[jugador]
+    if ki is None:
+        ki = killer_instinct_stats(df_jugador)[jugador]
+    if streaks is None:
+        streaks = streaks_stats(df_jugador)[jugador]
+
+    fila = puntuar_componentes(pd.DataFrame([_componentes(resumen, ki, streaks)])).iloc[0]
+    calificacion = fila['calificacion']
+    detalles = {col: fila[col] for col in COLUMNAS_DETALLE}
+    return calificacion, detalles
+
+def calificaciones_liga(df):
+    """
+    Calificación y desglose de todos los jugadores del DataFrame a la vez.
+    resumen, killer instinct y rachas se calculan una sola vez para toda la
+    liga (cada uno es una pasada agrupada) y la puntuación se evalúa por
+    columnas. Devuelve un DataFrame indexado por jugador, ordenado de mayor a
+    menor calificación, con 'calificacion', las COLUMNAS_DETALLE y, como
+    referencia, 'total_partidos' y 'rating_promedio'.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=['calificacion'] + COLUMNAS_DETALLE + ['total_partidos', 'rating_promedio'])
+    resumenes = resumen_global(df)
+    kis = killer_instinct_stats(df)
+    rachas = streaks_stats(df)
+    componentes = pd.DataFrame.from_dict(
+        {jugador: _componentes(resumen, kis.get(jugador, {}), rachas.get(jugador, {}))
+         for jugador, resumen in resumenes.items()},
+        orient='index')
+    tabla = puntuar_componentes(componentes)
+    tabla['total_partidos'] = componentes['total_partidos'].astype(int)
+    tabla['rating_promedio'] = componentes['rating_promedio'].astype(float)
+    tabla.index.name = 'jugador'
+    return tabla.sort_values('calificacion', ascending=False, kind='stable')
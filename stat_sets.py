@@ -0,0 +1,150 @@
+import pandas as pd
+import numpy as np
+
+# --- Parseo vectorizado de la columna 'sets' ---
+# Todas las métricas por set (stat_core, stat_ki, ...) deben partir de aquí en
+# vez de recorrer el string fila a fila.
+
+# Tablas de clasificación de bytes para el tokenizador
+_ES_ESPACIO = np.zeros(256, dtype=bool)
+_ES_ESPACIO[[0, 9, 10, 11, 12, 13, 32]] = True
+_ES_DIGITO = np.zeros(256, dtype=bool)
+_ES_DIGITO[ord('0'):ord('9') + 1] = True
+_GUION = ord('-')
+_MAX_DIGITOS = 4
+_POTENCIAS = 10 ** np.arange(_MAX_DIGITOS + 1)
+_SEPARADOR = '\x00'
+
+def matriz_puntos_sets(sets, max_sets=None):
+    """
+    Convierte la columna 'sets' (ej. "4-11 13-11 8-11 11-9 11-8") en:
+      - puntos: array int16 de forma (partidos, max_sets, 2). [..., 0] son los
+        puntos del jugador y [..., 1] los del rival.
+      - mascara: array bool (partidos, max_sets), True donde hay un set válido.
+    Los sets con formato incorrecto se ignoran (como en el parseo fila a fila),
+    así que los sets válidos quedan siempre al principio de cada fila.
+    El orden de las filas es posicional: fila i = i-ésimo elemento de 'sets'.
+
+    Todo el parseo se hace sobre un único buffer de bytes con NumPy, sin
+    recorrer los strings en Python.
+    """
+    valores = pd.Series(np.asarray(sets, dtype=object))
+    n = len(valores)
+    textos = valores.where(valores.notna(), '').astype(str).tolist()
+    texto = _SEPARADOR.join(textos)
+    if texto.count(_SEPARADOR) != max(n - 1, 0):
+        texto = _SEPARADOR.join(t.replace(_SEPARADOR, ' ') for t in textos)
+    buf = np.frombuffer(texto.replace('\xa0', ' ').encode('ascii', 'replace'), dtype=np.uint8)
+
+    # Tokens = secuencias de bytes que no son espacio
+    es_espacio = _ES_ESPACIO[buf]
+    inicio_token = ~es_espacio & np.concatenate(([True], es_espacio[:-1]))
+    pos_inicio = np.flatnonzero(inicio_token)
+    n_tokens = len(pos_inicio)
+    fila_token = np.searchsorted(np.flatnonzero(buf == 0), pos_inicio)
+
+    # A partir de aquí se trabaja solo con los bytes de los tokens
+    pos = np.flatnonzero(~es_espacio)
+    inicio = inicio_token[pos]
+    primer_byte = np.flatnonzero(inicio)
+    token = np.cumsum(inicio, dtype=np.int32) - 1
+    b = buf[pos]
+    es_guion = b == _GUION
+    es_digito = _ES_DIGITO[b]
+    if len(b):
+        guiones = np.add.reduceat(es_guion.astype(np.int32), primer_byte)
+        otros = np.add.reduceat((~(es_guion | es_digito)).astype(np.int32), primer_byte)
+    else:
+        guiones = otros = np.zeros(0, dtype=np.int32)
+
+    # Parte 0 = antes del guion (jugador), parte 1 = después (rival)
+    guiones_previos = np.cumsum(es_guion, dtype=np.int32) - es_guion
+    parte = np.minimum(guiones_previos - guiones_previos[primer_byte][token], 1)
+    clave = (token * 2 + parte)[es_digito]
+    digitos = b[es_digito] - ord('0')
+    if len(clave):
+        cambio = np.concatenate((clave[1:] != clave[:-1], [True]))
+        ultimo = np.flatnonzero(cambio)
+        grupo = np.concatenate(([0], np.cumsum(cambio[:-1], dtype=np.int32)))
+        exponente = np.minimum(ultimo[grupo] - np.arange(len(clave)), _MAX_DIGITOS)
+        valor = np.bincount(clave, weights=digitos * _POTENCIAS[exponente], minlength=2 * n_tokens)
+    else:
+        valor = np.zeros(2 * n_tokens)
+    longitud = np.bincount(clave, minlength=2 * n_tokens)
+
+    largo_jug, largo_riv = longitud[0::2], longitud[1::2]
+    validos = ((guiones == 1) & (otros == 0) & (largo_jug >= 1) & (largo_riv >= 1)
+               & (largo_jug <= _MAX_DIGITOS) & (largo_riv <= _MAX_DIGITOS))
+    idx_validos = np.flatnonzero(validos)
+    filas = fila_token[idx_validos]
+    posicion = np.arange(len(filas)) - np.searchsorted(filas, filas)
+
+    ancho = int(posicion.max()) + 1 if len(posicion) else 0
+    if max_sets is not None:
+        dentro = posicion < max_sets
+        filas, posicion, idx_validos = filas[dentro], posicion[dentro], idx_validos[dentro]
+        ancho = max_sets
+
+    puntos = np.zeros((n, ancho, 2), dtype=np.int16)
+    mascara = np.zeros((n, ancho), dtype=bool)
+    puntos[filas, posicion, 0] = valor[0::2][idx_validos]
+    puntos[filas, posicion, 1] = valor[1::2][idx_validos]
+    mascara[filas, posicion] = True
+    return puntos, mascara
+
+def sets_ganados_perdidos(puntos, mascara):
+    """Matrices bool (partidos, max_sets) de sets ganados y perdidos por el jugador."""
+    ganados = (puntos[..., 0] > puntos[..., 1]) & mascara
+    perdidos = (puntos[..., 0] < puntos[..., 1]) & mascara
+    return ganados, perdidos
+
+def ultimo_set(puntos, mascara):
+    """
+    Puntos (jugador, rival) del último set válido de cada partido, forma (partidos, 2),
+    y un array bool que indica si el partido tiene al menos un set válido.
+    """
+    n_sets = mascara.sum(axis=1)
+    tiene = n_sets > 0
+    idx = np.maximum(n_sets - 1, 0)
+    if puntos.shape[1] == 0:
+        return np.zeros((len(puntos), 2), dtype=puntos.dtype), tiene
+    return puntos[np.arange(len(puntos)), idx], tiene
+
+# --- Matriz de puntos guardada como columnas ---
+# La instantánea del historial (db_manager.cargar_historial_derivado) guarda la
+# matriz ya parseada como columnas int16 'set1_jugador', 'set1_rival', ... y el
+# número de sets válidos. puntos_sets_df() la reconstruye sin volver a parsear.
+COLUMNA_N_SETS = 'n_sets_validos'
+
+def _columnas_set(i):
+    return f'set{i}_jugador', f'set{i}_rival'
+
+def columnas_puntos_sets(sets):
+    """Dict columna -> array con la matriz de puntos de 'sets' (ver matriz_puntos_sets)."""
+    puntos, mascara = matriz_puntos_sets(sets)
+    columnas = {COLUMNA_N_SETS: mascara.sum(axis=1).astype(np.int8)}
+    for i in range(puntos.shape[1]):
+        col_jugador, col_rival = _columnas_set(i + 1)
+        columnas[col_jugador] = puntos[:, i, 0]
+        columnas[col_rival] = puntos[:, i, 1]
+    return columnas
+
+def puntos_sets_df(df):
+    """
+    Igual que matriz_puntos_sets(df['sets']), pero si el DataFrame trae las
+    columnas de columnas_puntos_sets las usa directamente.
+    """
+    if COLUMNA_N_SETS not in df.columns:
+        return matriz_puntos_sets(df['sets'])
+    ancho = 0
+    while _columnas_set(ancho + 1)[0] in df.columns:
+        ancho += 1
+    puntos = np.zeros((len(df), ancho, 2), dtype=np.int16)
+    for i in range(ancho):
+        col_jugador, col_rival = _columnas_set(i + 1)
+        # Tras concatenar historiales de distinto ancho faltan sets: cuentan como 0
+        puntos[:, i, 0] = df[col_jugador].to_numpy(dtype=np.int16, na_value=0)
+        puntos[:, i, 1] = df[col_rival].to_numpy(dtype=np.int16, na_value=0)
+    n_sets = df[COLUMNA_N_SETS].to_numpy(dtype=np.int16, na_value=0)
+    mascara = np.arange(ancho) < n_sets[:, None]
+    return puntos, mascara
@@ -1,63 +1,94 @@
 import pandas as pd
+import numpy as np
+from stat_core import claves_cronologicas
 
-def streaks_stats(df, umbral_larga=5):
+UMBRAL_LARGA = 5
+MAX_RACHA_ACTUAL = 20  # la racha actual se mira en los últimos 20 partidos
+
+def rachas_partidos(df):
+    """
+    Codificación run-length de los resultados de todos los jugadores a la vez.
+    Ordena por jugador y momento del partido (claves_cronologicas, orden
+    estable), descarta los partidos sin resultado y agrupa los resultados
+    consecutivos iguales de cada jugador.
+
+    Devuelve (jugadores, rachas): 'jugadores' son los nombres en orden de
+    aparición y 'rachas' un DataFrame con una fila por racha, en orden
+    cronológico dentro de cada jugador, con las columnas:
+      jugador (código en 'jugadores'), victoria (bool), longitud (int).
+    """
+    codigo, jugadores = pd.factorize(df['jugador'])
+    gano = pd.to_numeric(df['gano'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    orden = np.lexsort((np.arange(len(df)), *claves_cronologicas(df), codigo))
+    orden = orden[(codigo[orden] >= 0) & ~np.isnan(gano[orden])]
+    jug = codigo[orden]
+    victoria = gano[orden] != 0
+
+    # Una racha empieza donde cambia el jugador o el resultado
+    inicio = np.ones(len(jug), dtype=bool)
+    inicio[1:] = (jug[1:] != jug[:-1]) | (victoria[1:] != victoria[:-1])
+    pos_inicio = np.flatnonzero(inicio)
+    longitud = np.diff(np.append(pos_inicio, len(jug)))
+
+    rachas = pd.DataFrame({
+        'jugador': jug[pos_inicio],
+        'victoria': victoria[pos_inicio],
+        'longitud': longitud,
+    })
+    return jugadores, rachas
+
+def _histograma(longitudes):
+    valores, cuentas = np.unique(longitudes, return_counts=True)
+    return {int(v): int(c) for v, c in zip(valores, cuentas)}
+
+def streaks_stats(df, umbral_larga=UMBRAL_LARGA, histograma=False):
     """
     Si umbral_larga es un dict, lo usa por jugador. Si es int, lo usa global.
+    También acepta una lista de umbrales (o un dict con listas): entonces
+    'largas_victorias' y 'largas_derrotas' son dicts {umbral: rachas}.
+    Con histograma=True añade, por jugador, el número de rachas de cada longitud.
     """
+    jugadores, rachas = rachas_partidos(df)
+    n_jug = len(jugadores)
     streaks = {}
-    for jugador in df['jugador'].unique():
-        jug_df = df[df['jugador'] == jugador].sort_values(['fecha', 'hora'])
+
+    max_racha = np.zeros((n_jug, 2), dtype=int)
+    np.maximum.at(max_racha, (rachas['jugador'].to_numpy(), rachas['victoria'].to_numpy(dtype=int)), rachas['longitud'].to_numpy())
+
+    # Racha actual = última racha de cada jugador (con signo), hasta 20 partidos
+    ultimas = rachas.drop_duplicates('jugador', keep='last')
+    racha_actual = np.zeros(n_jug, dtype=int)
+    signo = np.where(ultimas['victoria'].to_numpy(), 1, -1)
+    racha_actual[ultimas['jugador'].to_numpy()] = signo * np.minimum(ultimas['longitud'].to_numpy(), MAX_RACHA_ACTUAL)
+
+    grupos = {clave: g['longitud'].to_numpy() for clave, g in rachas.groupby(['jugador', 'victoria'])}
+    vacio = np.zeros(0, dtype=int)
+
+    for i, jugador in enumerate(jugadores):
         # Selecciona umbral
-        umbral = umbral_larga[jugador] if isinstance(umbral_larga, dict) else umbral_larga
-
-        max_win, max_lose = 0, 0
-        cur_win, cur_lose = 0, 0
-        largas_win, largas_lose = 0, 0
-        en_racha_win, en_racha_lose = False, False
-
-        for gano in jug_df['gano']:
-            if gano:
-                cur_win += 1
-                max_win = max(max_win, cur_win)
-                cur_lose = 0
-                if cur_win >= umbral and not en_racha_win:
-                    largas_win += 1
-                    en_racha_win = True
-                if cur_win < umbral:
-                    en_racha_win = False
-                en_racha_lose = False
-            elif gano is not None:
-                cur_lose += 1
-                max_lose = max(max_lose, cur_lose)
-                cur_win = 0
-                if cur_lose >= umbral and not en_racha_lose:
-                    largas_lose += 1
-                    en_racha_lose = True
-                if cur_lose < umbral:
-                    en_racha_lose = False
-                en_racha_win = False
-
-        # Racha actual (últimos 20 partidos)
-        ultimos = jug_df.tail(20)
-        racha = 0
-        for res in reversed(list(ultimos['gano'])):
-            if res is True:
-                if racha >= 0:
-                    racha += 1
-                else:
-                    break
-            elif res is False:
-                if racha <= 0:
-                    racha -= 1
-                else:
-                    break
+        umbral = umbral_larga.get(jugador, UMBRAL_LARGA) if isinstance(umbral_larga, dict) else umbral_larga
+        largas_win = grupos.get((i, True), vacio)
+        largas_lose = grupos.get((i, False), vacio)
+        if np.ndim(umbral):
+            largas = {
+                'largas_victorias': {u: int((largas_win >= u).sum()) for u in umbral},
+                'largas_derrotas': {u: int((largas_lose >= u).sum()) for u in umbral},
+            }
+        else:
+            largas = {
+                'largas_victorias': int((largas_win >= umbral).sum()),
+                'largas_derrotas': int((largas_lose >= umbral).sum()),
+            }
 
         streaks[jugador] = {
-            'max_victorias': max_win,
-            'max_derrotas': max_lose,
-            'racha_actual': racha,
-            'largas_victorias': largas_win,
-            'largas_derrotas': largas_lose,
+            'max_victorias': int(max_racha[i, 1]),
+            'max_derrotas': int(max_racha[i, 0]),
+            'racha_actual': int(racha_actual[i]),
+            **largas,
             'umbral_larga': umbral
         }
+        if histograma:
+            streaks[jugador]['histograma_victorias'] = _histograma(largas_win)
+            streaks[jugador]['histograma_derrotas'] = _histograma(largas_lose)
     return streaks
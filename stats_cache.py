@@ -0,0 +1,104 @@
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# --- Caché de estadísticas por jugador ---
+# Clave: (jugador, ventana de tiempo, módulo, versión de los datos del jugador).
+# La versión de un jugador solo cambia cuando una importación le añade partidos,
+# así que los demás jugadores conservan sus entradas. Expulsión LRU con un
+# presupuesto de memoria aproximado.
+PRESUPUESTO_BYTES = 64 * 1024 * 1024
+
+def estimar_bytes(valor):
+    """Tamaño aproximado en memoria de un resultado (dicts, listas, DataFrames...)."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(estimar_bytes(k) + estimar_bytes(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple, set)):
+        return sys.getsizeof(valor) + sum(estimar_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+def clave_ventana(opcion_tiempo):
+    """
+    Las ventanas relativas ("Últimos 3 meses"...) dependen del día en que se
+    calculan; "Todos" y los rangos (desde, hasta) no.
+    """
+    if opcion_tiempo == "Todos" or isinstance(opcion_tiempo, tuple):
+        return opcion_tiempo
+    return (opcion_tiempo, pd.Timestamp.today().normalize())
+
+class StatsCache:
+    def __init__(self, presupuesto_bytes=PRESUPUESTO_BYTES):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        # Versión global de los datos: sube con cada importación
+        self.version = 0
+        self._entradas = OrderedDict()   # clave -> (valor, bytes)
+        self._modificado = {}            # jugador -> versión en que se modificó por última vez
+        self._version_minima = 0         # tras invalidar_todo, todo lo anterior es obsoleto
+        self._lock = threading.Lock()
+
+    def version_jugador(self, jugador):
+        return max(self._modificado.get(jugador, 0), self._version_minima)
+
+    def obtener(self, jugador, opcion_tiempo, modulo, calcular, version_datos=None):
+        """
+        Devuelve el resultado cacheado o lo calcula con calcular() y lo guarda.
+        version_datos es la versión (self.version) en la que el llamador cargó su
+        DataFrame: si el jugador se modificó después, el resultado se calcula pero
+        no se guarda, para no mezclar datos viejos con la versión nueva.
+        """
+        version = self.version_jugador(jugador)
+        clave = (jugador, clave_ventana(opcion_tiempo), modulo, version)
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave][0]
+            self.fallos += 1
+
+        valor = calcular()
+        if version_datos is not None and version_datos < version:
+            return valor
+        tamano = estimar_bytes(valor)
+        with self._lock:
+            if version != self.version_jugador(jugador) or tamano > self.presupuesto_bytes:
+                return valor
+            if clave in self._entradas:
+                self.bytes_usados -= self._entradas[clave][1]
+            self._entradas[clave] = (valor, tamano)
+            self.bytes_usados += tamano
+            while self.bytes_usados > self.presupuesto_bytes and self._entradas:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self.bytes_usados -= liberado
+        return valor
+
+    def invalidar_jugadores(self, jugadores):
+        """Marca como modificados los jugadores de una importación y descarta sus entradas."""
+        jugadores = set(jugadores)
+        with self._lock:
+            self.version += 1
+            for jugador in jugadores:
+                self._modificado[jugador] = self.version
+            for clave in [c for c in self._entradas if c[0] in jugadores]:
+                self.bytes_usados -= self._entradas.pop(clave)[1]
+
+    def invalidar_todo(self):
+        with self._lock:
+            self.version += 1
+            self._version_minima = self.version
+            self._modificado.clear()
+            self._entradas.clear()
+            self.bytes_usados = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+# Instancia compartida por todas las vistas
+cache_estadisticas = StatsCache()
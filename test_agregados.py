@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from conftest import comparable
+from agregados import AgregadosHistorial, tablas_agregados, combinar_tablas, evolucion_partidos
+from filtro_tiempo import filtrar_por_tiempo
+from stat_core import resumen_global
+
+VENTANAS = ["Todos", ("2024-02-01", "2024-04-01"), (None, "2024-03-13"), ("2024-03-12", None)]
+# Corta el torneo de Ana del 9 Jan 2024 entre dos importaciones: la primera trae
+# el partido de las 9:40 y la segunda los de las 10:05 y las 11:30
+CORTE = pd.Timestamp("2024-01-09 10:00")
+
+def _partidos_jugador(partidos, jugador, ventana):
+    df_jugador = partidos[partidos['jugador'] == jugador].sort_values('fecha_dt', kind='stable')
+    return filtrar_por_tiempo(df_jugador, ventana)
+
+@pytest.mark.parametrize("ventana", VENTANAS)
+def test_resumen_igual_que_resumen_global(partidos, ventana):
+    agregados = AgregadosHistorial(tablas_agregados(partidos))
+    for jugador in ("Ana", "Beto"):
+        df_jugador = _partidos_jugador(partidos, jugador, ventana)
+        esperado = resumen_global(df_jugador).get(jugador, {})
+        assert comparable(agregados.resumen(jugador, ventana, df_jugador)) == comparable(esperado)
+
+@pytest.mark.parametrize("nuevos_despues", [True, False])
+def test_combinar_tablas_igual_que_todo_junto(partidos, nuevos_despues):
+    antes = partidos[partidos['fecha_dt'] < CORTE]
+    despues = partidos[partidos['fecha_dt'] >= CORTE]
+    primera, segunda = (antes, despues) if nuevos_despues else (despues, antes)
+    combinados = AgregadosHistorial(combinar_tablas(tablas_agregados(primera), tablas_agregados(segunda)))
+    completos = AgregadosHistorial(tablas_agregados(partidos))
+    assert combinados.partidos() == completos.partidos() == len(partidos)
+    for jugador in ("Ana", "Beto"):
+        for ventana in VENTANAS:
+            df_jugador = _partidos_jugador(partidos, jugador, ventana)
+            assert (comparable(combinados.resumen(jugador, ventana, df_jugador))
+                    == comparable(completos.resumen(jugador, ventana, df_jugador)))
+        df_jugador = _partidos_jugador(partidos, jugador, "Todos")
+        for granularidad in ("semana", "mes"):
+            pd.testing.assert_frame_equal(combinados.evolucion(jugador, "Todos", df_jugador, granularidad),
+                                          evolucion_partidos(df_jugador, granularidad))
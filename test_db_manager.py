@@ -0,0 +1,32 @@
+import pandas as pd
+
+from conftest import historial_de_prueba, comparable
+from agregados import tablas_agregados, AgregadosHistorial
+from db_manager import anexar_partidos, cargar_historial, cargar_agregados, _leer_agregados, COLUMNAS_CLAVE
+
+def _claves(df):
+    return sorted(map(tuple, df[COLUMNAS_CLAVE].astype(str).to_numpy().tolist()))
+
+def test_anexar_partidos_sin_duplicados(tmp_path):
+    archivo = str(tmp_path / "historial.xlsx")
+    historial = historial_de_prueba()
+    primera, segunda = historial.iloc[:12], historial.iloc[8:]
+
+    assert len(anexar_partidos(archivo, primera)) == 12
+    # Repite 4 partidos ya guardados y uno dentro del mismo lote
+    lote = pd.concat([segunda, segunda.iloc[[-1]]], ignore_index=True)
+    agregados = anexar_partidos(archivo, lote)
+    assert _claves(agregados) == _claves(historial.iloc[12:])
+    assert len(anexar_partidos(archivo, historial)) == 0
+
+    guardado = cargar_historial(archivo)
+    assert _claves(guardado) == _claves(historial)
+    # Las tablas de agregados guardadas se actualizaron solo con las filas nuevas
+    assert _leer_agregados(archivo, len(historial)) is not None
+    completos = AgregadosHistorial(tablas_agregados(guardado))
+    cargados = cargar_agregados(archivo)
+    assert cargados.partidos() == len(historial)
+    for jugador in ("Ana", "Beto"):
+        df_jugador = guardado[guardado['jugador'] == jugador].sort_values('fecha_dt', kind='stable')
+        assert (comparable(cargados.resumen(jugador, "Todos", df_jugador))
+                == comparable(completos.resumen(jugador, "Todos", df_jugador)))
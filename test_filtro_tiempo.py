@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from filtro_tiempo import filtrar_por_tiempo
+from historial_store import HistorialStore, _indexar
+
+VENTANAS = [
+    "Todos",
+    (None, "2024-03-01"),
+    ("2024-02-01", None),
+    ("2024-01-15", "2024-03-10"),
+    (None, "2023-01-01"),
+    ("2025-01-01", None),
+]
+
+@pytest.fixture
+def historial():
+    # Filas sin ordenar y con partidos sin fecha en medio de cada jugador
+    fechas = ["2024-03-05", None, "2024-01-10", "2024-02-20", None, "2024-01-20", "2024-03-01", None]
+    df = pd.DataFrame({
+        'jugador': ["Ana", "Ana", "Ana", "Beto", "Beto", "Ana", "Beto", "Beto"],
+        'fecha_dt': pd.to_datetime(fechas),
+        'partido': range(len(fechas)),
+    })
+    store = HistorialStore(cargar=False)
+    store._on_cargado(_indexar(df), None, None, 0)
+    return df, store
+
+@pytest.mark.parametrize("ventana", VENTANAS)
+def test_partidos_jugador_igual_que_filtrar_por_tiempo(historial, ventana):
+    df, store = historial
+    for jugador in ("Ana", "Beto"):
+        esperado = filtrar_por_tiempo(df[df['jugador'] == jugador], ventana)
+        obtenido = store.partidos_jugador(jugador, ventana)
+        assert sorted(obtenido['partido']) == sorted(esperado['partido'])
+
+def test_ventana_solo_hasta_sin_partidos_sin_fecha(historial):
+    _, store = historial
+    partidos = store.partidos_jugador("Ana", (None, "2024-03-01"))
+    assert partidos['fecha_dt'].notna().all()
+    assert list(partidos['partido']) == [2, 5]
@@ -0,0 +1,36 @@
+import pytest
+
+from conftest import comparable
+from stat_core import resumen_global
+
+def _referencia(df_jugador):
+    """Valores del resumen calculados a mano sobre los partidos de un jugador ordenados por fecha_dt."""
+    df_jugador = df_jugador.sort_values('fecha_dt', kind='stable')
+    # Último partido de cada torneo: el de mayor fecha_dt
+    torneos = df_jugador.groupby(['torneo', 'fecha'], observed=True).tail(1)
+    posiciones = torneos['posicion'].astype(int)
+    return {
+        'total_partidos_jugados': len(df_jugador),
+        'total_victorias': int(df_jugador['gano'].sum()),
+        'momentum_delta_acumulado_ultimos_10': round(float(df_jugador['delta'].astype(float).round(4).tail(10).sum()), 2),
+        'total_torneos_jugados': len(torneos),
+        'posicion_promedio_torneos': round(float(posiciones.mean()), 2),
+        'torneos_ganados': int((posiciones == 1).sum()),
+        'cambio_rating_neto_total_torneo': round(float(torneos['delta_total'].astype(float).round(4).sum()), 2),
+    }
+
+def test_resumen_global_igual_que_por_jugador(partidos):
+    resumenes = resumen_global(partidos)
+    assert set(resumenes) == {"Ana", "Beto"}
+    for jugador, resumen in resumenes.items():
+        df_jugador = partidos[partidos['jugador'] == jugador]
+        esperado = _referencia(df_jugador)
+        assert {clave: resumen[clave] for clave in esperado} == pytest.approx(esperado)
+        # El cálculo de toda la liga da lo mismo que el de un solo jugador
+        assert comparable(resumen) == comparable(resumen_global(df_jugador)[jugador])
+
+def test_resumen_global_ultimo_partido_de_cada_torneo(partidos):
+    # En "9 Jan 2024" el último partido de Ana es el de las 11:30 ("11:30" < "9:40" como texto)
+    resumen = resumen_global(partidos)["Ana"]
+    assert resumen['cambio_rating_neto_total_torneo'] == pytest.approx(6.0 - 2.5 - 0.5 - 2.5 + 6.5)
+    assert resumen['posicion_promedio_torneos'] == pytest.approx(2.2)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from stat_streaks import rachas_partidos, streaks_stats
+
+def _rachas_jugador(df_jugador):
+    """Referencia: longitudes (con signo) de las rachas recorriendo los partidos uno a uno por fecha_dt."""
+    rachas = []
+    for gano in df_jugador.sort_values('fecha_dt', kind='stable')['gano']:
+        signo = 1 if gano else -1
+        if rachas and np.sign(rachas[-1]) == signo:
+            rachas[-1] += signo
+        else:
+            rachas.append(signo)
+    return rachas
+
+def test_rachas_en_orden_cronologico(partidos):
+    # Ana, torneo a torneo: G G G | G P | P G P | P P G | G G G (por texto saldría otro orden)
+    jugadores, rachas = rachas_partidos(partidos)
+    ana = rachas[rachas['jugador'] == list(jugadores).index("Ana")]
+    longitudes = np.where(ana['victoria'], 1, -1) * ana['longitud']
+    assert list(longitudes) == [4, -2, 1, -3, 4]
+
+@pytest.mark.parametrize("umbral", [2, 3])
+def test_streaks_stats_igual_que_por_jugador(partidos, umbral):
+    stats = streaks_stats(partidos, umbral_larga=umbral)
+    for jugador in ("Ana", "Beto"):
+        rachas = _rachas_jugador(partidos[partidos['jugador'] == jugador])
+        esperado = {
+            'max_victorias': max([r for r in rachas if r > 0], default=0),
+            'max_derrotas': max([-r for r in rachas if r < 0], default=0),
+            'racha_actual': rachas[-1],
+            'largas_victorias': sum(r >= umbral for r in rachas),
+            'largas_derrotas': sum(-r >= umbral for r in rachas),
+        }
+        assert {clave: stats[jugador][clave] for clave in esperado} == esperado
@@ -1,24 +1,28 @@
 import pandas as pd
 import datetime
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QListWidget, QMessageBox, QGroupBox, QPushButton, QScrollArea, QComboBox, QApplication
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QListView, QMessageBox, QGroupBox, QPushButton, QScrollArea, QComboBox, QApplication
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QThreadPool
 from PyQt5.QtGui import QClipboard
-from db_manager import cargar_historial
-from stat_core import resumen_global
-from stat_ki import killer_instinct_stats
-from stat_streaks import streaks_stats
-from stat_evolution import evolution_stats
-from stat_opponents import opponents_stats
-from stat_rating import calificacion_jugador
+from historial_store import HistorialStore
+from filtro_tiempo import OPCIONES_TIEMPO
+from ficha_worker import FichaTarea, FichaSenales
+from stat_evolution import GRANULARIDADES, etiqueta_periodo
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+from graficos import GraficoEvolucion, GraficoMomentum
+from modelos_tabla import ModeloEstadisticas, ModeloFilas, ModeloNombres, VistaEstadisticas, texto_tsv
+
+# Retardo (ms) del cálculo de la ficha: al navegar por la lista y mientras se escribe en el buscador
+RETARDO_FICHA = 150
+RETARDO_ESCRITURA = 400
 
 class VisualizacionJugadoresWidget(QWidget):
-    def __init__(self):
+    def __init__(self, store=None):
         super().__init__()
+        # Historial compartido (MainWindow lo pasa a todas las páginas)
+        self.store = store if store is not None else HistorialStore()
+        self.store.actualizado.connect(self._on_historial_actualizado)
         self.setLayout(QVBoxLayout())
         self.layout().setAlignment(Qt.AlignTop)
 
@@ -28,24 +32,24 @@ class VisualizacionJugadoresWidget(QWidget):
 
         # Filtro de tiempo
         self.filtro_tiempo = QComboBox()
-        self.filtro_tiempo.addItems([
-            "Todos",
-            "Últimos 6 meses",
-            "Últimos 3 meses",
-            "Mes actual"
-        ])
+        self.filtro_tiempo.addItems(OPCIONES_TIEMPO)
         self.filtro_tiempo.currentIndexChanged.connect(self.refrescar_filtrado_modulos)
         self.layout().addWidget(self.filtro_tiempo)
 
         # Buscador
         self.buscador = QLineEdit()
         self.buscador.setPlaceholderText("Buscar jugador...")
-        self.buscador.textChanged.connect(self.filtrar_jugadores)
+        # Filtrar es inmediato (índice de n-gramas); la ficha espera a que se deje de escribir
+        self.buscador.textChanged.connect(lambda: self.filtrar_jugadores(retardo=RETARDO_ESCRITURA))
         self.layout().addWidget(self.buscador)
 
-        # Listado de jugadores
-        self.lista_jugadores = QListWidget()
-        self.lista_jugadores.currentRowChanged.connect(self.seleccionar_jugador_por_indice)
+        # Listado de jugadores: el modelo solo guarda los ids filtrados y la vista pinta las filas visibles
+        self.modelo_jugadores = ModeloNombres()
+        self.lista_jugadores = QListView()
+        self.lista_jugadores.setUniformItemSizes(True)
+        self.lista_jugadores.setModel(self.modelo_jugadores)
+        self.lista_jugadores.selectionModel().currentRowChanged.connect(
+            lambda actual, anterior: self.seleccionar_jugador_por_indice(actual.row()))
         self.layout().addWidget(self.lista_jugadores)
 
         # Navegación tipo ficha
@@ -93,39 +97,47 @@ class VisualizacionJugadoresWidget(QWidget):
         self.stats_label = QLabel("Selecciona un jugador para ver su ficha.")
         self.stats_label.setAlignment(Qt.AlignTop)
         self.stats_label.setWordWrap(True)
-        self.stats_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
         self.ficha_resumen.layout().addWidget(self.stats_label)
+        # Las secciones de estadísticas son tablas: cada ficha nueva solo repinta las celdas que cambian
+        self.modelo_resumen = ModeloEstadisticas(titulo_estadistica="Estadística", max_chars_valor=60)
+        self.ficha_resumen.layout().addWidget(VistaEstadisticas(self.modelo_resumen))
         self.fichas_layout.addWidget(self.ficha_resumen)
 
         # Ficha Killer Instinct
         self.ficha_ki = QGroupBox("Killer Instinct")
         self.ficha_ki.setLayout(QVBoxLayout())
-        self.ki_label = QLabel()
-        self.ki_label.setAlignment(Qt.AlignTop)
-        self.ki_label.setWordWrap(True)
-        self.ki_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        self.ficha_ki.layout().addWidget(self.ki_label)
+        self.modelo_ki = ModeloEstadisticas()
+        self.ficha_ki.layout().addWidget(VistaEstadisticas(self.modelo_ki))
         self.fichas_layout.addWidget(self.ficha_ki)
 
         # Ficha Rachas
         self.ficha_streaks = QGroupBox("Rachas")
         self.ficha_streaks.setLayout(QVBoxLayout())
-        self.streaks_label = QLabel()
-        self.streaks_label.setAlignment(Qt.AlignTop)
-        self.streaks_label.setWordWrap(True)
-        self.streaks_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        self.ficha_streaks.layout().addWidget(self.streaks_label)
+        self.modelo_rachas = ModeloEstadisticas()
+        self.ficha_streaks.layout().addWidget(VistaEstadisticas(self.modelo_rachas))
         self.fichas_layout.addWidget(self.ficha_streaks)
 
         # Ficha Evolución (con gráfico)
-        self.ficha_evo = QGroupBox("Evolución de Rating (mensual)")
+        self.ficha_evo = QGroupBox("Evolución de Rating")
         self.ficha_evo.setLayout(QVBoxLayout())
+        # Granularidad del gráfico: la ficha trae la serie de todas, cambiar no recalcula nada
+        self.granularidad_evo = QComboBox()
+        for granularidad, (etiqueta, _) in GRANULARIDADES.items():
+            self.granularidad_evo.addItem(etiqueta, granularidad)
+        self.granularidad_evo.setCurrentIndex(list(GRANULARIDADES).index('mes'))
+        self.granularidad_evo.currentIndexChanged.connect(self._dibujar_evolucion)
+        self.ficha_evo.layout().addWidget(self.granularidad_evo, alignment=Qt.AlignRight)
+        self.evoluciones = None
+        self.resultados_momentum = []
         self.evo_label = QLabel()
         self.evo_label.setAlignment(Qt.AlignTop)
         self.evo_label.setWordWrap(True)
         self.evo_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
         self.ficha_evo.layout().addWidget(self.evo_label)
-        self.evo_canvas = None  # Canvas de matplotlib
+        # Gráfico persistente: cada ficha solo cambia sus datos
+        self.evo_canvas = GraficoEvolucion(5, 2.5, titulo='Evolución del Rating (media y rango)', ylabel='Rating')
+        self.evo_canvas.hide()
+        self.ficha_evo.layout().addWidget(self.evo_canvas)
         self.fichas_layout.addWidget(self.ficha_evo)
 
         # Ficha Momentum (rachas recientes, con gráfico)
@@ -136,23 +148,31 @@ class VisualizacionJugadoresWidget(QWidget):
         self.momentum_label.setWordWrap(True)
         self.momentum_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
         self.ficha_momentum.layout().addWidget(self.momentum_label)
-        self.momentum_canvas = None
+        self.momentum_canvas = GraficoMomentum(5, 1.5, titulo='Momentum: últimos 20 partidos (verde=win, rojo=lose)')
+        self.momentum_canvas.hide()
+        self.ficha_momentum.layout().addWidget(self.momentum_canvas)
         self.fichas_layout.addWidget(self.ficha_momentum)
 
         # Ficha Rivales
         self.ficha_opponents = QGroupBox("Principales Rivales")
         self.ficha_opponents.setLayout(QVBoxLayout())
-        self.opponents_label = QLabel()
-        self.opponents_label.setAlignment(Qt.AlignTop)
-        self.opponents_label.setWordWrap(True)
-        self.opponents_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
-        self.ficha_opponents.layout().addWidget(self.opponents_label)
+        self.modelo_rivales = ModeloFilas(["Rival", "Enfrentamientos", "Winrate"])
+        self.ficha_opponents.layout().addWidget(VistaEstadisticas(self.modelo_rivales))
         self.fichas_layout.addWidget(self.ficha_opponents)
 
+        # Cálculo de la ficha en segundo plano (con retardo y descarte de peticiones obsoletas)
+        self.pool_ficha = QThreadPool(self)
+        self.senales_ficha = FichaSenales()
+        self.senales_ficha.seccion_lista.connect(self._on_seccion_lista)
+        self.senales_ficha.terminado.connect(self._on_ficha_terminada)
+        self.generacion_ficha = 0
+        self.jugador_pendiente = None
+        self.timer_ficha = QTimer(self)
+        self.timer_ficha.setSingleShot(True)
+        self.timer_ficha.setInterval(RETARDO_FICHA)
+        self.timer_ficha.timeout.connect(self._lanzar_calculo_ficha)
+
         # Data
-        self.df = None
-        self.jugadores = []
-        self.jugadores_filtrados = []
         self.indice_actual = -1
 
         # SCROLL MEMORY
@@ -160,181 +180,181 @@ class VisualizacionJugadoresWidget(QWidget):
 
         self.cargar_jugadores()
 
-    def cargar_jugadores(self):
+    def cargar_jugadores(self, mantener=None, recalcular=True):
         try:
-            self.df = cargar_historial("data/historial_general.xlsx")
-            if self.df.empty:
-                self.lista_jugadores.clear()
-                self.stats_label.setText("No hay datos en la base de datos.")
+            if not self.store.cargado:
+                self.stats_label.setText("Cargando historial…")
+                return
+            if self.store.vacio():
+                self.modelo_jugadores.filtrar("", self.store.indice_nombres)
+                self.indice_actual = -1
                 self.ficha_nombre.setText("")
+                self._limpiar_ficha("No hay datos en la base de datos.")
                 return
-            self.jugadores = sorted(self.df["jugador"].unique())
-            self.filtrar_jugadores()
-            self.stats_label.setText("Selecciona un jugador para ver su ficha.")
+            self.filtrar_jugadores(mantener=mantener, indice=self.store.indice_nombres, recalcular=recalcular)
+            if mantener is None:
+                self.stats_label.setText("Selecciona un jugador para ver su ficha.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error cargando base de datos:\n{e}")
 
-    def filtrar_jugadores(self):
-        texto = self.buscador.text().lower()
-        self.jugadores_filtrados = [j for j in self.jugadores if texto in j.lower()]
-        self.lista_jugadores.blockSignals(True)
-        self.lista_jugadores.clear()
-        self.lista_jugadores.addItems(self.jugadores_filtrados)
-        self.lista_jugadores.blockSignals(False)
-        if self.jugadores_filtrados:
-            self.lista_jugadores.setCurrentRow(0)
-            self.indice_actual = 0
-            self.mostrar_ficha_jugador(0)
+    def _on_historial_actualizado(self, jugadores):
+        # Nuevos jugadores en la lista; la ficha actual se recalcula solo si sus partidos cambiaron
+        actual = self.ficha_nombre.text() or None
+        self.cargar_jugadores(mantener=actual, recalcular=actual in jugadores)
+
+    def filtrar_jugadores(self, mantener=None, indice=None, retardo=RETARDO_FICHA, recalcular=True):
+        # Con recalcular=False la ficha de 'mantener' sigue como está si sigue en la lista
+        # Sin tildes ni mayúsculas; si nadie contiene el texto, los nombres parecidos (erratas)
+        self.modelo_jugadores.filtrar(self.buscador.text(), indice, aproximado=True)
+        if self.modelo_jugadores.rowCount():
+            fila = max(self.modelo_jugadores.fila(mantener), 0) if mantener else 0
+            self._seleccionar_fila(fila, emitir=False)
+            self.indice_actual = fila
+            if recalcular or self.modelo_jugadores.nombre(fila) != mantener:
+                self.mostrar_ficha_jugador(fila, retardo)
         else:
+            self.indice_actual = -1
+            # Descarta cualquier ficha pendiente o en cálculo
+            self.timer_ficha.stop()
+            self.generacion_ficha += 1
             self.ficha_nombre.setText("")
-            self.stats_label.setText("No hay jugadores que coincidan con la búsqueda.")
-            self.ki_label.setText("")
-            self.streaks_label.setText("")
-            self.evo_label.setText("")
-            self.opponents_label.setText("")
-            self.momentum_label.setText("")
-            self.rating_label.setText("—")
+            self._limpiar_ficha("No hay jugadores que coincidan con la búsqueda.")
 
     def seleccionar_jugador_por_indice(self, row):
         # Recordar posición del scroll antes de actualizar
         self.last_scroll = self.scroll_area.verticalScrollBar().value()
-        if row >= 0 and row < len(self.jugadores_filtrados):
+        if row >= 0 and row < self.modelo_jugadores.rowCount():
             self.indice_actual = row
             self.mostrar_ficha_jugador(row)
         # Restaurar posición del scroll después de actualizar
         self.scroll_area.verticalScrollBar().setValue(self.last_scroll)
 
     def refrescar_filtrado_modulos(self):
-        if self.indice_actual >= 0 and self.indice_actual < len(self.jugadores_filtrados):
+        if self.indice_actual >= 0 and self.indice_actual < self.modelo_jugadores.rowCount():
             self.mostrar_ficha_jugador(self.indice_actual)
 
-    def get_df_filtrado_tiempo(self, df):
-        if df is None or df.empty:
-            return df
-        opcion = self.filtro_tiempo.currentText()
-        hoy = pd.Timestamp.today().normalize()
-        if opcion == "Todos":
-            return df
-        df = df.copy()
-        df['fecha_dt'] = pd.to_datetime(df['fecha'], errors='coerce')
-        if opcion == "Últimos 6 meses":
-            desde = hoy - pd.DateOffset(months=6)
-            return df[df['fecha_dt'] >= desde]
-        elif opcion == "Últimos 3 meses":
-            desde = hoy - pd.DateOffset(months=3)
-            return df[df['fecha_dt'] >= desde]
-        elif opcion == "Mes actual":
-            return df[df['fecha_dt'].dt.month == hoy.month]
-        return df
-
-    def mostrar_ficha_jugador(self, indice):
-        jugador = self.jugadores_filtrados[indice]
+    def _seleccionar_fila(self, fila, emitir=True):
+        # Con emitir=False no se avisa a seleccionar_jugador_por_indice (el llamador muestra la ficha)
+        seleccion = self.lista_jugadores.selectionModel()
+        seleccion.blockSignals(not emitir)
+        self.lista_jugadores.setCurrentIndex(self.modelo_jugadores.index(fila))
+        seleccion.blockSignals(False)
+
+    def mostrar_ficha_jugador(self, indice, retardo=RETARDO_FICHA):
+        """
+        El nombre se actualiza al instante; el cálculo de la ficha se agenda con un
+        pequeño retardo para no lanzar un cálculo por cada tecla o cada flecha.
+        La generación sube ya aquí: un cálculo anterior (en curso o en cola) deja
+        de ser vigente en cuanto cambia la selección y no pinta nada bajo el
+        nombre nuevo.
+        """
+        jugador = self.modelo_jugadores.nombre(indice)
+        self.generacion_ficha += 1
         self.ficha_nombre.setText(jugador)
-        if self.df is not None and jugador in self.df["jugador"].unique():
-            df_jugador = self.df[self.df["jugador"] == jugador]
-            df_jugador_filtrado = self.get_df_filtrado_tiempo(df_jugador)
-
-            # CALIFICACION GLOBAL
-            try:
-                calificacion, _ = calificacion_jugador(df_jugador_filtrado)
-                self.rating_label.setText(f"{calificacion:.2f}")
-            except Exception:
-                self.rating_label.setText("—")
-
-            # Resumen global
-            resumen = resumen_global(df_jugador_filtrado).get(jugador, {})
-            ficha = "<hr><ul style='margin-left: 0; padding-left: 1em;'>"
-            for key, val in resumen.items():
-                ficha += f"<li><b>{key.replace('_',' ').capitalize()}:</b> {val}</li>"
-            ficha += "</ul><hr>"
-            self.stats_label.setText(ficha)
-
-            # Killer instinct
-            ki = killer_instinct_stats(df_jugador_filtrado).get(jugador, {})
-            ki_text = "<ul style='margin-left: 0; padding-left: 1em;'>"
-            for key, val in ki.items():
-                ki_text += f"<li><b>{key.replace('_',' ').capitalize()}:</b> {val}</li>"
-            ki_text += "</ul>"
-            self.ki_label.setText(ki_text)
-
-            # Rachas
-            streaks = streaks_stats(df_jugador_filtrado)
-            streaks_j = streaks.get(jugador, {})
-            streaks_text = "<ul style='margin-left: 0; padding-left: 1em;'>"
-            for key, val in streaks_j.items():
-                streaks_text += f"<li><b>{key.replace('_',' ').capitalize()}:</b> {val}</li>"
-            streaks_text += "</ul>"
-            self.streaks_label.setText(streaks_text)
-
-            # Evolución (gráfico)
-            self._clear_evo_canvas()
-            evo = evolution_stats(df_jugador_filtrado)
-            if not evo.empty:
-                evo = evo.tail(12)  # últimos 12 meses
-                meses = [mes.strftime('%Y-%m') for mes in evo.index]
-                ratings = [evo[jugador][mes] if pd.notnull(evo[jugador][mes]) else None for mes in evo.index]
-                if any(r is not None for r in ratings):
-                    fig, ax = plt.subplots(figsize=(5,2.5), dpi=90)
-                    ax.plot(meses, ratings, marker='o', color='#1f77b4')
-                    ax.set_title('Evolución del Rating')
-                    ax.set_xlabel('Mes')
-                    ax.set_ylabel('Rating')
-                    ax.grid(True, linestyle=':')
-                    ax.tick_params(axis='x', rotation=45)
-                    fig.tight_layout()
-                    self.evo_canvas = FigureCanvas(fig)
-                    self.ficha_evo.layout().addWidget(self.evo_canvas)
-                    self.evo_label.setText("")
-                else:
-                    self.evo_label.setText("Sin datos de rating.")
-            else:
-                self.evo_label.setText("Sin datos de rating.")
-
-            # Momentum (gráfico de los últimos 20 partidos: verde=win, rojo=lose)
-            self._clear_momentum_canvas()
-            ultimos = df_jugador_filtrado.tail(20)
-            if not ultimos.empty:
-                resultados = list(ultimos['gano'])
-                colores = ['#4CAF50' if res == 1 else '#E53935' if res == 0 else '#9E9E9E' for res in resultados]
-                fig, ax = plt.subplots(figsize=(5,1.5), dpi=90)
-                ax.bar(range(1, len(resultados)+1), [1]*len(resultados), color=colores, edgecolor='black')
-                ax.set_ylim(0, 1.3)
-                ax.set_xlim(0.5, len(resultados)+0.5)
-                ax.set_yticks([])
-                ax.set_xticks(range(1, len(resultados)+1))
-                ax.set_title('Momentum: últimos 20 partidos (verde=win, rojo=lose)')
-                ax.tick_params(axis='x', labelrotation=0)
-                fig.tight_layout()
-                self.momentum_canvas = FigureCanvas(fig)
-                self.ficha_momentum.layout().addWidget(self.momentum_canvas)
-                self.momentum_label.setText("")
-            else:
-                self.momentum_label.setText("Sin datos de momentum.")
-
-            # Rivales
-            opp = opponents_stats(df_jugador_filtrado, top_n=5).get(jugador, {})
-            rivales = opp.get('top_rivales', {})
-            winrates = opp.get('winrate_por_rival', {})
-            opp_text = "<table border='1' cellpadding='2'><tr><th>Rival</th><th>Enfrentamientos</th><th>Winrate</th></tr>"
-            for rival, enfrent in rivales.items():
-                wr = winrates.get(rival, None)
-                wr_str = f"{wr*100:.1f}%" if wr is not None else "-"
-                opp_text += f"<tr><td>{rival}</td><td>{enfrent}</td><td>{wr_str}</td></tr>"
-            opp_text += "</table>"
-            self.opponents_label.setText(opp_text)
+        self._limpiar_ficha("Calculando ficha…")
+        self.jugador_pendiente = jugador
+        self.timer_ficha.start(retardo)
+
+    def _lanzar_calculo_ficha(self):
+        jugador = self.jugador_pendiente
+        # La generación ya se subió al seleccionar (mostrar_ficha_jugador)
+        if jugador in self.store:
+            opcion = self.filtro_tiempo.currentText()
+            tarea = FichaTarea(self.generacion_ficha, self._es_generacion_vigente, self.senales_ficha,
+                               self.store.partidos_jugador(jugador, opcion), jugador, opcion,
+                               self.store.version_datos, self.store.agregados)
+            self.pool_ficha.start(tarea)
         else:
-            self.stats_label.setText("Selecciona un jugador para ver su ficha.")
-            self.ki_label.setText("")
-            self.streaks_label.setText("")
+            self._limpiar_ficha("Selecciona un jugador para ver su ficha.")
+
+    def _limpiar_ficha(self, mensaje):
+        self.stats_label.setText(mensaje)
+        self.stats_label.show()
+        for modelo in (self.modelo_resumen, self.modelo_ki, self.modelo_rachas):
+            modelo.limpiar()
+        self.modelo_rivales.actualizar([])
+        self.rating_label.setText("—")
+        self.evo_label.setText("")
+        self.evoluciones = None
+        self._clear_evo_canvas()
+        self.momentum_label.setText("")
+        self.resultados_momentum = []
+        self._clear_momentum_canvas()
+
+    def _es_generacion_vigente(self, generacion):
+        return generacion == self.generacion_ficha
+
+    def _on_seccion_lista(self, generacion, seccion, resultado):
+        if generacion != self.generacion_ficha:
+            return
+        getattr(self, f"_mostrar_{seccion}")(resultado)
+
+    def _on_ficha_terminada(self, generacion):
+        if generacion == self.generacion_ficha:
+            self.scroll_area.verticalScrollBar().setValue(self.last_scroll)
+
+    def _mostrar_calificacion(self, calificacion):
+        # CALIFICACION GLOBAL
+        self.rating_label.setText(f"{calificacion:.2f}" if calificacion is not None else "—")
+
+    def _mostrar_resumen(self, resumen):
+        # Resumen global
+        self.stats_label.setText("" if resumen else "Sin datos.")
+        self.stats_label.setVisible(not resumen)
+        self.modelo_resumen.actualizar_columna(0, "Valor", resumen)
+
+    def _mostrar_ki(self, ki):
+        # Killer instinct
+        self.modelo_ki.actualizar_columna(0, "Valor", ki)
+
+    def _mostrar_rachas(self, streaks_j):
+        # Rachas
+        self.modelo_rachas.actualizar_columna(0, "Valor", streaks_j)
+
+    def _mostrar_evolucion(self, evoluciones):
+        # Series por granularidad (semana, mes, trimestre, año)
+        self.evoluciones = evoluciones
+        self._dibujar_evolucion()
+
+    def _dibujar_evolucion(self):
+        # Evolución (gráfico) en la granularidad elegida
+        granularidad = self.granularidad_evo.currentData()
+        evo = (self.evoluciones or {}).get(granularidad)
+        if evo is not None and not evo.empty and evo['rating_medio'].notna().any():
+            evo = evo.tail(12)  # últimos 12 periodos
+            self.evo_canvas.actualizar([etiqueta_periodo(inicio, granularidad) for inicio in evo.index],
+                                       evo['rating_medio'], evo['rating_min'], evo['rating_max'],
+                                       GRANULARIDADES[granularidad][0])
+            self.evo_canvas.show()
             self.evo_label.setText("")
-            self.momentum_label.setText("")
-            self.opponents_label.setText("")
-            self.rating_label.setText("—")
+        else:
             self._clear_evo_canvas()
+            self.evo_label.setText("Sin datos de rating.")
+
+    def _mostrar_momentum(self, resultados):
+        # Momentum (gráfico de los últimos 20 partidos: verde=win, rojo=lose)
+        self.resultados_momentum = resultados or []
+        if resultados:
+            self.momentum_canvas.actualizar(resultados)
+            self.momentum_canvas.show()
+            self.momentum_label.setText("")
+        else:
             self._clear_momentum_canvas()
+            self.momentum_label.setText("Sin datos de momentum.")
+
+    def _mostrar_rivales(self, opp):
+        # Rivales
+        opp = opp or {}
+        rivales = opp.get('top_rivales', {})
+        winrates = opp.get('winrate_por_rival', {})
+        filas = []
+        for rival, enfrent in rivales.items():
+            wr = winrates.get(rival, None)
+            filas.append([rival, enfrent, f"{wr*100:.1f}%" if wr is not None else "-"])
+        self.modelo_rivales.actualizar(filas)
 
     def copiar_todas_estadisticas(self):
-        # Recolectar textos de todos los módulos
+        # El texto sale de los datos de cada sección (TSV), no de lo que se muestra
         partes = []
         jugador = self.ficha_nombre.text()
         if jugador:
@@ -343,22 +363,29 @@ class VisualizacionJugadoresWidget(QWidget):
         partes.append(f"Calificación Global: {self.rating_label.text()} / 10\n")
 
         partes.append("=== Resumen Global ===")
-        partes.append(self.stats_label.text().replace('<ul>', '').replace('</ul>', '').replace('<li>', '').replace('</li>', '').replace('<hr>', '').replace('<b>', '').replace('</b>', '').replace('<br>', '').replace('&nbsp;', ' ').replace('<br/>', '\n'))
+        partes.append(self.modelo_resumen.tsv())
 
         partes.append("=== Killer Instinct ===")
-        partes.append(self.ki_label.text().replace('<ul>', '').replace('</ul>', '').replace('<li>', '').replace('</li>', '').replace('<hr>', '').replace('<b>', '').replace('</b>', '').replace('<br>', '').replace('&nbsp;', ' ').replace('<br/>', '\n'))
+        partes.append(self.modelo_ki.tsv())
 
         partes.append("=== Rachas ===")
-        partes.append(self.streaks_label.text().replace('<ul>', '').replace('</ul>', '').replace('<li>', '').replace('</li>', '').replace('<hr>', '').replace('<b>', '').replace('</b>', '').replace('<br>', '').replace('&nbsp;', ' ').replace('<br/>', '\n'))
-
-        partes.append("=== Evolución de Rating (últimos 12 meses) ===")
-        partes.append(self.evo_label.text().replace('<table', '').replace('</table>', '').replace('<tr>', '').replace('</tr>', '').replace('<th>', '').replace('</th>', '').replace('<td>', '\t').replace('</td>', '').replace('<br>', '').replace('&nbsp;', ' ').replace('<br/>', '\n'))
+        partes.append(self.modelo_rachas.tsv())
+
+        partes.append("=== Evolución de Rating (últimos 12 periodos) ===")
+        granularidad = self.granularidad_evo.currentData()
+        evo = (self.evoluciones or {}).get(granularidad)
+        if evo is not None and not evo.empty:
+            evo = evo.tail(12)
+            partes.append(texto_tsv(
+                [[GRANULARIDADES[granularidad][0], "Rating medio", "Rating mínimo", "Rating máximo"]] +
+                [[etiqueta_periodo(inicio, granularidad)] + ["" if pd.isna(v) else round(v, 2) for v in fila]
+                 for inicio, fila in zip(evo.index, evo[['rating_medio', 'rating_min', 'rating_max']].itertuples(index=False))]))
 
         partes.append("=== Momentum ===")
-        partes.append(self.momentum_label.text().replace('<ul>', '').replace('</ul>', '').replace('<li>', '').replace('</li>', '').replace('<hr>', '').replace('<b>', '').replace('</b>', '').replace('<br>', '').replace('&nbsp;', ' ').replace('<br/>', '\n'))
+        partes.append(" ".join("V" if res == 1 else "D" if res == 0 else "-" for res in self.resultados_momentum))
 
         partes.append("=== Principales Rivales ===")
-        partes.append(self.opponents_label.text().replace('<table', '').replace('</table>', '').replace('<tr>', '').replace('</tr>', '').replace('<th>', '').replace('</th>', '').replace('<td>', '\t').replace('</td>', '').replace('<br>', '').replace('&nbsp;', ' ').replace('<br/>', '\n'))
+        partes.append(self.modelo_rivales.tsv())
 
         texto = '\n'.join(partes)
 
@@ -368,27 +395,22 @@ class VisualizacionJugadoresWidget(QWidget):
         QMessageBox.information(self, "Copiado", "¡Estadísticas copiadas al portapapeles!")
 
     def _clear_evo_canvas(self):
-        if self.evo_canvas is not None:
-            self.ficha_evo.layout().removeWidget(self.evo_canvas)
-            self.evo_canvas.setParent(None)
-            self.evo_canvas = None
+        # El gráfico se oculta y se reutiliza en la siguiente ficha
+        self.evo_canvas.hide()
 
     def _clear_momentum_canvas(self):
-        if self.momentum_canvas is not None:
-            self.ficha_momentum.layout().removeWidget(self.momentum_canvas)
-            self.momentum_canvas.setParent(None)
-            self.momentum_canvas = None
+        self.momentum_canvas.hide()
 
     def prev_jugador(self):
         self.last_scroll = self.scroll_area.verticalScrollBar().value()
         if self.indice_actual > 0:
             self.indice_actual -= 1
-            self.lista_jugadores.setCurrentRow(self.indice_actual)
+            self._seleccionar_fila(self.indice_actual)
         self.scroll_area.verticalScrollBar().setValue(self.last_scroll)
 
     def next_jugador(self):
         self.last_scroll = self.scroll_area.verticalScrollBar().value()
-        if self.indice_actual < len(self.jugadores_filtrados) - 1:
+        if self.indice_actual < self.modelo_jugadores.rowCount() - 1:
             self.indice_actual += 1
-            self.lista_jugadores.setCurrentRow(self.indice_actual)
+            self._seleccionar_fila(self.indice_actual)
         self.scroll_area.verticalScrollBar().setValue(self.last_scroll)
\ No newline at end of file